@@ -3,7 +3,12 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from libcst._batched_visitor import BatchableCSTVisitor, visit_batched
+from libcst._batched_visitor import (
+    BatchableCSTVisitor,
+    transform_batched,
+    visit_batched,
+)
+from libcst._binary import dump_binary, load_binary
 from libcst._exceptions import MetadataException, ParserSyntaxError
 from libcst._flatten_sentinel import FlattenSentinel
 from libcst._maybe_sentinel import MaybeSentinel
@@ -209,7 +214,15 @@ from libcst._nodes.whitespace import (
     SimpleWhitespace,
     TrailingWhitespace,
 )
-from libcst._parser.entrypoints import parse_expression, parse_module, parse_statement
+from libcst._parser.cache import ParseCache
+from libcst._parser.entrypoints import (
+    parse_expression,
+    parse_module,
+    parse_module_incremental,
+    parse_modules,
+    parse_statement,
+)
+from libcst._parser.tokens import Token, tokenize
 from libcst._parser.types.config import (
     KNOWN_PYTHON_VERSION_STRINGS,
     PartialParserConfig,
@@ -243,15 +256,23 @@ __all__ = [
     "FlattenSentinel",
     "MaybeSentinel",
     "MetadataException",
+    "ParseCache",
     "ParserSyntaxError",
     "PartialParserConfig",
     "RemoveFromParent",
     "RemovalSentinel",
+    "Token",
     "ensure_type",  # from libcst import ensure_type is deprecated, will be removed in 0.4.0
     "visit_batched",
+    "transform_batched",
+    "dump_binary",
+    "load_binary",
     "parse_module",
+    "parse_module_incremental",
+    "parse_modules",
     "parse_expression",
     "parse_statement",
+    "tokenize",
     "CSTNode",
     "Module",
     "Annotation",
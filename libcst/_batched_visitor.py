@@ -7,20 +7,25 @@ import inspect
 from typing import (
     Callable,
     cast,
+    ClassVar,
+    Collection,
     Iterable,
     List,
     Mapping,
     MutableMapping,
     Optional,
-    TYPE_CHECKING,
+    Sequence,
+    Type,
+    Union,
 )
 
+from libcst._flatten_sentinel import FlattenSentinel
 from libcst._metadata_dependent import MetadataDependent
+from libcst._nodes.base import CSTNode
+from libcst._reachability import handled_node_types
+from libcst._removal_sentinel import RemovalSentinel
 from libcst._typed_visitor import CSTTypedVisitorFunctions
-from libcst._visitors import CSTNodeT, CSTVisitor
-
-if TYPE_CHECKING:
-    from libcst._nodes.base import CSTNode  # noqa: F401
+from libcst._visitors import CSTNodeT, CSTTransformer, CSTVisitor
 
 VisitorMethod = Callable[["CSTNode"], None]
 _VisitorMethodCollection = Mapping[str, List[VisitorMethod]]
@@ -36,6 +41,12 @@ class BatchableCSTVisitor(CSTTypedVisitorFunctions, MetadataDependent):
     Instances of this class cannot modify the tree.
     """
 
+    #: Set this to ``True`` to let batched traversals skip children that can't
+    #: contain any of the nodes this visitor has methods for. Children are only
+    #: skipped if all the visitors in the batch allow it. See
+    #: :attr:`~libcst.CSTVisitor.SKIP_UNREACHABLE_CHILDREN`.
+    SKIP_UNREACHABLE_CHILDREN: ClassVar[bool] = False
+
     def get_visitors(self) -> Mapping[str, VisitorMethod]:
         """
         Returns a mapping of all the ``visit_<Type[CSTNode]>``,
@@ -79,9 +90,15 @@ def visit_batched(
     :class:`~libcst.MetadataWrapper` for batched traversal with metadata dependency
     resolution.
     """
+    batchable_visitors = list(batchable_visitors)
     visitor_methods = _get_visitor_methods(batchable_visitors)
     batched_visitor = _BatchedCSTVisitor(
-        visitor_methods, before_visit=before_visit, after_leave=after_leave
+        visitor_methods,
+        before_visit=before_visit,
+        after_leave=after_leave,
+        skip_unreachable_children=all(
+            bv.SKIP_UNREACHABLE_CHILDREN for bv in batchable_visitors
+        ),
     )
     return cast(CSTNodeT, node.visit(batched_visitor))
 
@@ -116,11 +133,22 @@ class _BatchedCSTVisitor(CSTVisitor):
         *,
         before_visit: Optional[VisitorMethod] = None,
         after_leave: Optional[VisitorMethod] = None,
+        skip_unreachable_children: bool = False,
     ) -> None:
         super().__init__()
         self.visitor_methods = visitor_methods
         self.before_visit = before_visit
         self.after_leave = after_leave
+        if skip_unreachable_children:
+            # pyre-ignore[16]: Set on the instance, since it depends on the batch.
+            self.SKIP_UNREACHABLE_CHILDREN = True
+
+    def _handled_node_types(
+        self, callback_names: Collection[str]
+    ) -> Optional[Collection[Type["CSTNode"]]]:
+        if self.before_visit is not None or self.after_leave is not None:
+            return None
+        return handled_node_types(self.visitor_methods.keys())
 
     def on_visit(self, node: "CSTNode") -> bool:
         """
@@ -162,3 +190,112 @@ class _BatchedCSTVisitor(CSTVisitor):
         type_name = type(original_node).__name__
         for v in self.visitor_methods.get(f"leave_{type_name}_{attribute}", []):
             v(original_node)
+
+
+def transform_batched(
+    node: CSTNodeT, transformers: Iterable[CSTTransformer]
+) -> Union[CSTNodeT, RemovalSentinel, FlattenSentinel[CSTNodeT]]:
+    """
+    Transform ``node`` with all ``transformers`` in a single traversal, instead of
+    one traversal (and one rebuilt tree) per transformer.
+
+    Each node is visited by the transformers in the order they're given, and then
+    piped through their ``on_leave`` methods in the same order, each transformer
+    getting the node the previous one returned. The order of the other callbacks
+    follows the traversal. If a transformer's ``on_visit`` returns ``False``, only
+    that transformer skips the node's children. Since all transformers visit a node
+    before any of them leaves it, they all visit the original node, so transformers
+    should only depend on the ``updated_node`` they're given when leaving.
+
+    Once a transformer removes a node or replaces it with a
+    :class:`~libcst.FlattenSentinel`, that's the result for the node. The
+    transformers after it still have their ``on_leave`` called, so that their
+    visits and leaves stay balanced, but they get the last node that was returned
+    before it got removed or flattened, and what they return is ignored.
+
+    This function does not handle metadata dependency resolution for
+    ``transformers``. See :func:`~libcst.MetadataWrapper.transform_batched` from
+    :class:`~libcst.MetadataWrapper` for batched transforms with metadata
+    dependency resolution.
+    """
+    return node.visit(_BatchedCSTTransformer(list(transformers)))
+
+
+class _BatchedCSTTransformer(CSTTransformer):
+    """
+    Internal transformer class to transform a tree with several transformers in a
+    single traversal.
+    """
+
+    transformers: Sequence[CSTTransformer]
+    # For each transformer, the node whose children it decided not to visit, while
+    # we're visiting them.
+    skipping: List[Optional["CSTNode"]]
+
+    def __init__(self, transformers: Sequence[CSTTransformer]) -> None:
+        super().__init__()
+        self.transformers = transformers
+        self.skipping = [None] * len(transformers)
+
+    def on_visit(self, node: "CSTNode") -> bool:
+        """
+        Call the transformers' ``on_visit``, and visit the node's children if any of
+        them want to.
+        """
+        skipping = self.skipping
+        visit_children = False
+        for i, transformer in enumerate(self.transformers):
+            if skipping[i] is None:
+                if transformer.on_visit(node):
+                    visit_children = True
+                else:
+                    skipping[i] = node
+        return visit_children
+
+    def on_leave(
+        self, original_node: CSTNodeT, updated_node: CSTNodeT
+    ) -> Union[CSTNodeT, RemovalSentinel, FlattenSentinel[CSTNodeT]]:
+        """
+        Pipe the node through the ``on_leave`` of the transformers that visited it.
+        """
+        skipping = self.skipping
+        result: Union[CSTNodeT, RemovalSentinel, FlattenSentinel[CSTNodeT]]
+        result = updated_node
+        for i, transformer in enumerate(self.transformers):
+            skipped = skipping[i]
+            if skipped is not None:
+                if skipped is not original_node:
+                    # The transformer didn't visit this node.
+                    continue
+                skipping[i] = None
+            if isinstance(result, (RemovalSentinel, FlattenSentinel)):
+                transformer.on_leave(original_node, updated_node)
+                continue
+            updated_node = result
+            result = transformer.on_leave(original_node, updated_node)
+            if not isinstance(result, (CSTNode, RemovalSentinel, FlattenSentinel)):
+                raise Exception(
+                    "Expected a node of type CSTNode or a RemovalSentinel, "
+                    + f"but got a return value of {type(result).__name__}"
+                )
+        return result
+
+    def on_visit_attribute(self, node: "CSTNode", attribute: str) -> None:
+        """
+        Call the ``on_visit_attribute`` of the transformers visiting the node's
+        children.
+        """
+        skipping = self.skipping
+        for i, transformer in enumerate(self.transformers):
+            if skipping[i] is None:
+                transformer.on_visit_attribute(node, attribute)
+
+    def on_leave_attribute(self, original_node: "CSTNode", attribute: str) -> None:
+        """
+        Call the ``on_leave_attribute`` of the transformers visiting the node's
+        children.
+        """
+        skipping = self.skipping
+        for i, transformer in enumerate(self.transformers):
+            if skipping[i] is None:
+                transformer.on_leave_attribute(original_node, attribute)
@@ -0,0 +1,306 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+A compact binary serialization format for LibCST trees.
+
+Every value in a tree is either one of ``_CONSTANTS``, a string, or an object (a node,
+or a sequence of values). Values are stored as indices into a single table that holds
+the constants, then every distinct string, then every object in the order they're
+written. Objects come after their children, so the root is the last one, and every
+object is only written once, even if it appears in several places in the tree.
+
+The format is made of:
+
+- A header, see ``_HEADER``.
+- Every string, concatenated and encoded as UTF-8.
+- The length of every string.
+- The type table, where every type is the string index of its ``module:qualname``,
+  the number of its fields, and the string index of every field's name.
+- One word per object, telling what it is: a node (``type_index << 1``), or a
+  sequence (``length << 2 | _SEQUENCE``, plus ``_LIST`` for lists).
+- The values of every object's fields or elements, in the same order as the objects.
+
+Everything after the strings is made of little-endian words, which are as small as
+they can be for the largest of them (usually 16 bits). Loading a tree is then mostly
+a matter of looking up indices in the table, which we can do without running any
+python code per value.
+"""
+
+import sys
+from array import array
+from dataclasses import fields
+from itertools import accumulate
+from struct import error as StructError, Struct
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from libcst._maybe_sentinel import MaybeSentinel
+from libcst._nodes.base import CSTNode
+from libcst._nodes.module import Module
+
+_MAGIC = b"CSTb"
+_FORMAT_VERSION = 1
+# magic, format version, word size, string count, size of the encoded strings, size of
+# the type table, object count, value count
+_HEADER: Struct = Struct("<4sBBIIIII")
+
+# The array type codes for every word size.
+_WORDS: Dict[int, str] = {
+    size: next(code for code in "BHIL" if array(code).itemsize == size)
+    for size in (1, 2, 4)
+}
+_SWAP_BYTES: bool = sys.byteorder != "little"
+
+_CONSTANTS: Tuple[object, ...] = (None, False, True, MaybeSentinel.DEFAULT)
+
+_SEQUENCE = 1
+_LIST = 2
+
+# While writing, we don't know how many strings there are yet, so values are tagged
+# with the kind of index they hold, and turned into table indices at the end.
+_TAG_BITS = 2
+_TAG_MASK: int = (1 << _TAG_BITS) - 1
+_CONSTANT_TAG = 0
+_STRING_TAG = 1
+_OBJECT_TAG = 2
+
+_Object = Union[CSTNode, Sequence[object]]
+
+_node_classes_by_name: Optional[Dict[str, Type[CSTNode]]] = None
+
+
+def _type_name(cls: Type[CSTNode]) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _node_classes() -> Dict[str, Type[CSTNode]]:
+    # The only classes a tree can be made of, which are the nodes LibCST defines.
+    # Loading never imports or looks up anything else, whatever the data says.
+    global _node_classes_by_name
+    if _node_classes_by_name is None:
+        classes = {}
+        pending: List[Type[CSTNode]] = [CSTNode]
+        while pending:
+            cls = pending.pop()
+            module = sys.modules.get(cls.__module__)
+            # Skip the classes that add_slots replaced, which are still around.
+            if (
+                cls.__module__.startswith("libcst._nodes.")
+                and getattr(module, cls.__qualname__, None) is cls
+            ):
+                classes[_type_name(cls)] = cls
+            pending.extend(cls.__subclasses__())
+        _node_classes_by_name = classes
+    return _node_classes_by_name
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.types: Dict[Type[CSTNode], Tuple[int, Tuple[str, ...]]] = {}
+        self.type_words: List[int] = []
+        self.object_words: List[int] = []
+        self.values: List[int] = []
+        self.indices: Dict[int, int] = {}
+        # Keeps the objects alive until we're done, so that their ids stay unique.
+        # Lazy sequences may hand out nodes that nothing else references.
+        self.objects: List[_Object] = []
+
+    def string(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def add_type(self, cls: Type[CSTNode]) -> Tuple[int, Tuple[str, ...]]:
+        name = _type_name(cls)
+        if _node_classes().get(name) is not cls:
+            raise TypeError(f"Can't serialize {cls}, which isn't a LibCST node.")
+        names = tuple(f.name for f in fields(cls))
+        node_type = self.types[cls] = (len(self.types), names)
+        self.type_words.append(self.string(name))
+        self.type_words.append(len(names))
+        self.type_words.extend(self.string(name) for name in names)
+        return node_type
+
+    def add_object(self, value: _Object, word: int, values: List[int]) -> int:
+        self.object_words.append(word)
+        self.values.extend(values)
+        index = self.indices[id(value)] = len(self.objects)
+        self.objects.append(value)
+        return index << _TAG_BITS | _OBJECT_TAG
+
+    def value(self, value: object) -> int:
+        cls = type(value)
+        if cls is str:
+            # pyre-ignore[6]: We just checked that it's a string.
+            return self.string(value) << _TAG_BITS | _STRING_TAG
+        index = self.indices.get(id(value))
+        if index is not None:
+            return index << _TAG_BITS | _OBJECT_TAG
+        node_type = self.types.get(cls)
+        if node_type is not None or isinstance(value, CSTNode):
+            if node_type is None:
+                # pyre-ignore[6]: We just checked that it's a node.
+                node_type = self.add_type(cls)
+            type_index, names = node_type
+            values = [self.value(getattr(value, name)) for name in names]
+            # pyre-ignore[6]: We just checked that it's a node.
+            return self.add_object(value, type_index << 1, values)
+        if cls is tuple or cls is list or isinstance(value, Sequence):
+            # pyre-ignore[16]: We just checked that it's a sequence.
+            values = [self.value(element) for element in value]
+            word = len(values) << 2 | (_LIST if cls is list else 0) | _SEQUENCE
+            # pyre-ignore[6]: We just checked that it's a sequence.
+            return self.add_object(value, word, values)
+        for index, constant in enumerate(_CONSTANTS):
+            if value is constant:
+                return index << _TAG_BITS | _CONSTANT_TAG
+        raise TypeError(f"Can't serialize {value!r} of type {cls}.")
+
+    def finish(self) -> bytes:
+        strings = list(self.strings)
+        offsets = (0, len(_CONSTANTS), len(_CONSTANTS) + len(strings))
+        encoded_strings = "".join(strings).encode("utf-8")
+        values = [
+            *[len(s) for s in strings],
+            *self.type_words,
+            *self.object_words,
+            *[(v >> _TAG_BITS) + offsets[v & _TAG_MASK] for v in self.values],
+        ]
+        largest = max(values, default=0)
+        word_size = 1 if largest < 1 << 8 else 2 if largest < 1 << 16 else 4
+        words = array(_WORDS[word_size], values)
+        if _SWAP_BYTES:
+            words.byteswap()
+        header = _HEADER.pack(
+            _MAGIC,
+            _FORMAT_VERSION,
+            word_size,
+            len(strings),
+            len(encoded_strings),
+            len(self.type_words),
+            len(self.objects),
+            len(self.values),
+        )
+        return b"".join([header, encoded_strings, words.tobytes()])
+
+
+def dump_binary(module: Module) -> bytes:
+    """
+    Serializes ``module`` into a compact binary format, which :func:`load_binary`
+    turns back into an equal tree, with exactly the same :attr:`~Module.code`.
+
+    This is faster and more compact than pickling the tree, which makes it well
+    suited to caching parsed trees, or sending them to other processes. The format
+    may change between versions of LibCST, so only load data that was dumped by the
+    same version.
+    """
+    writer = _Writer()
+    writer.value(module)
+    return writer.finish()
+
+
+def _resolve_type(name: str, field_names: Tuple[str, ...]) -> Callable[..., CSTNode]:
+    cls = _node_classes().get(name)
+    if cls is None:
+        raise ValueError(f"{name} is not a LibCST node.")
+    if tuple(f.name for f in fields(cls)) != field_names:
+        raise ValueError(f"The fields of {name} changed since it was serialized.")
+    # The tree was valid when it was serialized, so there's no need to validate it.
+    return cls._trusted_constructor()
+
+
+def _load(data: bytes) -> object:
+    (
+        magic,
+        version,
+        word_size,
+        string_count,
+        strings_size,
+        type_words_count,
+        object_count,
+        value_count,
+    ) = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Not a serialized LibCST tree.")
+    if version != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version {version}.")
+
+    words_start = _HEADER.size + strings_size
+    encoded_strings = data[_HEADER.size : words_start].decode("utf-8")
+    words = array(_WORDS[word_size])
+    words.frombytes(data[words_start:])
+    if _SWAP_BYTES:
+        words.byteswap()
+    if len(words) != string_count + type_words_count + object_count + value_count:
+        raise ValueError("Truncated data.")
+
+    offsets = [0, *accumulate(words[:string_count])]
+    strings = [
+        encoded_strings[offsets[i] : offsets[i + 1]] for i in range(string_count)
+    ]
+    del words[:string_count]
+
+    type_words = words[:type_words_count].tolist()
+    types: List[Tuple[Callable[..., CSTNode], int]] = []
+    pos = 0
+    while pos < type_words_count:
+        name = strings[type_words[pos]]
+        field_count = type_words[pos + 1]
+        pos += 2
+        field_names = tuple(strings[i] for i in type_words[pos : pos + field_count])
+        pos += field_count
+        types.append((_resolve_type(name, field_names), field_count))
+
+    table: List[object] = [*_CONSTANTS, *strings]
+    lookup = table.__getitem__
+    append = table.append
+    values = words[type_words_count + object_count :].tolist()
+    pos = 0
+    for word in words[type_words_count : type_words_count + object_count]:
+        if word & _SEQUENCE:
+            end = pos + (word >> 2)
+            if word & _LIST:
+                append(list(map(lookup, values[pos:end])))
+            else:
+                append(tuple(map(lookup, values[pos:end])))
+        else:
+            constructor, field_count = types[word >> 1]
+            end = pos + field_count
+            append(constructor(*map(lookup, values[pos:end])))
+        pos = end
+
+    if pos != value_count:
+        raise ValueError("The values don't match the objects.")
+    return table[-1]
+
+
+def load_binary(data: bytes) -> Module:
+    """
+    Loads a tree that was serialized with :func:`dump_binary`. Raises a
+    :class:`ValueError` if ``data`` is not a valid serialized tree.
+
+    Only load data from a trusted source, such as a cache that only your own
+    process writes to. Loading never imports anything or creates anything but
+    LibCST nodes. However, the nodes aren't validated, so tampered data can make
+    a tree that couldn't have been parsed or constructed, and that produces
+    invalid code.
+    """
+    try:
+        module = _load(data)
+    except ValueError:
+        raise
+    except (
+        AttributeError,
+        IndexError,
+        KeyError,
+        StructError,
+        TypeError,
+    ) as e:
+        raise ValueError(f"Invalid serialized tree: {e}") from e
+    if not isinstance(module, Module):
+        raise ValueError("The serialized tree is not a Module.")
+    return module
@@ -11,6 +11,7 @@ from typing import (
     cast,
     ClassVar,
     Collection,
+    Dict,
     Generic,
     Iterator,
     Mapping,
@@ -56,6 +57,40 @@ class LazyValue(Generic[_T]):
         return cast(_T, self.return_value)
 
 
+class _DeferredMetadata(Mapping["ProviderT", Mapping["CSTNode", object]]):
+    """
+    The metadata of a :class:`MetadataDependent` during
+    :func:`~libcst.MetadataDependent.resolve`, which resolves each deferred
+    dependency on the wrapper the first time it's looked up.
+    """
+
+    def __init__(
+        self,
+        wrapper: "MetadataWrapper",
+        metadata: Mapping["ProviderT", Mapping["CSTNode", object]],
+        deferred: Collection["ProviderT"],
+    ) -> None:
+        self._wrapper = wrapper
+        self._metadata: Dict["ProviderT", Mapping["CSTNode", object]] = dict(metadata)
+        self._deferred = deferred
+
+    def __getitem__(self, key: "ProviderT") -> Mapping["CSTNode", object]:
+        if key not in self._metadata:
+            if key not in self._deferred:
+                raise KeyError(key)
+            self._metadata[key] = self._wrapper.resolve(key)
+        return self._metadata[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._metadata or key in self._deferred
+
+    def __iter__(self) -> Iterator["ProviderT"]:
+        return iter(self._metadata.keys() | self._deferred)
+
+    def __len__(self) -> int:
+        return len(self._metadata.keys() | self._deferred)
+
+
 class MetadataDependent(ABC):
     """
     The low-level base class for all classes that declare required metadata
@@ -71,6 +106,15 @@ class MetadataDependent(ABC):
     #: The set of metadata dependencies declared by this class.
     METADATA_DEPENDENCIES: ClassVar[Collection["ProviderT"]] = ()
 
+    #: Metadata dependencies that are only resolved the first time
+    #: :func:`~libcst.MetadataDependent.get_metadata` needs them, rather than up
+    #: front by :func:`~libcst.MetadataDependent.resolve`. This saves computing
+    #: expensive metadata that is only needed for a few nodes, or for none at all,
+    #: such as metadata that only matchers on rare nodes use. Dependencies that are
+    #: also declared in :attr:`~libcst.MetadataDependent.METADATA_DEPENDENCIES`
+    #: are resolved up front.
+    DEFERRED_METADATA_DEPENDENCIES: ClassVar[Collection["ProviderT"]] = ()
+
     def __init__(self) -> None:
         self.metadata = {}
 
@@ -80,7 +124,8 @@ class MetadataDependent(ABC):
         Returns all metadata dependencies declared by classes in the MRO of ``cls``
         that subclass this class.
 
-        Recursively searches the MRO of the subclass for metadata dependencies.
+        Recursively searches the MRO of the subclass for metadata dependencies,
+        including deferred ones.
         """
         try:
             # pyre-fixme[16]: use a hidden attribute to cache the property
@@ -90,22 +135,50 @@ class MetadataDependent(ABC):
             for c in inspect.getmro(cls):
                 if issubclass(c, MetadataDependent):
                     dependencies.update(c.METADATA_DEPENDENCIES)
+                    dependencies.update(c.DEFERRED_METADATA_DEPENDENCIES)
             # pyre-fixme[16]: use a hidden attribute to cache the property
             cls._INHERITED_METADATA_DEPENDENCIES_CACHE = frozenset(dependencies)
             return cls._INHERITED_METADATA_DEPENDENCIES_CACHE
 
+    @classmethod
+    def get_deferred_dependencies(cls) -> Collection["ProviderT"]:
+        """
+        Returns the metadata dependencies declared by classes in the MRO of ``cls``
+        that are resolved the first time they're needed, which are those declared
+        in :attr:`~libcst.MetadataDependent.DEFERRED_METADATA_DEPENDENCIES` and not
+        in :attr:`~libcst.MetadataDependent.METADATA_DEPENDENCIES`.
+        """
+        if "_DEFERRED_METADATA_DEPENDENCIES_CACHE" not in cls.__dict__:
+            deferred = set()
+            eager = set()
+            for c in inspect.getmro(cls):
+                if issubclass(c, MetadataDependent):
+                    deferred.update(c.DEFERRED_METADATA_DEPENDENCIES)
+                    eager.update(c.METADATA_DEPENDENCIES)
+            # pyre-fixme[16]: use a hidden attribute to cache the property
+            cls._DEFERRED_METADATA_DEPENDENCIES_CACHE = frozenset(deferred - eager)
+        return cls._DEFERRED_METADATA_DEPENDENCIES_CACHE
+
     @contextmanager
     def resolve(self, wrapper: "MetadataWrapper") -> Iterator[None]:
         """
         Context manager that resolves all metadata dependencies declared by
         ``self`` (using :func:`~libcst.MetadataDependent.get_inherited_dependencies`)
         on ``wrapper`` and caches it on ``self`` for use with
-        :func:`~libcst.MetadataDependent.get_metadata`.
+        :func:`~libcst.MetadataDependent.get_metadata`. Deferred dependencies
+        (see :func:`~libcst.MetadataDependent.get_deferred_dependencies`) are
+        only resolved on ``wrapper`` once they're looked up.
 
         Upon exiting this context manager, the metadata cache on ``self`` is
         cleared.
         """
-        self.metadata = wrapper.resolve_many(self.get_inherited_dependencies())
+        deferred = self.get_deferred_dependencies()
+        metadata = wrapper.resolve_many(
+            [d for d in self.get_inherited_dependencies() if d not in deferred]
+        )
+        self.metadata = (
+            _DeferredMetadata(wrapper, metadata, deferred) if deferred else metadata
+        )
         yield
         self.metadata = {}
 
@@ -118,7 +191,8 @@ class MetadataDependent(ABC):
         """
         Returns the metadata provided by the ``key`` if it is accessible from
         this visitor. Metadata is accessible in a subclass of this class if ``key``
-        is declared as a dependency by any class in the MRO of this class.
+        is declared as a dependency by any class in the MRO of this class. Deferred
+        dependencies are resolved the first time they're accessed.
         """
         if key not in self.get_inherited_dependencies():
             raise KeyError(
@@ -4,16 +4,44 @@
 # LICENSE file in the root directory of this source tree.
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from copy import deepcopy
-from dataclasses import dataclass, field, fields, replace
-from typing import Any, cast, ClassVar, Dict, List, Mapping, Sequence, TypeVar, Union
+from dataclasses import dataclass, field, fields, MISSING, replace
+from threading import get_ident
+from types import MemberDescriptorType
+from typing import (
+    Any,
+    Callable,
+    cast,
+    ClassVar,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from libcst._flatten_sentinel import FlattenSentinel
+from libcst._maybe_sentinel import MaybeSentinel
 from libcst._nodes.internal import CodegenState
+from libcst._reachability import node_type_defined
 from libcst._removal_sentinel import RemovalSentinel
 from libcst._type_enforce import is_value_of_type
 from libcst._types import CSTNodeT
-from libcst._visitors import CSTTransformer, CSTVisitor, CSTVisitorT
+from libcst._visitors import (
+    _start_traversal,
+    _visitor_callbacks,
+    CSTTransformer,
+    CSTVisitor,
+    CSTVisitorT,
+)
 
 _CSTNodeSelfT = TypeVar("_CSTNodeSelfT", bound="CSTNode")
 _EMPTY_SEQUENCE: Sequence["CSTNode"] = ()
@@ -23,6 +51,461 @@ class CSTValidationError(SyntaxError):
     pass
 
 
+# Threads that are currently inside a _trusted_construction context. We don't use a
+# threading.local, because looking up an attribute on it would slow down the
+# construction of every node, while an empty set is cheap to check.
+_trusted_construction_threads: Set[int] = set()
+
+
+@contextmanager
+def _trusted_construction() -> Iterator[None]:
+    """
+    Skips :meth:`CSTNode._validate` for nodes constructed by the current thread inside
+    this context. Only meant for the parser, which already guarantees that the nodes
+    it builds are valid.
+    """
+    thread = get_ident()
+    if thread in _trusted_construction_threads:
+        yield
+        return
+    _trusted_construction_threads.add(thread)
+    try:
+        yield
+    finally:
+        _trusted_construction_threads.discard(thread)
+
+
+_trusted_constructors: Dict[Type["CSTNode"], Callable[..., "CSTNode"]] = {}
+
+
+def _make_trusted_constructor(cls: Type["CSTNode"]) -> Callable[..., "CSTNode"]:
+    # Generates the equivalent of the dataclass' __init__, minus the call to
+    # __post_init__ (and therefore _validate).
+    namespace: Dict[str, object] = {
+        "_cls": cls,
+        "_new": object.__new__,
+        "_setattr": object.__setattr__,
+        "_MISSING": MISSING,
+    }
+    params: List[str] = []
+    body: List[str] = ["    _node = _new(_cls)"]
+    for f in fields(cls):
+        name = f.name
+        # Setting a slot through its descriptor is quite a bit faster than going
+        # through object.__setattr__, which has to look the descriptor up.
+        descriptor = next(
+            (base.__dict__[name] for base in cls.__mro__ if name in base.__dict__),
+            None,
+        )
+        if isinstance(descriptor, MemberDescriptorType):
+            namespace[f"_set_{name}"] = descriptor.__set__
+            setter = f"    _set_{name}(_node, {name})"
+        else:
+            setter = f"    _setattr(_node, {name!r}, {name})"
+        if f.default is not MISSING:
+            namespace[f"_default_{name}"] = f.default
+            params.append(f"{name}=_default_{name}")
+        elif f.default_factory is not MISSING:
+            namespace[f"_factory_{name}"] = f.default_factory
+            params.append(f"{name}=_MISSING")
+            body.append(f"    if {name} is _MISSING:")
+            body.append(f"        {name} = _factory_{name}()")
+        else:
+            params.append(name)
+        body.append(setter)
+    body.append("    return _node")
+    source = "\n".join([f"def _construct({', '.join(params)}):", *body])
+    exec(source, namespace)
+    return cast(Callable[..., "CSTNode"], namespace["_construct"])
+
+
+class _ChildLayoutRecorder(CSTVisitor):
+    """
+    Records the order in which a node's ``_visit_and_replace_children`` visits its
+    fields, and whether it visits each of them as a single node or as a sequence of
+    nodes. The node's fields must all be :class:`_ChildProbe` instances.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.layout: List[Tuple[str, bool]] = []
+        # The attribute we're in, and whether its probe has been visited yet.
+        self.attribute: Optional[str] = None
+        self.recorded = False
+        self.valid = True
+
+    def record(self, name: str, is_sequence: bool) -> None:
+        if name != self.attribute or self.recorded:
+            self.valid = False
+        self.layout.append((name, is_sequence))
+        self.recorded = True
+
+    def on_visit_attribute(self, node: "CSTNode", attribute: str) -> None:
+        if self.attribute is not None:
+            self.valid = False
+        self.attribute = attribute
+        self.recorded = False
+
+    def on_leave_attribute(self, original_node: "CSTNode", attribute: str) -> None:
+        if attribute != self.attribute or not self.recorded:
+            self.valid = False
+        self.attribute = None
+
+
+class _ChildProbe:
+    __slots__ = ("name", "recorder")
+
+    def __init__(self, name: str, recorder: _ChildLayoutRecorder) -> None:
+        self.name = name
+        self.recorder = recorder
+
+    def visit(self, visitor: CSTVisitorT) -> "_ChildProbe":
+        self.recorder.record(self.name, False)
+        return self
+
+    def __iter__(self) -> Iterator["CSTNode"]:
+        self.recorder.record(self.name, True)
+        return iter(())
+
+
+_child_layouts: Dict[Type["CSTNode"], Optional[List[Tuple[str, bool]]]] = {}
+
+
+def _child_layout(cls: Type["CSTNode"]) -> Optional[List[Tuple[str, bool]]]:
+    """
+    Returns the fields that the class' ``_visit_and_replace_children`` visits, in
+    order, and whether each of them is visited as a sequence. The layout is traced
+    once per class, on an instance made of probes. Returns None if the trace can't be
+    trusted, in which case callers have to use ``_visit_and_replace_children``.
+    """
+    try:
+        return _child_layouts[cls]
+    except KeyError:
+        pass
+    recorder = _ChildLayoutRecorder()
+    node = object.__new__(cls)
+    for f in fields(cls):
+        object.__setattr__(node, f.name, _ChildProbe(f.name, recorder))
+    layout = None
+    try:
+        with _trusted_construction():
+            node._visit_and_replace_children(recorder)
+    except Exception:
+        pass
+    else:
+        if recorder.valid and recorder.attribute is None:
+            layout = recorder.layout
+    _child_layouts[cls] = layout
+    return layout
+
+
+class _ChildrenVisitorSource:
+    """
+    Writes the lines of the functions that :func:`_make_children_visitor` generates,
+    one field at a time.
+    """
+
+    def __init__(
+        self, *, collect_results: bool, yield_children: bool, silent: bool
+    ) -> None:
+        self.collect_results = collect_results
+        self.yield_children = yield_children
+        self.silent = silent
+
+    def prologue(self) -> List[str]:
+        lines = []
+        if not self.silent:
+            lines += [
+                "    on_visit_attribute = visitor.on_visit_attribute",
+                "    on_leave_attribute = visitor.on_leave_attribute",
+            ]
+        if self.collect_results:
+            lines += [
+                "    results = []",
+                "    append = results.append",
+                "    changed = False",
+            ]
+        return lines
+
+    def attribute_callback(self, callback: str, name: str, indent: str) -> List[str]:
+        if self.silent:
+            return []
+        return [f"{indent}{callback}(node, {name!r})"]
+
+    def visit(self, child: str, indent: str, skip: bool) -> List[str]:
+        if skip:
+            # Skipped children are their own results.
+            return [f"{indent}append({child})"] if self.collect_results else []
+        if self.yield_children:
+            return [f"{indent}yield {child}"]
+        if not self.collect_results:
+            return [f"{indent}{child}.visit(visitor)"]
+        return [
+            f"{indent}result = {child}.visit(visitor)",
+            f"{indent}append(result)",
+            f"{indent}if result is not {child}:",
+            f"{indent}    changed = True",
+        ]
+
+    def visit_sequence(self, skip: bool) -> List[str]:
+        if skip and self.collect_results:
+            return [
+                "        if isinstance(children, _CSTNode):",
+                "            append(children)",
+                "        else:",
+                "            results.extend(children)",
+            ]
+        if skip:
+            return []
+        return [
+            "        if isinstance(children, _CSTNode):",
+            *self.visit("children", "            ", skip),
+            "        else:",
+            "            for child in children:",
+            *self.visit("child", "                ", skip),
+        ]
+
+    def sequence_field(self, name: str, skip: bool) -> List[str]:
+        block = [
+            *self.attribute_callback("on_visit_attribute", name, "        "),
+            *self.visit_sequence(skip),
+            *self.attribute_callback("on_leave_attribute", name, "        "),
+        ]
+        if not block:
+            return []
+        return [
+            f"    children = node.{name}",
+            # Some nodes skip sequences that are None (e.g.
+            # FormattedStringExpression.format_spec), or hold a single node in place
+            # of a sequence (e.g. ImportFrom.names).
+            "    if children is not None:",
+            *block,
+        ]
+
+    def field(self, name: str, skip: bool) -> List[str]:
+        lines = self.attribute_callback("on_visit_attribute", name, "    ")
+        visit_child = self.visit("child", "        ", skip)
+        if visit_child:
+            lines += [
+                f"    child = node.{name}",
+                "    if child is not None and child is not _DEFAULT:",
+                *visit_child,
+            ]
+        return lines + self.attribute_callback("on_leave_attribute", name, "    ")
+
+
+def _make_children_visitor(
+    layout: List[Tuple[str, bool]],
+    *,
+    collect_results: bool,
+    yield_children: bool,
+    silent: bool,
+    unreachable: Collection[str],
+) -> Callable[..., Any]:
+    # Generates a function that visits the fields in `layout` the same way
+    # _visit_and_replace_children would, without building a new node. If
+    # `collect_results` is set, it returns the results of visiting the children, in
+    # order, or None if every child came back unchanged. If `yield_children` is set,
+    # it's a generator that yields the children for the caller to visit, instead of
+    # visiting them itself (see _walk). If `silent` is set, it
+    # doesn't call on_visit_attribute and on_leave_attribute, for visitors whose
+    # attribute callbacks are known to do nothing. The children in `unreachable`
+    # fields aren't visited at all.
+    source = _ChildrenVisitorSource(
+        collect_results=collect_results, yield_children=yield_children, silent=silent
+    )
+    body = source.prologue()
+    for name, is_sequence in layout:
+        skip = name in unreachable
+        if is_sequence:
+            body += source.sequence_field(name, skip)
+        else:
+            body += source.field(name, skip)
+    if collect_results:
+        body.append("    return results if changed else None")
+    namespace: Dict[str, object] = {
+        "_CSTNode": CSTNode,
+        "_DEFAULT": MaybeSentinel.DEFAULT,
+    }
+    if yield_children and all(name in unreachable for name, _ in layout):
+        # Still a generator, even though there's nothing to yield.
+        body.append("    yield from ()")
+    if not body:
+        body.append("    pass")
+    code = "\n".join(["def _visit_children(node, visitor):", *body])
+    exec(code, namespace)
+    return cast(Callable[..., Any], namespace["_visit_children"])
+
+
+# Generated children visitors by node class, whether they're silent, and the fields
+# they skip (see _make_children_visitor). None means the class has to fall back to
+# _visit_and_replace_children.
+_ChildrenVisitorKey = Tuple[Type["CSTNode"], bool, Tuple[str, ...]]
+_children_visitors: Dict[
+    _ChildrenVisitorKey, Optional[Callable[["CSTNode", CSTVisitor], None]]
+] = {}
+_children_transformers: Dict[
+    _ChildrenVisitorKey,
+    Optional[Callable[["CSTNode", CSTTransformer], Optional[List[object]]]],
+] = {}
+_children_iterators: Dict[
+    _ChildrenVisitorKey,
+    Optional[Callable[["CSTNode", CSTVisitor], Iterator["CSTNode"]]],
+] = {}
+
+
+def _children_visitor(
+    cache: Dict[_ChildrenVisitorKey, Optional[Callable[..., Any]]],
+    key: _ChildrenVisitorKey,
+    *,
+    collect_results: bool = False,
+    yield_children: bool = False,
+) -> Optional[Callable[..., Any]]:
+    cls, silent, unreachable = key
+    layout = _child_layout(cls)
+    visit_children = cache[key] = (
+        None
+        if layout is None
+        else _make_children_visitor(
+            layout,
+            collect_results=collect_results,
+            yield_children=yield_children,
+            silent=silent,
+            unreachable=unreachable,
+        )
+    )
+    return visit_children
+
+
+def _no_children(node: "CSTNode", visitor: CSTVisitor) -> Iterator["CSTNode"]:
+    # Stands in for the children iterators of nodes whose children a visitor doesn't
+    # need to see at all, so that _walk can leave them right away.
+    return iter(())
+
+
+def _not_a_node(node: "CSTNode", visitor: CSTVisitor) -> Iterator["CSTNode"]:
+    # Stands in for the children iterators of children that aren't CSTNodes at all,
+    # which _walk leaves to visit themselves.
+    return iter(())
+
+
+def _visit_children_recursively(
+    node: "CSTNode", visitor: CSTVisitor
+) -> Iterator["CSTNode"]:
+    # For nodes whose layout couldn't be traced, _visit_and_replace_children has to
+    # visit the children itself.
+    node._visit_and_replace_children(visitor)
+    yield from ()
+
+
+def _children_iterator(
+    cls: Type["CSTNode"], visitor: CSTVisitor
+) -> Callable[["CSTNode", CSTVisitor], Iterator["CSTNode"]]:
+    """
+    Returns a function that returns an iterator over the children of a node of type
+    ``cls`` that ``visitor`` needs to visit. Iterating over it fires the attribute
+    callbacks along the way.
+    """
+    if not issubclass(cls, CSTNode):
+        return _not_a_node
+    callbacks = _visitor_callbacks(visitor, cls)
+    key = (cls, callbacks.silent, callbacks.unreachable)
+    try:
+        iterate = _children_iterators[key]
+    except KeyError:
+        iterate = _children_visitor(_children_iterators, key, yield_children=True)
+    if iterate is None:
+        return _visit_children_recursively
+    if callbacks.silent and all(
+        name in callbacks.unreachable for name, _ in _child_layout(cls) or ()
+    ):
+        return _no_children
+    return iterate
+
+
+def _visit_read_only(root: "CSTNode", visitor: CSTVisitor) -> None:
+    """
+    Visits ``root`` and everything below it with a visitor that can't change the
+    tree, unless this is part of a traversal that the visitor has stopped.
+    """
+    depth = visitor._traversal_depth
+    if not depth:
+        visitor._traversal_stopped = False
+        _start_traversal(visitor)
+    elif visitor._traversal_stopped:
+        # E.g. a node that visits its own children, while the traversal's stopped.
+        return
+    visitor._traversal_depth = depth + 1
+    try:
+        visit_children = visitor.on_visit(root)
+        if visitor._traversal_stopped:
+            return
+        if visit_children:
+            _walk(root, visitor)
+        else:
+            visitor.on_leave(root)
+    finally:
+        visitor._traversal_depth = depth
+
+
+def _walk(root: "CSTNode", visitor: CSTVisitor) -> None:
+    """
+    Visits everything below ``root``, which ``visitor`` has already visited, and then
+    leaves ``root``. The visitor must not be able to change the tree. The callbacks
+    fire in the same order as with a recursive traversal, but the nodes we're in are
+    kept on an explicit stack, so deeply nested trees don't run into the recursion
+    limit, and each level costs a generator instead of several Python frames.
+
+    Returns as soon as a callback calls :meth:`CSTVisitor.stop_traversal`, which is
+    checked after every callback. The attribute callbacks run while the children
+    iterators are advanced, which is why it's also checked whenever one of them
+    yields a child or runs out.
+    """
+    on_visit = visitor.on_visit
+    on_leave = visitor.on_leave
+    cls = type(root)
+    iterate = _children_iterator(cls, visitor)
+    if iterate is _no_children:
+        on_leave(root)
+        return
+    # The children iterators for each class of node, for this visitor.
+    iterators: Dict[
+        Type["CSTNode"], Callable[["CSTNode", CSTVisitor], Iterator["CSTNode"]]
+    ] = {cls: iterate}
+    # The nodes we're in, and iterators over their remaining children.
+    nodes: List["CSTNode"] = [root]
+    stack: List[Iterator["CSTNode"]] = [iterate(root, visitor)]
+    while stack:
+        for child in stack[-1]:
+            if visitor._traversal_stopped:
+                return
+            cls = type(child)
+            iterate = iterators.get(cls)
+            if iterate is None:
+                iterate = iterators[cls] = _children_iterator(cls, visitor)
+            if iterate is _not_a_node:
+                child.visit(visitor)
+                continue
+            visit_children = on_visit(child)
+            if visitor._traversal_stopped:
+                return
+            if not visit_children or iterate is _no_children:
+                on_leave(child)
+                if visitor._traversal_stopped:
+                    return
+                continue
+            nodes.append(child)
+            stack.append(iterate(child, visitor))
+            break
+        else:
+            if visitor._traversal_stopped:
+                return
+            stack.pop()
+            on_leave(nodes.pop())
+            if visitor._traversal_stopped:
+                return
+
+
 class CSTCodegenError(SyntaxError):
     pass
 
@@ -36,40 +519,79 @@ class _ChildrenCollectionVisitor(CSTVisitor):
         return False  # Don't include transitive children
 
 
-class _ChildReplacementTransformer(CSTTransformer):
+class _SpineCollector(CSTVisitor):
+    """
+    Collects the nodes that are ancestors of any of the ``targets``, which are the
+    only nodes that have to be rebuilt to replace the targets.
+    """
+
+    def __init__(self, targets: Collection["CSTNode"]) -> None:
+        super().__init__()
+        self.targets = targets
+        self.spine: Set["CSTNode"] = set()
+        self.stack: List["CSTNode"] = []
+
+    def on_visit(self, node: "CSTNode") -> bool:
+        is_target = node in self.targets
+        if is_target:
+            # Ancestors that are already on the spine have had their own ancestors
+            # added too.
+            for ancestor in reversed(self.stack):
+                if ancestor in self.spine:
+                    break
+                self.spine.add(ancestor)
+        self.stack.append(node)
+        # Targets are replaced as a whole, so there's no need to look under them.
+        return not is_target
+
+    def on_leave(self, original_node: "CSTNode") -> None:
+        self.stack.pop()
+
+
+class _SpineReplacementTransformer(CSTTransformer):
     def __init__(
-        self, old_node: "CSTNode", new_node: Union["CSTNode", RemovalSentinel]
+        self,
+        spine: Collection["CSTNode"],
+        replacements: Mapping[
+            "CSTNode", Union["CSTNode", RemovalSentinel, FlattenSentinel["CSTNode"]]
+        ],
     ) -> None:
-        self.old_node = old_node
-        self.new_node = new_node
+        super().__init__()
+        self.spine = spine
+        self.replacements = replacements
 
     def on_visit(self, node: "CSTNode") -> bool:
-        # If the node is one we are about to replace, we shouldn't
-        # recurse down it, that would be a waste of time.
-        return node is not self.old_node
+        # Only the ancestors of the nodes we replace need rebuilding, everything else
+        # is kept as it is without being traversed.
+        return node in self.spine
 
     def on_leave(
         self, original_node: "CSTNode", updated_node: "CSTNode"
-    ) -> Union["CSTNode", RemovalSentinel]:
-        if original_node is self.old_node:
-            return self.new_node
-        return updated_node
+    ) -> Union["CSTNode", RemovalSentinel, FlattenSentinel["CSTNode"]]:
+        return self.replacements.get(original_node, updated_node)
+
 
+class _ChildReplayTransformer(CSTTransformer):
+    """
+    Replaces each child with the result that visiting it already produced, in
+    visiting order, without visiting it again.
+    """
 
-class _ChildWithChangesTransformer(CSTTransformer):
-    def __init__(self, old_node: "CSTNode", changes: Mapping[str, Any]) -> None:
-        self.old_node = old_node
-        self.changes = changes
+    def __init__(self, results: List[object]) -> None:
+        super().__init__()
+        self.results: Iterator[object] = iter(results)
 
     def on_visit(self, node: "CSTNode") -> bool:
-        # If the node is one we are about to replace, we shouldn't
-        # recurse down it, that would be a waste of time.
-        return node is not self.old_node
+        return False
 
-    def on_leave(self, original_node: "CSTNode", updated_node: "CSTNode") -> "CSTNode":
-        if original_node is self.old_node:
-            return updated_node.with_changes(**self.changes)
-        return updated_node
+    def on_leave(self, original_node: "CSTNode", updated_node: "CSTNode") -> Any:
+        return next(self.results)
+
+    def on_visit_attribute(self, node: "CSTNode", attribute: str) -> None:
+        pass
+
+    def on_leave_attribute(self, original_node: "CSTNode", attribute: str) -> None:
+        pass
 
 
 class _NOOPVisitor(CSTTransformer):
@@ -112,9 +634,27 @@ class CSTNode(ABC):
     __slots__: ClassVar[Sequence[str]] = ()
 
     def __post_init__(self) -> None:
-        # PERF: It might make more sense to move validation work into the visitor, which
-        # would allow us to avoid validating the tree when parsing a file.
-        self._validate()
+        # The parser only produces valid trees, so it skips validation (see
+        # _trusted_constructor and _trusted_construction).
+        threads = _trusted_construction_threads
+        if not threads or get_ident() not in threads:
+            self._validate()
+
+    @classmethod
+    def _trusted_constructor(cls: Type[_CSTNodeSelfT]) -> Callable[..., _CSTNodeSelfT]:
+        """
+        Returns a function that takes the same arguments as this class' constructor,
+        but skips ``__post_init__`` and :meth:`_validate`. It's used by the native
+        parser to convert its trees into python nodes, and must only be called with
+        values that are already known to form a valid node.
+        """
+        try:
+            # pyre-ignore[7]: The constructor was generated for `cls`.
+            return _trusted_constructors[cls]
+        except KeyError:
+            constructor = _trusted_constructors[cls] = _make_trusted_constructor(cls)
+            # pyre-ignore[7]: The constructor was generated for `cls`.
+            return constructor
 
     @classmethod
     def __init_subclass__(cls, **kwargs: Any) -> None:
@@ -127,6 +667,7 @@ class CSTNode(ABC):
         `repr=False, eq=False`, which is more error-prone.
         """
         super().__init_subclass__(**kwargs)
+        node_type_defined()
 
         if "__repr__" not in cls.__dict__:
             cls.__repr__ = CSTNode.__repr__
@@ -195,16 +736,8 @@ class CSTNode(ABC):
         lexically in the code.
         """
 
-        # We're hooking into _visit_and_replace_children, which means that our current
-        # implementation is slow. We may need to rethink and/or cache this if it becomes
-        # a frequently accessed property.
-        #
-        # This probably won't be called frequently, because most child access will
-        # probably through visit, or directly through named property access, not through
-        # children.
-
         visitor = _ChildrenCollectionVisitor()
-        self._visit_and_replace_children(visitor)
+        self._visit_children(visitor)
         return visitor.children
 
     def visit(
@@ -214,26 +747,35 @@ class CSTNode(ABC):
         Visits the current node, its children, and all transitive children using
         the given visitor's callbacks.
         """
-        # visit self
-        should_visit_children = visitor.on_visit(self)
-
-        # TODO: provide traversal where children are not replaced
-        # visit children (optionally)
-        if should_visit_children:
-            # It's not possible to define `_visit_and_replace_children` with the correct
-            # return type in any sane way, so we're using this cast. See the
-            # explanation above the declaration of `_visit_and_replace_children`.
-            with_updated_children = cast(
-                _CSTNodeSelfT, self._visit_and_replace_children(visitor)
-            )
-        else:
-            with_updated_children = self
-
+        # A CSTVisitor can't change the tree, so there's no need to rebuild it, and
+        # nothing to return from each level, which lets us avoid recursing.
         if isinstance(visitor, CSTVisitor):
-            visitor.on_leave(self)
-            leave_result = self
-        else:
+            _visit_read_only(self, visitor)
+            return self
+
+        depth = visitor._traversal_depth
+        if not depth:
+            _start_traversal(visitor)
+        visitor._traversal_depth = depth + 1
+        try:
+            # visit self
+            should_visit_children = visitor.on_visit(self)
+
+            # visit children (optionally)
+            if should_visit_children:
+                # It's not possible to define `_visit_and_replace_children` with the
+                # correct return type in any sane way, so we're using this cast. See
+                # the explanation above the declaration of
+                # `_visit_and_replace_children`.
+                with_updated_children = cast(
+                    _CSTNodeSelfT, self._transform_children(visitor)
+                )
+            else:
+                with_updated_children = self
+
             leave_result = visitor.on_leave(self, with_updated_children)
+        finally:
+            visitor._traversal_depth = depth
 
         # validate return type of the user-defined `visitor.on_leave` method
         if not isinstance(leave_result, (CSTNode, RemovalSentinel, FlattenSentinel)):
@@ -246,6 +788,50 @@ class CSTNode(ABC):
 
         return leave_result
 
+    def _visit_children(self, visitor: CSTVisitor) -> None:
+        """
+        Visits the children of this node in the same order as
+        :meth:`_visit_and_replace_children`, firing the same callbacks, but without
+        constructing a replacement node. Only valid for visitors that can't change the
+        tree.
+        """
+        cls = type(self)
+        callbacks = _visitor_callbacks(visitor, cls)
+        key = (cls, callbacks.silent, callbacks.unreachable)
+        try:
+            visit_children = _children_visitors[key]
+        except KeyError:
+            visit_children = _children_visitor(
+                _children_visitors, key, collect_results=False
+            )
+        if visit_children is None:
+            self._visit_and_replace_children(visitor)
+        else:
+            visit_children(self, visitor)
+
+    def _transform_children(self, visitor: CSTTransformer) -> "CSTNode":
+        """
+        Like :meth:`_visit_and_replace_children`, but returns ``self`` if every child
+        came back unchanged, instead of an identical copy.
+        """
+        cls = type(self)
+        callbacks = _visitor_callbacks(visitor, cls)
+        key = (cls, callbacks.silent, callbacks.unreachable)
+        try:
+            visit_children = _children_transformers[key]
+        except KeyError:
+            visit_children = _children_visitor(
+                _children_transformers, key, collect_results=True
+            )
+        if visit_children is None:
+            return self._visit_and_replace_children(visitor)
+        results = visit_children(self, visitor)
+        if results is None:
+            return self
+        # Let _visit_and_replace_children build the new node, so that removed and
+        # flattened children are handled exactly like they'd usually be.
+        return self._visit_and_replace_children(_ChildReplayTransformer(results))
+
     # The return type of `_visit_and_replace_children` is `CSTNode`, not
     # `_CSTNodeSelfT`. This is because pyre currently doesn't have a way to annotate
     # classes as final. https://mypy.readthedocs.io/en/latest/final_attrs.html
@@ -378,11 +964,15 @@ class CSTNode(ABC):
         a node's deep children with a new node. Note that if you have previously
         modified the tree in a way that ``old_node`` appears more than once as a deep
         child, all instances will be replaced.
+
+        To replace more than one node, use :meth:`deep_replace_many`, which is much
+        faster than calling this once for each of them.
         """
-        new_tree = self.visit(_ChildReplacementTransformer(old_node, new_node))
+        new_tree = self.deep_replace_many({old_node: new_node})
         if isinstance(new_tree, (FlattenSentinel, RemovalSentinel)):
-            # The above transform never returns *Sentinel, so this isn't possible
+            # The above replacement never returns *Sentinel, so this isn't possible
             raise Exception("Logic error, cannot get a *Sentinel here!")
+        # pyre-ignore[7]: This is either self with new_node in it, or new_node.
         return new_tree
 
     def deep_remove(
@@ -393,14 +983,14 @@ class CSTNode(ABC):
         have previously modified the tree in a way that ``old_node`` appears more than
         once as a deep child, all instances will be removed.
         """
-        new_tree = self.visit(
-            _ChildReplacementTransformer(old_node, RemovalSentinel.REMOVE)
-        )
+        new_tree = self.deep_replace_many({old_node: RemovalSentinel.REMOVE})
 
         if isinstance(new_tree, FlattenSentinel):
-            # The above transform never returns FlattenSentinel, so this isn't possible
+            # The above replacement never returns FlattenSentinel, so this isn't
+            # possible
             raise Exception("Logic error, cannot get a FlattenSentinel here!")
 
+        # pyre-ignore[7]: This is either self with old_node removed, or REMOVE.
         return new_tree
 
     def with_deep_changes(
@@ -418,12 +1008,43 @@ class CSTNode(ABC):
         current feature-set, but we should still think about ways to type this or a
         similar API in the future.
         """
-        new_tree = self.visit(_ChildWithChangesTransformer(old_node, changes))
+        new_tree = self.deep_replace_many({old_node: old_node.with_changes(**changes)})
         if isinstance(new_tree, (FlattenSentinel, RemovalSentinel)):
-            # This is impossible with the above transform.
+            # This is impossible with the above replacement.
             raise Exception("Logic error, cannot get a *Sentinel here!")
+        # pyre-ignore[7]: with_changes returns a node of the same type.
         return new_tree
 
+    def deep_replace_many(
+        self: _CSTNodeSelfT,
+        replacements: Mapping[
+            "CSTNode", Union["CSTNode", RemovalSentinel, FlattenSentinel["CSTNode"]]
+        ],
+    ) -> Union[_CSTNodeSelfT, "CSTNode", RemovalSentinel, FlattenSentinel["CSTNode"]]:
+        """
+        Recursively replaces any instance of each key of ``replacements`` with its
+        value, by identity, all at once. Values can also be a
+        :class:`~libcst.RemovalSentinel` to remove a node, or a
+        :class:`~libcst.FlattenSentinel` to replace it with several nodes where
+        a sequence of nodes is allowed, like in a transform's ``leave_`` function.
+        To make changes to a node instead, give the result of its
+        :attr:`with_changes` as its replacement.
+
+        The tree is traversed once to find where the replaced nodes are, and then
+        only the nodes on the paths from the replaced nodes up to ``self`` are
+        rebuilt. Everything else is shared with the original tree. This makes it
+        much faster to replace many nodes than calling :meth:`deep_replace` for
+        each of them, which traverses and rebuilds the tree every time.
+
+        If one of the replaced nodes is under another one, only the outer one is
+        replaced, since it replaces its children too.
+        """
+        if not replacements:
+            return self
+        collector = _SpineCollector(replacements)
+        self.visit(collector)
+        return self.visit(_SpineReplacementTransformer(collector.spine, replacements))
+
     def __eq__(self: _CSTNodeSelfT, other: object) -> bool:
         """
         CSTNodes are only treated as equal by identity. This matches the behavior of
@@ -231,10 +231,7 @@ class CSTNodeTest(UnitTest):
         When visit is called with a visitor that acts as a no-op, the visit method
         should return the same node it started with.
         """
-        # TODO: We're only checking equality right now, because visit currently clones
-        # the node, since that was easier to implement. We should fix that behavior in a
-        # later version and tighten this check.
-        self.assertEqual(node, node.visit(_NOOPVisitor()))
+        self.assertIs(node, node.visit(_NOOPVisitor()))
 
     def assert_parses(
         self,
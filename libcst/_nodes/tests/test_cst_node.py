@@ -70,6 +70,22 @@ class CSTNodeTest(UnitTest):
         # ensure no mutation actually happened
         self.assertEqual(none_throws(initial.comment).value, "# initial")
 
+    def test_trusted_constructor(self) -> None:
+        construct = cst.Name._trusted_constructor()
+        self.assertIs(cst.Name._trusted_constructor(), construct)
+        node = construct(value="foo")
+        self.assertIsInstance(node, cst.Name)
+        self.assertTrue(node.deep_equals(cst.Name("foo")))
+        # Unlike the regular constructor, it doesn't validate its arguments.
+        self.assertEqual(construct(value="").value, "")
+        with self.assertRaises(cst.CSTValidationError):
+            cst.Name("")
+        # Defaults and default factories are honored.
+        arg = cst.Arg._trusted_constructor()(value=cst.Name("x"))
+        self.assertTrue(arg.deep_equals(cst.Arg(cst.Name("x"))))
+        module = cst.Module._trusted_constructor()(body=[])
+        self.assertTrue(module.deep_equals(cst.Module(body=[])))
+
     def test_default_eq(self) -> None:
         sw1 = cst.SimpleWhitespace("")
         sw2 = cst.SimpleWhitespace("")
@@ -0,0 +1,188 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from libcst._binary import dump_binary, load_binary
+from libcst._nodes.module import Module
+from libcst._parser.entrypoints import is_native, parse_module
+from libcst._parser.types.config import PartialParserConfig
+
+try:
+    from libcst._version import version as _LIBCST_VERSION
+except ImportError:
+    _LIBCST_VERSION = "unknown"
+
+_DEFAULT_PARTIAL_PARSER_CONFIG: PartialParserConfig = PartialParserConfig()
+
+# Every entry starts with a header made of a magic number, a flag telling whether the
+# entry holds a tree, and the number of seconds it took to parse the source.
+_MAGIC = b"CSTc"
+_HEADER: struct.Struct = struct.Struct("<4s?d")
+_DEFAULT_MAX_SIZE: int = 1 << 30
+
+
+class ParseCache:
+    """
+    A persistent cache of parsed modules, stored in ``directory``. Use its
+    :meth:`parse_module` in place of :func:`~libcst.parse_module` to load the tree
+    from the cache when the same source was parsed before, with the same
+    configuration and the same version of LibCST.
+
+    Loading a tree isn't always faster than parsing it, especially with the native
+    parser. Every entry records how long parsing took, and the first time loading an
+    entry turns out to be slower than that, the entry is replaced with a marker that
+    makes us parse that source directly from then on.
+
+    The cache is safe to share between processes (e.g. the workers of a codemod).
+    Entries are written atomically, and the least recently used entries are evicted
+    once the cache grows past roughly ``max_size`` bytes.
+
+    Trees are loaded with :func:`~libcst.load_binary`, so only point this at a
+    directory that nobody else can write to.
+    """
+
+    def __init__(
+        self, directory: Union[str, Path], *, max_size: int = _DEFAULT_MAX_SIZE
+    ) -> None:
+        self.directory: Path = Path(directory)
+        self.max_size: int = max_size
+        # How many bytes this process wrote since it last checked the cache size.
+        self._written: int = 0
+
+    def parse_module(
+        self,
+        source: Union[str, bytes],
+        config: PartialParserConfig = _DEFAULT_PARTIAL_PARSER_CONFIG,
+    ) -> Module:
+        """
+        Behaves like :func:`~libcst.parse_module`, but loads the tree from the cache
+        if possible, and stores it in the cache otherwise.
+        """
+        path = self._path(source, config)
+        entry = self._read(path)
+        if entry is not None:
+            has_tree, parse_seconds, payload = entry
+            if not has_tree:
+                self._touch(path)
+                return parse_module(source, config)
+            start = time.perf_counter()
+            module = self._load(payload)
+            if module is not None:
+                if time.perf_counter() - start > parse_seconds:
+                    self._write(path, False, parse_seconds, b"")
+                else:
+                    self._touch(path)
+                return module
+
+        start = time.perf_counter()
+        module = parse_module(source, config)
+        parse_seconds = time.perf_counter() - start
+        payload = zlib.compress(dump_binary(module), 1)
+        self._write(path, True, parse_seconds, payload)
+        return module
+
+    def _path(self, source: Union[str, bytes], config: PartialParserConfig) -> Path:
+        key = hashlib.blake2b(digest_size=20)
+        for part in (
+            _LIBCST_VERSION,
+            "native" if is_native() else "pure",
+            sys.version,
+            repr(config),
+            type(source).__name__,
+        ):
+            key.update(part.encode("utf-8"))
+            key.update(b"\0")
+        key.update(source.encode("utf-8") if isinstance(source, str) else source)
+        digest = key.hexdigest()
+        return self.directory / digest[:2] / digest[2:]
+
+    def _read(self, path: Path) -> Optional[Tuple[bool, float, bytes]]:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, has_tree, parse_seconds = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            return None
+        return has_tree, parse_seconds, data[_HEADER.size :]
+
+    def _load(self, payload: bytes) -> Optional[Module]:
+        try:
+            return load_binary(zlib.decompress(payload))
+        except (ValueError, zlib.error):
+            # A corrupted entry is just a cache miss, it'll be overwritten.
+            return None
+
+    def _touch(self, path: Path) -> None:
+        # The modification time is what eviction uses to find the least recently
+        # used entries.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(
+        self, path: Path, has_tree: bool, parse_seconds: float, payload: bytes
+    ) -> None:
+        data = _HEADER.pack(_MAGIC, has_tree, parse_seconds) + payload
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    fp.write(data)
+                # Readers in other processes see either the old or the new entry,
+                # never a partially written one.
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            # Failing to write to the cache shouldn't fail the parse.
+            return
+        self._written += len(data)
+        if self._written > self.max_size // 16:
+            self._written = 0
+            self._evict()
+
+    def _evict(self) -> None:
+        entries: List[Tuple[float, int, str]] = []
+        total = 0
+        try:
+            subdirectories = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for subdirectory in subdirectories:
+            try:
+                for entry in os.scandir(subdirectory.path):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            except OSError:
+                # Another process may be evicting at the same time.
+                continue
+        if total <= self.max_size:
+            return
+        # Leave some headroom, so we don't have to evict again right away.
+        target = self.max_size * 3 // 4
+        for _, size, entry_path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                pass
+            total -= size
@@ -10,17 +10,22 @@ information
 """
 
 import os
+import re
+from bisect import bisect_right
 from functools import partial
-from typing import Union
+from typing import List, Optional, Pattern, Sequence, Tuple, Union
 
-from libcst._nodes.base import CSTNode
+from libcst._exceptions import ParserSyntaxError
+from libcst._nodes.base import _trusted_construction, CSTNode, CSTValidationError
+from libcst._nodes.deep_equals import deep_equals
 from libcst._nodes.expression import BaseExpression
 from libcst._nodes.module import Module
 from libcst._nodes.statement import BaseCompoundStatement, SimpleStatementLine
 from libcst._parser.detect_config import convert_to_utf8, detect_config
 from libcst._parser.grammar import get_grammar, validate_grammar
+from libcst._parser.lazy import LazyStatementSequence
 from libcst._parser.python_parser import PythonCSTParser
-from libcst._parser.types.config import PartialParserConfig
+from libcst._parser.types.config import AutoConfig, PartialParserConfig
 
 _DEFAULT_PARTIAL_PARSER_CONFIG: PartialParserConfig = PartialParserConfig()
 
@@ -30,6 +35,19 @@ def is_native() -> bool:
     return typ != "pure"
 
 
+def _native_python_version(config: PartialParserConfig) -> Optional[Tuple[int, int]]:
+    """
+    The version the native grammar should be restricted to. The version is only
+    passed on when the caller explicitly configured one: an auto-detected version is
+    capped at the newest version the pure parser knows about, and would make the
+    native parser reject newer syntax that it supports.
+    """
+    if isinstance(config.python_version, AutoConfig):
+        return None
+    version = config.parsed_python_version
+    return (version.major, version.minor)
+
+
 def _parse(
     entrypoint: str,
     source: Union[str, bytes],
@@ -42,6 +60,7 @@ def _parse(
         from libcst.native import parse_expression, parse_module, parse_statement
 
         encoding, source_str = convert_to_utf8(source, partial=config)
+        python_version = _native_python_version(config)
 
         if entrypoint == "file_input":
             parse = partial(parse_module, encoding=encoding)
@@ -52,7 +71,7 @@ def _parse(
         else:
             raise ValueError(f"Unknown parser entry point: {entrypoint}")
 
-        return parse(source_str)
+        return parse(source_str, python_version=python_version)
     return _pure_python_parse(
         entrypoint,
         source,
@@ -86,14 +105,55 @@ def _pure_python_parse(
         start_nonterminal=entrypoint,
     )
     # The parser has an Any return type, we can at least refine it to CSTNode here.
-    result = parser.parse()
+    with _trusted_construction():
+        result = parser.parse()
     assert isinstance(result, CSTNode)
     return result
 
 
+def _parse_module_lazy(
+    source: Union[str, bytes], config: PartialParserConfig
+) -> Module:
+    from libcst.native import parse_module_lazy
+
+    encoding, source_str = convert_to_utf8(source, partial=config)
+    python_version = _native_python_version(config)
+    (
+        header,
+        footer,
+        default_indent,
+        default_newline,
+        has_trailing_newline,
+        offsets,
+        indented,
+    ) = parse_module_lazy(source_str, encoding, python_version=python_version)
+    # The native parser strips the BOM before computing offsets
+    if source_str.startswith("\ufeff"):
+        source_str = source_str[1:]
+    body = LazyStatementSequence(
+        source_str,
+        offsets,
+        indented,
+        default_indent=default_indent,
+        default_newline=default_newline,
+        config=config,
+    )
+    return Module(
+        body=body,
+        header=header,
+        footer=footer,
+        encoding=encoding,
+        default_indent=default_indent,
+        default_newline=default_newline,
+        has_trailing_newline=has_trailing_newline,
+    )
+
+
 def parse_module(
     source: Union[str, bytes],  # the only entrypoint that accepts bytes
     config: PartialParserConfig = _DEFAULT_PARTIAL_PARSER_CONFIG,
+    *,
+    lazy: bool = False,
 ) -> Module:
     """
     Accepts an entire python module, including all leading and trailing whitespace.
@@ -105,7 +165,20 @@ def parse_module(
     code using :class:`~libcst.Module`'s code attribute, and when calling it with
     bytes you access the serialized code using :class:`~libcst.Module`'s bytes
     attribute.
+
+    If ``lazy`` is ``True`` and the native parser is in use, the whole module is still
+    parsed and syntax errors are raised immediately, but each top-level statement in
+    :attr:`~libcst.Module.body` is only converted into python nodes the first time
+    it's accessed (by indexing, iteration, or a visitor descending into it). The
+    resulting tree behaves exactly like an eagerly parsed one, but each statement is
+    parsed again on its own when it's first accessed, so materializing every statement
+    is slower than an eager parse. This only pays off for workloads that look at a
+    fraction of the statements; ``scripts/lazy_benchmark.py`` measures where the
+    break-even is (around half of the statements on the bundled fixtures). With the
+    pure python parser, ``lazy`` has no effect.
     """
+    if lazy and is_native():
+        return _parse_module_lazy(source, config)
     result = _parse(
         "file_input",
         source,
@@ -117,6 +190,159 @@ def parse_module(
     return result
 
 
+_INDENTATION_RE: Pattern[str] = re.compile(r"[ \t\f]*")
+
+
+def _apply_edits(source: str, edits: Sequence[Tuple[int, int, str]]) -> str:
+    parts: List[str] = []
+    position = 0
+    for edit in sorted(edits, key=lambda edit: (edit[0], edit[1])):
+        start, end, replacement = edit
+        if not position <= start <= end <= len(source):
+            raise ValueError(f"Edit {edit!r} is out of bounds or overlaps another edit")
+        parts.append(source[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(source[position:])
+    return "".join(parts)
+
+
+def _changes_lines(source: str, start: int, end: int, replacement: str) -> bool:
+    """
+    Whether an edit adds or removes line breaks, or changes the indentation of the
+    line it's on.
+    """
+    for text in (source[start:end], replacement):
+        if "\n" in text or "\r" in text:
+            return True
+    line_start = max(source.rfind("\n", 0, start), source.rfind("\r", 0, start)) + 1
+    # pyre-fixme[16]: The pattern matches the empty string, so it always matches.
+    indentation = _INDENTATION_RE.match(source, line_start).group()
+    if start > line_start + len(indentation):
+        return False
+    head = source[line_start:start] + replacement
+    # pyre-fixme[16]: The pattern matches the empty string, so it always matches.
+    new_indentation = _INDENTATION_RE.match(head).group()
+    if len(new_indentation) == len(head):
+        # pyre-fixme[16]: The pattern matches the empty string, so it always matches.
+        new_indentation += _INDENTATION_RE.match(source, end).group()
+    return new_indentation != indentation
+
+
+def _parse_edited_statement(
+    old_module: Module,
+    old_source: str,
+    new_source: str,
+    edits: Sequence[Tuple[int, int, str]],
+    config: PartialParserConfig,
+) -> Optional[Module]:
+    body = old_module.body
+    if not isinstance(body, LazyStatementSequence):
+        body = LazyStatementSequence.from_module(old_module, old_source, config)
+    offsets = body.offsets
+    index = bisect_right(offsets, min(edit[0] for edit in edits)) - 1
+    if not 0 <= index < len(body):
+        # The edits start in the header or the footer.
+        return None
+    if max(edit[1] for edit in edits) > offsets[index + 1]:
+        # The edits span more than one statement.
+        return None
+    if any(_changes_lines(old_source, *edit) for edit in edits):
+        return None
+    delta = len(new_source) - len(old_source)
+    if (
+        "__future__" in old_source[offsets[index] : offsets[index + 1]]
+        or "__future__" in new_source[offsets[index] : offsets[index + 1] + delta]
+    ):
+        # Future imports can change how the rest of the module is parsed, whether
+        # the edit removes one or adds one.
+        return None
+    result = body.reparse_statement(index, new_source)
+    if result is None:
+        return None
+    new_body, reparsed = result
+    if index < len(body) - 1:
+        return old_module.with_changes(body=new_body)
+    footer = old_module.footer
+    if not deep_equals(footer, reparsed.footer):
+        footer = reparsed.footer
+    return old_module.with_changes(
+        body=new_body,
+        footer=footer,
+        has_trailing_newline=reparsed.has_trailing_newline,
+    )
+
+
+def parse_module_incremental(
+    old_module: Module,
+    old_source: str,
+    edits: Sequence[Tuple[int, int, str]],
+    config: PartialParserConfig = _DEFAULT_PARTIAL_PARSER_CONFIG,
+) -> Module:
+    """
+    Parses the code that results from applying ``edits`` to ``old_source``, reusing
+    as much as possible of ``old_module``, which must be the result of parsing
+    ``old_source`` with the same ``config``. Each edit is a
+    ``(start, end, replacement)`` tuple, which replaces ``old_source[start:end]``
+    with ``replacement``. Edits may not overlap.
+
+    When all of the edits fall inside a single top-level statement, without adding
+    or removing line breaks or changing the indentation of a line, only that
+    statement is reparsed. Every other statement in the returned module's body is
+    the very same node as in ``old_module``. In all other cases, this falls back to
+    parsing the whole new source.
+
+    The returned module remembers where its statements are in the new source, which
+    keeps the next incremental parse cheap. If ``old_module`` doesn't come from
+    :func:`parse_module_incremental` or a lazy :func:`parse_module`, its code has to
+    be generated first to find them.
+    """
+    new_source = _apply_edits(old_source, edits)
+    if new_source == old_source:
+        return old_module
+    module = _parse_edited_statement(old_module, old_source, new_source, edits, config)
+    if module is None:
+        module = parse_module(new_source, config, lazy=True)
+    return module
+
+
+def parse_modules(
+    sources: Sequence[Union[str, bytes]],
+    config: PartialParserConfig = _DEFAULT_PARTIAL_PARSER_CONFIG,
+) -> List[Union[Module, ParserSyntaxError, CSTValidationError]]:
+    """
+    Parses many modules at once, applying the same ``config`` to every source.
+    Returns one entry per source, in order: either the parsed
+    :class:`~libcst.Module`, or the :class:`~libcst.ParserSyntaxError` (or
+    :class:`~libcst.CSTValidationError`) that parsing it raised. A syntax error in
+    one source doesn't prevent the others from being parsed.
+
+    With the native parser, tokenizing and parsing run on a pool of native threads
+    without holding the GIL, so a single process can use every core for the parse
+    phase. Only the final conversion into python nodes holds the GIL.
+    """
+    if is_native():
+        from libcst.native import parse_modules as native_parse_modules
+
+        encodings = []
+        source_strs = []
+        for source in sources:
+            encoding, source_str = convert_to_utf8(source, partial=config)
+            encodings.append(encoding)
+            source_strs.append(source_str)
+        return native_parse_modules(
+            source_strs, encodings, python_version=_native_python_version(config)
+        )
+
+    results: List[Union[Module, ParserSyntaxError, CSTValidationError]] = []
+    for source in sources:
+        try:
+            results.append(parse_module(source, config))
+        except (ParserSyntaxError, CSTValidationError) as e:
+            results.append(e)
+    return results
+
+
 def parse_statement(
     source: str, config: PartialParserConfig = _DEFAULT_PARTIAL_PARSER_CONFIG
 ) -> Union[SimpleStatementLine, BaseCompoundStatement]:
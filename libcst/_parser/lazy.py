@@ -0,0 +1,268 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Support for parsing a module lazily (see the ``lazy`` argument of
+:func:`~libcst.parse_module`). The whole module is parsed and validated up front by the
+native parser, but each top-level statement is only converted into python nodes the
+first time it's accessed.
+"""
+
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    overload,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from libcst._exceptions import ParserSyntaxError
+from libcst._parser.types.config import PartialParserConfig
+
+if TYPE_CHECKING:
+    from libcst._nodes.module import Module
+    from libcst._nodes.statement import BaseCompoundStatement, SimpleStatementLine
+
+    _Statement = Union[SimpleStatementLine, BaseCompoundStatement]
+
+
+def leading_lines_indented(statement: "_Statement") -> bool:
+    """
+    The ``indented`` flag of a statement, see :class:`LazyStatementSequence`. The
+    native parser computes it the same way in ``parse_module_lazy``.
+    """
+    return all(line.indent for line in statement.leading_lines)
+
+
+class LazyStatementSequence(Sequence["_Statement"]):
+    """
+    The ``body`` of a lazily parsed :class:`~libcst.Module`.
+
+    Statement ``i`` spans ``source[offsets[i]:offsets[i + 1]]``. Top-level statements
+    always start at column zero, so a statement can be re-parsed on its own, as long as
+    it's surrounded by enough context for the parser to make the same decisions it
+    made while parsing the whole module:
+
+    - A prefix made of an indented block followed by a simple statement. It fixes the
+      inferred default indent and newline to the module's, and it stops any leading
+      lines of our statement from being attributed to a previous block's footer.
+    - For all but the last statement, a simple statement at column zero, standing in
+      for the next statement. The last statement is followed by the module's footer,
+      just like in the original source, so end-of-file handling is identical.
+
+    The one thing that context can't reproduce is the ``indent`` flag of the leading
+    lines, which is ``False`` when the previous statement ends with an indented block.
+    ``indented[i]`` carries that flag over from the full parse for statement ``i``, see
+    :func:`leading_lines_indented`.
+
+    Statements are parsed with the ``config`` the module was parsed with, which is
+    kept instead of a parse function so that lazily parsed modules can be pickled and
+    copied like any other.
+
+    Materialized statements are cached, so accessing the same index twice returns the
+    same node.
+
+    The same context is used by :func:`~libcst.parse_module_incremental` to reparse a
+    single edited statement, see :meth:`reparse_statement`.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        offsets: Sequence[int],
+        indented: Sequence[bool],
+        *,
+        default_indent: str,
+        default_newline: str,
+        config: PartialParserConfig,
+        statements: Optional[Mapping[int, "_Statement"]] = None,
+    ) -> None:
+        self._source = source
+        self._offsets = offsets
+        self._indented = indented
+        self._default_indent = default_indent
+        self._default_newline = default_newline
+        self._config = config
+        self._prefix: str = (
+            f"if 1:{default_newline}{default_indent}pass{default_newline}"
+            + f"pass{default_newline}"
+        )
+        self._suffix: str = f"pass{default_newline}"
+        self._statements: Dict[int, "_Statement"] = dict(statements or {})
+
+    @classmethod
+    def from_module(
+        cls, module: "Module", source: str, config: PartialParserConfig
+    ) -> "LazyStatementSequence":
+        """
+        Wraps the body of an already parsed ``module``, whose code is ``source``. All
+        of its statements count as materialized. This generates the code for every
+        statement to find the offsets, so it isn't cheap.
+        """
+        offsets = [sum(len(module.code_for_node(line)) for line in module.header)]
+        for statement in module.body:
+            offsets.append(offsets[-1] + len(module.code_for_node(statement)))
+        # Without a trailing newline, the module's code leaves out the last statement's
+        # newline.
+        offsets[-1] = min(offsets[-1], len(source))
+        return cls(
+            source,
+            offsets,
+            [leading_lines_indented(statement) for statement in module.body],
+            default_indent=module.default_indent,
+            default_newline=module.default_newline,
+            config=config,
+            statements=dict(enumerate(module.body)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> "_Statement": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Tuple["_Statement", ...]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union["_Statement", Tuple["_Statement", ...]]:
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("statement index out of range")
+        statement = self._statements.get(index)
+        if statement is None:
+            # setdefault is atomic, so racing threads agree on a single node.
+            statement = self._statements.setdefault(index, self._materialize(index))
+        return statement
+
+    def __iter__(self) -> Iterator["_Statement"]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def materialized_count(self) -> int:
+        """
+        How many statements have been converted into python nodes so far.
+        """
+        return len(self._statements)
+
+    @property
+    def offsets(self) -> Sequence[int]:
+        """
+        ``offsets[0]`` is the offset at which the first statement starts, and
+        ``offsets[i + 1]`` is the offset at which statement ``i`` ends.
+        """
+        return self._offsets
+
+    def reparse_statement(
+        self, index: int, source: str
+    ) -> Optional[Tuple["LazyStatementSequence", "Module"]]:
+        """
+        Reparses statement ``index`` after an edit that only touched that statement,
+        and that turned our source into ``source``. Returns the body for ``source``
+        and the module the statement was reparsed in (which also holds the module's
+        footer if ``index`` is the last statement).
+
+        Returns ``None`` when the statement can't be reparsed on its own: when it no
+        longer parses, when it isn't a single statement anymore, or when its
+        boundaries moved. Only a full parse gives the right answer then.
+        """
+        offsets = self._offsets
+        delta = len(source) - len(self._source)
+        start = offsets[index]
+        end = offsets[index + 1] + delta
+        text = source[start:end]
+        is_last = index == len(self) - 1
+        # Unlike _materialize, we follow the statement with the real next statement,
+        # to find out whether the edit changed where this statement ends.
+        if is_last:
+            following = source[end:]
+        else:
+            following = source[end : offsets[index + 2] + delta]
+        try:
+            module = self._parse(self._prefix + text + following)
+        except ParserSyntaxError:
+            return None
+        body = module.body
+        if len(body) != (3 if is_last else 4):
+            return None
+        statement = body[2]
+        length = len(module.code_for_node(statement))
+        if is_last and not module.has_trailing_newline and not module.footer:
+            # The module's code leaves out the statement's final newline.
+            length -= len(module.default_newline)
+        if length != len(text):
+            return None
+        if index == 0 and statement.leading_lines:
+            # These would've been part of the module's header.
+            return None
+
+        statements = dict(self._statements)
+        statements[index] = self._with_indent(statement, self._indented[index])
+        indented = list(self._indented)
+        if not is_last:
+            # The edit may have changed whether this statement ends in an indented
+            # block, which is what the next statement's leading lines depend on.
+            next_indented = leading_lines_indented(body[3])
+            if next_indented != indented[index + 1]:
+                indented[index + 1] = next_indented
+                statements.pop(index + 1, None)
+        new_offsets: List[int] = [*offsets[: index + 1]]
+        new_offsets.extend(offset + delta for offset in offsets[index + 1 :])
+        sequence = LazyStatementSequence(
+            source,
+            new_offsets,
+            indented,
+            default_indent=self._default_indent,
+            default_newline=self._default_newline,
+            config=self._config,
+            statements=statements,
+        )
+        return sequence, module
+
+    def _parse(self, source: str) -> "Module":
+        # Imported here, since the entrypoints depend on this module.
+        from libcst._parser.entrypoints import parse_module
+
+        return parse_module(source, self._config)
+
+    def _materialize(self, index: int) -> "_Statement":
+        source = self._source
+        offsets = self._offsets
+        text = source[offsets[index] : offsets[index + 1]]
+        if index == len(self) - 1:
+            expected_len = 3
+            text = self._prefix + text + source[offsets[index + 1] :]
+        else:
+            expected_len = 4
+            text = self._prefix + text + self._suffix
+        body = self._parse(text).body
+        if len(body) != expected_len:
+            # This shouldn't happen, but if we ever misjudge the context a statement
+            # needs, parsing the whole module is always correct.
+            for i, statement in enumerate(self._parse(source).body):
+                self._statements.setdefault(i, statement)
+            return self._statements[index]
+        return self._with_indent(body[2], self._indented[index])
+
+    @staticmethod
+    def _with_indent(statement: "_Statement", indented: bool) -> "_Statement":
+        if indented:
+            return statement
+        return statement.with_changes(
+            leading_lines=[
+                line.with_changes(indent=False) for line in statement.leading_lines
+            ]
+        )
@@ -0,0 +1,172 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import pickle
+from typing import List
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+from libcst._parser.lazy import LazyStatementSequence, leading_lines_indented
+from libcst._parser.types.config import PartialParserConfig
+from libcst.testing.utils import data_provider, UnitTest
+
+_SOURCES = {
+    "empty": {"code": ""},
+    "single_statement": {"code": "x = 1\n"},
+    "no_trailing_newline": {"code": "import os\nx = 1"},
+    "header_and_footer": {
+        "code": "# header\n\nimport os\n\n# leading\nx = 1\n\n# footer\n",
+    },
+    "footer_without_trailing_newline": {"code": "x = 1\n# footer"},
+    "blocks": {
+        "code": (
+            "def f(a, b):\n"
+            + "    if a:\n"
+            + "        return b\n"
+            + "    # block footer\n"
+            + "\n"
+            + "# leading comment\n"
+            + "class C:\n"
+            + "    x: int = 1\n"
+            + "\n"
+            + "\n"
+            + "f(1, 2)\n"
+        ),
+    },
+    "indented_comment_after_simple_statement": {
+        "code": "x = 1\n    # indented\ny = 2\n",
+    },
+    "trailing_block": {"code": "x = 1\nif x:\n    pass\n    # comment\n"},
+    "trailing_block_with_footer": {
+        "code": "if x:\n    pass\n    # indented\n# not indented\n",
+    },
+    "tabs_and_crlf": {
+        "code": "if x:\r\n\tif y:\r\n\t\tpass\r\nz = (\r\n\t1,\r\n)\r\n",
+    },
+    "dedented_comment_after_nested_block": {
+        "code": "if a:\n    if b:\n        pass\n  # dedented\n\nx = 1\n",
+    },
+    "decorators": {
+        "code": "if a:\n    pass\n\n@d\n# between\ndef f():\n    pass\n",
+    },
+    "odd_indent": {"code": "x = 1\nwhile x:\n  x -= 1\nfor y in z:\n  pass\n"},
+    "semicolons_and_continuations": {
+        "code": "a = 1; b = 2\nc = \\\n    3\nd = '''\nstring\n'''\n",
+    },
+}
+
+
+def _offsets(module: cst.Module) -> List[int]:
+    """
+    Computes the statement offsets the native parser would hand us for ``module``.
+    """
+    offsets = [sum(len(module.code_for_node(line)) for line in module.header)]
+    for statement in module.body:
+        offsets.append(offsets[-1] + len(module.code_for_node(statement)))
+    return offsets
+
+
+class LazyStatementSequenceTest(UnitTest):
+    def _lazy_body(self, module: cst.Module, code: str) -> LazyStatementSequence:
+        return LazyStatementSequence(
+            code,
+            _offsets(module),
+            [leading_lines_indented(statement) for statement in module.body],
+            default_indent=module.default_indent,
+            default_newline=module.default_newline,
+            config=PartialParserConfig(),
+        )
+
+    @data_provider(_SOURCES)
+    def test_materialized_statements_match(self, code: str) -> None:
+        module = cst.parse_module(code)
+        lazy_body = self._lazy_body(module, code)
+        self.assertEqual(len(lazy_body), len(module.body))
+        for expected, actual in zip(module.body, lazy_body):
+            self.assertTrue(
+                expected.deep_equals(actual),
+                f"{expected!r}\ndoes not equal\n{actual!r}",
+            )
+        self.assertEqual(module.with_changes(body=lazy_body).code, code)
+
+    def test_materializes_on_demand(self) -> None:
+        code = "a = 1\nb = 2\nc = 3\n"
+        lazy_body = self._lazy_body(cst.parse_module(code), code)
+        self.assertEqual(lazy_body.materialized_count, 0)
+        last = lazy_body[-1]
+        self.assertEqual(lazy_body.materialized_count, 1)
+        self.assertIs(lazy_body[2], last)
+        self.assertEqual(len(lazy_body[:2]), 2)
+        self.assertEqual(lazy_body.materialized_count, 3)
+        with self.assertRaises(IndexError):
+            lazy_body[3]
+
+    def test_pickle_and_copy(self) -> None:
+        code = _SOURCES["blocks"]["code"]
+        module = cst.parse_module(code)
+        lazy_module = module.with_changes(body=self._lazy_body(module, code))
+        for copied in (
+            pickle.loads(pickle.dumps(lazy_module)),
+            copy.deepcopy(lazy_module),
+            copy.copy(lazy_module),
+        ):
+            self.assertEqual(copied.code, code)
+            self.assertTrue(module.deep_equals(copied))
+
+
+class ParseModuleLazyTest(UnitTest):
+    @data_provider(_SOURCES)
+    def test_parse_module_lazy(self, code: str) -> None:
+        eager = cst.parse_module(code)
+        lazy = cst.parse_module(code, lazy=True)
+        self.assertEqual(lazy.code, code)
+        self.assertTrue(eager.deep_equals(lazy))
+
+    @data_provider(_SOURCES)
+    def test_native_offsets_and_indented(self, code: str) -> None:
+        if not is_native():
+            self.skipTest("pure python parser doesn't have native bindings")
+        from libcst.native import parse_module_lazy
+
+        module = cst.parse_module(code)
+        *_, offsets, indented = parse_module_lazy(code, None)
+        self.assertEqual(offsets, _offsets(module))
+        self.assertEqual(
+            indented, [leading_lines_indented(statement) for statement in module.body]
+        )
+
+    def test_syntax_errors_are_eager(self) -> None:
+        with self.assertRaises(cst.ParserSyntaxError):
+            cst.parse_module("x = 1\ndef (:\n", lazy=True)
+
+    def test_pickle_and_copy(self) -> None:
+        code = _SOURCES["blocks"]["code"]
+        start = code.index("1, 2")
+        edit = (start, start + len("1, 2"), "3, 4")
+        for module in (
+            cst.parse_module(code, lazy=True),
+            cst.parse_module_incremental(cst.parse_module(code), code, [edit]),
+        ):
+            expected = module.code
+            for copied in (pickle.loads(pickle.dumps(module)), copy.deepcopy(module)):
+                self.assertEqual(copied.code, expected)
+        self.assertEqual(expected, code.replace("f(1, 2)", "f(3, 4)"))
+
+    def test_visitors(self) -> None:
+        code = _SOURCES["blocks"]["code"]
+
+        class NameCollector(cst.CSTVisitor):
+            def __init__(self) -> None:
+                self.names: List[str] = []
+
+            def visit_Name(self, node: cst.Name) -> None:
+                self.names.append(node.value)
+
+        eager_names = NameCollector()
+        cst.parse_module(code).visit(eager_names)
+        lazy_names = NameCollector()
+        cst.parse_module(code, lazy=True).visit(lazy_names)
+        self.assertEqual(eager_names.names, lazy_names.names)
@@ -0,0 +1,94 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List
+from unittest.mock import patch
+
+import libcst as cst
+from libcst._parser import cache
+from libcst.testing.utils import UnitTest
+
+
+def _entries(directory: str) -> List[Path]:
+    return [path for path in Path(directory).glob("*/*") if path.is_file()]
+
+
+class ParseCacheTest(UnitTest):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.cache = cst.ParseCache(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_hit(self) -> None:
+        code = "def f(a):\n    return a  # comment\n"
+        first = self.cache.parse_module(code)
+        self.assertEqual(len(_entries(self.directory.name)), 1)
+        with patch.object(cache, "parse_module") as parse_module:
+            second = self.cache.parse_module(code)
+            parse_module.assert_not_called()
+        self.assertIsNot(first, second)
+        self.assertTrue(first.deep_equals(second))
+        self.assertEqual(second.code, code)
+
+    def test_key(self) -> None:
+        self.cache.parse_module("x = 1\n")
+        self.cache.parse_module(b"x = 1\n")
+        self.cache.parse_module("x = 2\n")
+        self.cache.parse_module(
+            "x = 1\n", cst.PartialParserConfig(default_newline="\r\n")
+        )
+        self.assertEqual(len(_entries(self.directory.name)), 4)
+
+    def test_corrupted_entry(self) -> None:
+        self.cache.parse_module("x = 1\n")
+        (entry,) = _entries(self.directory.name)
+        for data in [b"", b"garbage", entry.read_bytes()[:-4]]:
+            entry.write_bytes(data)
+            module = self.cache.parse_module("x = 1\n")
+            self.assertEqual(module.code, "x = 1\n")
+            self.assertTrue(module.deep_equals(cst.parse_module("x = 1\n")))
+
+    def test_slow_load_writes_marker(self) -> None:
+        self.cache.parse_module("x = 1\n")
+        (entry,) = _entries(self.directory.name)
+        size = entry.stat().st_size
+        # Pretend the source parsed instantly, so loading it is always slower.
+        entry.write_bytes(
+            cache._HEADER.pack(cache._MAGIC, True, 0.0)
+            + entry.read_bytes()[cache._HEADER.size :]
+        )
+        self.assertEqual(self.cache.parse_module("x = 1\n").code, "x = 1\n")
+        self.assertLess(entry.stat().st_size, size)
+        with patch.object(cache, "parse_module", wraps=cst.parse_module) as parse:
+            self.assertEqual(self.cache.parse_module("x = 1\n").code, "x = 1\n")
+            parse.assert_called_once()
+
+    def test_eviction(self) -> None:
+        small = cst.ParseCache(self.directory.name, max_size=1)
+        small.parse_module("x = 1\n")
+        small.parse_module("x = 2\n")
+        self.assertEqual(len(_entries(self.directory.name)), 0)
+
+        sources = [f"x = {i}\n" for i in range(10)]
+        for source in sources:
+            self.cache.parse_module(source)
+        size = sum(entry.stat().st_size for entry in _entries(self.directory.name))
+        bounded = cst.ParseCache(self.directory.name, max_size=size // 2)
+        bounded.parse_module(sources[-1] + "y = 1\n")
+        remaining = _entries(self.directory.name)
+        self.assertLess(len(remaining), len(sources))
+        self.assertLessEqual(
+            sum(entry.stat().st_size for entry in remaining), size * 3 // 8
+        )
+
+    def test_unwritable_directory(self) -> None:
+        path = Path(self.directory.name) / "file"
+        path.write_text("")
+        module = cst.ParseCache(path).parse_module("x = 1\n")
+        self.assertEqual(module.code, "x = 1\n")
@@ -6,7 +6,7 @@
 
 from textwrap import dedent
 from typing import Callable
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import libcst as cst
 from libcst._nodes.base import CSTValidationError
@@ -178,7 +178,37 @@ class ParseErrorsTest(UnitTest):
             self.assertEqual(str(cm.exception), expected)
 
     def test_native_fallible_into_py(self) -> None:
-        with patch("libcst._nodes.expression.Name._validate") as await_validate:
-            await_validate.side_effect = CSTValidationError("validate is broken")
-            with self.assertRaises((SyntaxError, cst.ParserSyntaxError)):
-                cst.parse_module("foo")
+        # The native parser caches the trusted constructor of each node class, so
+        # break the constructor itself instead of patching the lookup.
+        constructor = cst.Name._trusted_constructor()
+        with patch.dict(
+            constructor.__globals__,
+            {"_new": Mock(side_effect=CSTValidationError("constructor is broken"))},
+        ):
+            with self.assertRaises(CSTValidationError):
+                constructor(value="foo")
+            if is_native():
+                with self.assertRaises((SyntaxError, cst.ParserSyntaxError)):
+                    cst.parse_module("foo")
+
+    def test_parser_skips_validation(self) -> None:
+        with patch.object(cst.Name, "_validate", autospec=True) as name_validate:
+            self.assertEqual(cst.parse_module("foo").code, "foo")
+            name_validate.assert_not_called()
+            # Nodes that users construct are still validated.
+            cst.Name("foo")
+            name_validate.assert_called_once()
+
+    def test_native_parser_skips_validation(self) -> None:
+        if not is_native():
+            self.skipTest("pure python parser doesn't convert nodes from rust")
+        from libcst.native import parse_expression, parse_module, parse_modules
+
+        with patch.object(cst.Name, "_validate", autospec=True) as name_validate:
+            module = parse_module("foo(bar)\n", None)
+            self.assertEqual(module.code, "foo(bar)\n")
+            (batched,) = parse_modules(["foo(bar)\n"], [None])
+            self.assertTrue(module.deep_equals(batched))
+            self.assertTrue(parse_expression("foo").deep_equals(cst.Name("foo")))
+            # Only the Name constructed just above is validated.
+            name_validate.assert_called_once()
@@ -0,0 +1,135 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Sequence, Tuple
+
+import libcst as cst
+from libcst._parser.entrypoints import _apply_edits
+from libcst.testing.utils import data_provider, UnitTest
+
+_Edit = Tuple[int, int, str]
+
+
+def _replace(source: str, old: str, new: str) -> _Edit:
+    start = source.index(old)
+    return (start, start + len(old), new)
+
+
+_BLOCKS = (
+    "def f(a):\n"
+    + "    if a:\n"
+    + "        return 1\n"
+    + "    # block footer\n"
+    + "\n"
+    + "# leading comment\n"
+    + "class C:\n"
+    + "    x: int = 1\n"
+    + "\n"
+    + "\n"
+    + "f(1)\n"
+    + "# footer\n"
+)
+
+
+class ParseModuleIncrementalTest(UnitTest):
+    def _check(
+        self, source: str, edits: Sequence[_Edit], incremental: bool
+    ) -> cst.Module:
+        old_module = cst.parse_module(source)
+        new_module = cst.parse_module_incremental(old_module, source, edits)
+        new_source = _apply_edits(source, edits)
+        self.assertEqual(new_module.code, new_source)
+        expected = cst.parse_module(new_source)
+        self.assertTrue(
+            expected.deep_equals(new_module), f"{expected!r}\n!=\n{new_module!r}"
+        )
+        shared = sum(old is new for old, new in zip(old_module.body, new_module.body))
+        if incremental:
+            self.assertEqual(shared, len(old_module.body) - 1)
+        else:
+            self.assertEqual(shared, 0)
+        return new_module
+
+    @data_provider(
+        {
+            "middle_statement": ("x = 1\ny = 2\nz = 3\n", "2", "22"),
+            "first_statement": ("import os\nx = 1\n", "os", "sys"),
+            "last_statement": ("x = 1\ny = 2\n# footer\n", "2", "3"),
+            "no_trailing_newline": ("x = 1\ny = 2", "2", "3"),
+            "whitespace": ("x = 1\ny = 2\n", "y =", "y  ="),
+            "nested_block": (_BLOCKS, "return 1", "return 2"),
+            "block_footer": (_BLOCKS, "# block footer", "# footer of the block"),
+            "after_block": (_BLOCKS, "class C", "class D"),
+            "leading_comment": (_BLOCKS, "# leading comment", "# comment"),
+            "last_after_block": (_BLOCKS, "f(1)", "f(2)"),
+        }
+    )
+    def test_reparses_one_statement(self, source: str, old: str, new: str) -> None:
+        self._check(source, [_replace(source, old, new)], incremental=True)
+
+    @data_provider(
+        {
+            "spans_statements": ("x = 1\ny = 2\n", "1\ny", "1\nz"),
+            "header": ("# header\nx = 1\n", "header", "comment"),
+            "footer": ("x = 1\n# footer\n", "footer", "comment"),
+            "new_line": ("x = 1\ny = 2\n", "y = 2", "y = 2\nz = 3"),
+            "indentation": ("def f():\n    return 1\n", "    return", "  return"),
+            "unindented_footer": (_BLOCKS, "    # block footer", "# block footer"),
+            "future_import": (
+                "from __future__ import annotations\nx = 1\n",
+                "annotations",
+                "generator_stop",
+            ),
+            "new_future_import": (
+                "from os import path\nx = 1\n",
+                "os import path",
+                "__future__ import annotations",
+            ),
+            "removed_future_import": (
+                "from __future__ import annotations\nx = 1\n",
+                "__future__ import annotations",
+                "os import path",
+            ),
+            "line_continuation": ("x = 1\ny\n", "1", "1 + \\"),
+        }
+    )
+    def test_falls_back_to_full_parse(self, source: str, old: str, new: str) -> None:
+        self._check(source, [_replace(source, old, new)], incremental=False)
+
+    def test_several_edits_in_one_statement(self) -> None:
+        source = "x = 1\ny = f(a, b)\n"
+        self._check(
+            source,
+            [_replace(source, "a", "c"), _replace(source, "b", "d")],
+            incremental=True,
+        )
+
+    def test_chained_edits(self) -> None:
+        source = _BLOCKS
+        module = cst.parse_module(source)
+        for old, new in [("return 1", "return 2"), ("f(1)", "f(3)"), ("x:", "y:")]:
+            edit = _replace(source, old, new)
+            new_module = cst.parse_module_incremental(module, source, [edit])
+            source = source[: edit[0]] + edit[2] + source[edit[1] :]
+            self.assertEqual(new_module.code, source)
+            self.assertTrue(new_module.deep_equals(cst.parse_module(source)))
+            module = new_module
+
+    def test_syntax_errors(self) -> None:
+        source = "x = 1\ny = 2\nz = 3\n"
+        module = cst.parse_module(source)
+        with self.assertRaises(cst.ParserSyntaxError):
+            cst.parse_module_incremental(module, source, [_replace(source, "1", "(1")])
+
+    def test_no_edits(self) -> None:
+        module = cst.parse_module("x = 1\n")
+        self.assertIs(cst.parse_module_incremental(module, "x = 1\n", []), module)
+
+    def test_overlapping_edits(self) -> None:
+        module = cst.parse_module("x = 1\n")
+        with self.assertRaises(ValueError):
+            cst.parse_module_incremental(module, "x = 1\n", [(0, 3, ""), (2, 4, "")])
+        with self.assertRaises(ValueError):
+            cst.parse_module_incremental(module, "x = 1\n", [(4, 10, "")])
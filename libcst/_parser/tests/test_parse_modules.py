@@ -0,0 +1,62 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+from libcst.testing.utils import UnitTest
+
+
+class ParseModulesTest(UnitTest):
+    def test_results_in_order(self) -> None:
+        sources = ["a = 1\n", "def f():\n    pass\n", "", "import os"]
+        results = cst.parse_modules(sources)
+        self.assertEqual(len(results), len(sources))
+        for source, result in zip(sources, results):
+            self.assertIsInstance(result, cst.Module)
+            self.assertEqual(result.code, source)
+            self.assertTrue(result.deep_equals(cst.parse_module(source)))
+
+    def test_errors_are_per_input(self) -> None:
+        results = cst.parse_modules(["x = 1\n", "def (:\n", "y = 2\n"])
+        self.assertIsInstance(results[0], cst.Module)
+        self.assertIsInstance(results[1], cst.ParserSyntaxError)
+        self.assertIsInstance(results[2], cst.Module)
+
+    def test_bytes_and_encoding(self) -> None:
+        sources = [
+            b"# -*- coding: latin-1 -*-\nx = '\xe9'\n",
+            "x = 'é'\n",
+        ]
+        latin, utf8 = cst.parse_modules(sources)
+        self.assertIsInstance(latin, cst.Module)
+        self.assertIsInstance(utf8, cst.Module)
+        self.assertEqual(latin.encoding, "iso-8859-1")
+        self.assertEqual(latin.bytes, sources[0])
+        self.assertEqual(utf8.encoding, "utf-8")
+
+    def test_empty(self) -> None:
+        self.assertEqual(cst.parse_modules([]), [])
+
+    def test_parse_from_threads(self) -> None:
+        # The native parser releases the GIL while parsing, so these actually run at
+        # the same time.
+        sources = [f"def f{i}(a, b={i}):\n    return a + b\n" for i in range(64)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            modules = list(executor.map(cst.parse_module, sources))
+            statements = list(executor.map(cst.parse_statement, sources))
+        for source, module, statement in zip(sources, modules, statements):
+            self.assertEqual(module.code, source)
+            self.assertTrue(module.deep_equals(cst.parse_module(source)))
+            self.assertTrue(statement.deep_equals(module.body[0]))
+
+    def test_native_encodings_must_match_sources(self) -> None:
+        if not is_native():
+            self.skipTest("pure python parser doesn't have native bindings")
+        from libcst.native import parse_modules
+
+        with self.assertRaises(ValueError):
+            parse_modules(["x\n", "y\n"], [None])
@@ -0,0 +1,85 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+from libcst.testing.utils import data_provider, UnitTest
+
+
+class PythonVersionTest(UnitTest):
+    @data_provider(
+        (
+            # (code, first version that supports it, the version before that)
+            ("(x := 1)\n", "3.8", "3.7"),
+            ("def f(a, /): ...\n", "3.8", "3.7"),
+            ("lambda a, /: a\n", "3.8", "3.7"),
+            ("f'{x=}'\n", "3.8", "3.7"),
+            ("x: int = 1\n", "3.6", "3.5"),
+            ("f'{x}'\n", "3.6", "3.5"),
+            ("async def f():\n    return [x async for x in y]\n", "3.6", "3.5"),
+            ("a @ b\n", "3.5", "3.3"),
+            ("a @= b\n", "3.5", "3.3"),
+            ("async def f():\n    await x\n", "3.5", "3.3"),
+            ("def f():\n    yield from x\n", "3.3", "3.1"),
+        )
+    )
+    def test_syntax_is_gated_by_version(
+        self, code: str, supported: str, unsupported: str
+    ) -> None:
+        supported_config = cst.PartialParserConfig(python_version=supported)
+        unsupported_config = cst.PartialParserConfig(python_version=unsupported)
+        self.assertEqual(cst.parse_module(code, supported_config).code, code)
+        with self.assertRaises(cst.ParserSyntaxError):
+            cst.parse_module(code, unsupported_config)
+        [module] = cst.parse_modules([code], supported_config)
+        [error] = cst.parse_modules([code], unsupported_config)
+        self.assertIsInstance(module, cst.Module)
+        self.assertIsInstance(error, cst.ParserSyntaxError)
+
+    def test_async_is_an_identifier_before_3_7(self) -> None:
+        code = "async = await = 1\n"
+        config = cst.PartialParserConfig(python_version="3.6")
+        self.assertEqual(cst.parse_module(code, config).code, code)
+        self.assertEqual(cst.parse_statement(code, config).body[0].value.value, "1")
+
+    def test_expressions_and_statements(self) -> None:
+        config = cst.PartialParserConfig(python_version="3.7")
+        with self.assertRaises(cst.ParserSyntaxError):
+            cst.parse_expression("(x := 1)", config)
+        with self.assertRaises(cst.ParserSyntaxError):
+            cst.parse_statement("(x := 1)\n", config)
+
+    def test_newer_syntax_without_a_version(self) -> None:
+        if not is_native():
+            self.skipTest("the pure python parser doesn't support python 3.10+")
+        # The default version is capped at the newest version the pure parser knows
+        # about, which must not restrict the native parser.
+        code = "match x:\n    case _:\n        type X = int\n"
+        self.assertEqual(cst.parse_module(code).code, code)
+        self.assertEqual(cst.parse_module(code, lazy=True).code, code)
+
+    def test_native_bindings(self) -> None:
+        if not is_native():
+            self.skipTest("pure python parser doesn't have native bindings")
+        from libcst.native import (
+            parse_expression,
+            parse_module,
+            parse_module_lazy,
+            parse_modules,
+            parse_statement,
+        )
+
+        code = "(x := 1)\n"
+        self.assertEqual(parse_module(code, None, python_version=(3, 8)).code, code)
+        for parse in (
+            lambda: parse_module(code, None, python_version=(3, 7)),
+            lambda: parse_module_lazy(code, None, python_version=(3, 7)),
+            lambda: parse_statement(code, python_version=(3, 7)),
+            lambda: parse_expression("(x := 1)", python_version=(3, 7)),
+        ):
+            with self.assertRaises(cst.ParserSyntaxError):
+                parse()
+        [error] = parse_modules([code], [None], python_version=(3, 7))
+        self.assertIsInstance(error, cst.ParserSyntaxError)
@@ -0,0 +1,126 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Iterator, List, Tuple
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+from libcst._parser.tokens import _tokenize_pure
+from libcst.testing.utils import data_provider, UnitTest
+
+
+def _types_and_texts(source: str) -> List[Tuple[str, str]]:
+    return [(token.type, token.text) for token in cst.tokenize(source)]
+
+
+class TokenizeTest(UnitTest):
+    @data_provider(
+        {
+            "simple": (
+                "x = 1\n",
+                [
+                    ("NAME", "x"),
+                    ("OP", "="),
+                    ("NUMBER", "1"),
+                    ("NEWLINE", "\n"),
+                    ("ENDMARKER", ""),
+                ],
+            ),
+            "comments_are_skipped": (
+                "# comment\nf()  # comment\n",
+                [
+                    ("NAME", "f"),
+                    ("OP", "("),
+                    ("OP", ")"),
+                    ("NEWLINE", "\n"),
+                    ("ENDMARKER", ""),
+                ],
+            ),
+            "blocks": (
+                "async def f():\n    await g\n",
+                [
+                    ("ASYNC", "async"),
+                    ("NAME", "def"),
+                    ("NAME", "f"),
+                    ("OP", "("),
+                    ("OP", ")"),
+                    ("OP", ":"),
+                    ("NEWLINE", "\n"),
+                    ("INDENT", ""),
+                    ("AWAIT", "await"),
+                    ("NAME", "g"),
+                    ("NEWLINE", "\n"),
+                    ("DEDENT", ""),
+                    ("ENDMARKER", ""),
+                ],
+            ),
+            "fstring": (
+                'f"a{b}"\n',
+                [
+                    ("FSTRING_START", 'f"'),
+                    ("FSTRING_STRING", "a"),
+                    ("OP", "{"),
+                    ("NAME", "b"),
+                    ("OP", "}"),
+                    ("FSTRING_END", '"'),
+                    ("NEWLINE", "\n"),
+                    ("ENDMARKER", ""),
+                ],
+            ),
+        }
+    )
+    def test_types_and_texts(
+        self, source: str, expected: List[Tuple[str, str]]
+    ) -> None:
+        self.assertEqual(_types_and_texts(source), expected)
+
+    def test_positions(self) -> None:
+        source = "é = '''\nü'''\r\nx\n"
+        tokens = list(cst.tokenize(source))
+        self.assertEqual(
+            [
+                (t.start, t.end, t.start_line, t.start_column, t.end_line, t.end_column)
+                for t in tokens[:4]
+            ],
+            [
+                (0, 1, 1, 0, 1, 1),
+                (2, 3, 1, 2, 1, 3),
+                (4, 12, 1, 4, 2, 4),
+                (12, 14, 2, 4, 3, 0),
+            ],
+        )
+        for token in tokens:
+            self.assertEqual(source[token.start : token.end], token.text)
+
+    def test_native_matches_pure(self) -> None:
+        if not is_native():
+            self.skipTest("pure python parser doesn't have a native tokenizer")
+        from libcst.native import TokenIterator
+
+        source = "é = '''\nü'''\r\nasync def f(x):\n    return f'{x!r:>{w}}'\n"
+        self.assertIsInstance(cst.tokenize(source), TokenIterator)
+
+        def fields(tokens: Iterator[cst.Token]) -> List[Tuple[object, ...]]:
+            return [
+                (
+                    t.type,
+                    t.text,
+                    t.start,
+                    t.end,
+                    t.start_line,
+                    t.start_column,
+                    t.end_line,
+                    t.end_column,
+                )
+                for t in tokens
+            ]
+
+        self.assertEqual(fields(cst.tokenize(source)), fields(_tokenize_pure(source)))
+
+    def test_is_lazy(self) -> None:
+        tokens = cst.tokenize("x = 1\n$")
+        self.assertEqual(next(tokens).text, "x")
+        with self.assertRaises(cst.ParserSyntaxError):
+            list(tokens)
@@ -0,0 +1,137 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from itertools import accumulate
+from typing import Iterator
+
+from libcst._exceptions import ParserSyntaxError
+from libcst._parser.entrypoints import is_native
+from libcst._parser.parso.python.token import PythonTokenTypes
+from libcst._parser.parso.python.tokenize import tokenize_lines
+from libcst._parser.parso.utils import split_lines
+from libcst._parser.types.config import PartialParserConfig
+
+
+class Token:
+    """
+    A token, as produced by :func:`tokenize`. Tokens don't hold onto their text,
+    they refer to the source by offset instead. The text is only sliced out of the
+    source when :attr:`text` is accessed.
+
+    Comments and whitespace don't have tokens of their own, they're in between
+    tokens.
+    """
+
+    __slots__ = (
+        "type",
+        "start",
+        "end",
+        "start_line",
+        "start_column",
+        "end_line",
+        "end_column",
+        "_source",
+    )
+
+    #: The name of the token's type, e.g. ``"NAME"``, ``"OP"`` or ``"NEWLINE"``.
+    type: str
+    #: The offset of the token's first character in the source.
+    start: int
+    #: The offset right after the token's last character in the source.
+    end: int
+    #: The line of the token's first character (1-indexed).
+    start_line: int
+    #: The column of the token's first character (0-indexed).
+    start_column: int
+    #: The line right after the token's last character (1-indexed).
+    end_line: int
+    #: The column right after the token's last character (0-indexed).
+    end_column: int
+
+    def __init__(
+        self,
+        type: str,
+        start: int,
+        end: int,
+        start_line: int,
+        start_column: int,
+        end_line: int,
+        end_column: int,
+        source: str,
+    ) -> None:
+        self.type = type
+        self.start = start
+        self.end = end
+        self.start_line = start_line
+        self.start_column = start_column
+        self.end_line = end_line
+        self.end_column = end_column
+        self._source = source
+
+    @property
+    def text(self) -> str:
+        """
+        The token's text, sliced out of the source.
+        """
+        return self._source[self.start : self.end]
+
+    def __repr__(self) -> str:
+        return (
+            f"Token(type={self.type}, start={self.start}, end={self.end}, "
+            + f"start_line={self.start_line}, start_column={self.start_column}, "
+            + f"end_line={self.end_line}, end_column={self.end_column})"
+        )
+
+
+def _tokenize_pure(source: str) -> Iterator[Token]:
+    lines = split_lines(source, keepends=True)
+    line_offsets = [0, *accumulate(len(line) for line in lines)]
+    version = PartialParserConfig().parsed_python_version
+    for token in tokenize_lines(lines, version):
+        token_type = token.type
+        string = token.string
+        line, column = token.start_pos
+        if (
+            token_type is PythonTokenTypes.ERRORTOKEN
+            or token_type is PythonTokenTypes.ERROR_DEDENT
+        ):
+            raise ParserSyntaxError(
+                f"{string!r} is not a valid token.",
+                lines=lines,
+                raw_line=line,
+                raw_column=column,
+            )
+        type_name = token_type.name
+        if token_type is PythonTokenTypes.NAME and string in ("async", "await"):
+            type_name = string.upper()
+        start = line_offsets[line - 1] + column
+        end = start + len(string)
+        # Strings and newlines are the only tokens that can span several lines.
+        newlines = string.count("\n") + string.count("\r") - string.count("\r\n")
+        if newlines:
+            end_line = line + newlines
+            end_column = end - line_offsets[end_line - 1]
+        else:
+            end_line = line
+            end_column = column + len(string)
+        yield Token(type_name, start, end, line, column, end_line, end_column, source)
+
+
+def tokenize(source: str) -> Iterator[Token]:
+    """
+    Lazily tokenizes ``source``, which is much cheaper than parsing it when only the
+    tokens are needed, e.g. to look for a name. With the native parser, tokenizing
+    happens at native speed, and the tokens only point into ``source`` rather than
+    copying parts of it.
+
+    Raises a :class:`ParserSyntaxError` once it encounters something that isn't a
+    valid token.
+    """
+    if is_native():
+        from libcst.native import tokenize as native_tokenize
+
+        # pyre-ignore[7]: The native tokens have the same attributes as ours.
+        return native_tokenize(source)
+    return _tokenize_pure(source)
@@ -0,0 +1,199 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Works out which types of node can contain which others, going by the annotations of
+their fields, so that traversals can skip children that can't contain any of the
+nodes a visitor is interested in. See ``CSTVisitor.SKIP_UNREACHABLE_CHILDREN``.
+"""
+
+from dataclasses import fields
+from inspect import isabstract
+from typing import (
+    Collection,
+    Dict,
+    FrozenSet,
+    get_args,
+    get_origin,
+    get_type_hints,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    from libcst._nodes.base import CSTNode  # noqa: F401
+
+_NodeType = Type["CSTNode"]
+
+
+def _node_classes_in(annotation: object) -> Optional[Set[_NodeType]]:
+    # Returns the node classes mentioned by an annotation, or None if we can't tell
+    # what it might hold.
+    from libcst._nodes.base import CSTNode
+
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return set()
+    if origin is not None:
+        classes = set()
+        for arg in get_args(annotation):
+            arg_classes = _node_classes_in(arg)
+            if arg_classes is None:
+                return None
+            classes |= arg_classes
+        return classes
+    if annotation is None or annotation is type(None):
+        return set()
+    if isinstance(annotation, type):
+        return {annotation} if issubclass(annotation, CSTNode) else set()
+    # Any, a type variable, or something else we don't understand.
+    return None
+
+
+_field_annotations: Dict[_NodeType, Dict[str, Optional[Set[_NodeType]]]] = {}
+
+
+def _field_classes(node_type: _NodeType) -> Dict[str, Optional[Set[_NodeType]]]:
+    """
+    Returns the node classes that each of the fields of ``node_type`` is annotated
+    with, or None for fields whose annotations don't say.
+    """
+    try:
+        return _field_annotations[node_type]
+    except KeyError:
+        pass
+    try:
+        hints = get_type_hints(node_type)
+    except Exception:
+        hints = {}
+    annotations = _field_annotations[node_type] = {
+        f.name: _node_classes_in(hints[f.name]) if f.name in hints else None
+        for f in fields(node_type)
+    }
+    return annotations
+
+
+def _concrete_node_types() -> List[_NodeType]:
+    from libcst._nodes.base import CSTNode
+
+    seen: Set[_NodeType] = set()
+    pending: List[_NodeType] = [CSTNode]
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            if subclass not in seen:
+                seen.add(subclass)
+                pending.append(subclass)
+    return [cls for cls in seen if not isabstract(cls)]
+
+
+class NodeTypeGraph:
+    """
+    Which node types can appear as which fields of which others, for all the node
+    types that are defined when the graph is built.
+    """
+
+    def __init__(self) -> None:
+        self.node_types: List[_NodeType] = _concrete_node_types()
+        # The concrete node types that each field of each node type can hold.
+        self.children: Dict[_NodeType, Dict[str, FrozenSet[_NodeType]]] = {}
+        # The node types that can directly contain each node type.
+        self.parents: Dict[_NodeType, Set[_NodeType]] = {
+            node_type: set() for node_type in self.node_types
+        }
+        everything = frozenset(self.node_types)
+        subtypes: Dict[_NodeType, FrozenSet[_NodeType]] = {}
+        for node_type in self.node_types:
+            children = self.children[node_type] = {}
+            for name, classes in _field_classes(node_type).items():
+                if classes is None:
+                    children[name] = everything
+                    continue
+                concrete: Set[_NodeType] = set()
+                for cls in classes:
+                    if cls not in subtypes:
+                        subtypes[cls] = frozenset(
+                            t for t in self.node_types if issubclass(t, cls)
+                        )
+                    concrete |= subtypes[cls]
+                children[name] = frozenset(concrete)
+                for child_type in concrete:
+                    self.parents[child_type].add(node_type)
+
+    def relevant_node_types(self, handled: Iterable[_NodeType]) -> FrozenSet[_NodeType]:
+        """
+        Returns the node types that are, or can contain, one of the ``handled`` ones
+        (or one of their subclasses).
+        """
+        relevant = {
+            t for t in self.node_types if any(issubclass(t, h) for h in handled)
+        }
+        pending = list(relevant)
+        while pending:
+            for parent in self.parents[pending.pop()]:
+                if parent not in relevant:
+                    relevant.add(parent)
+                    pending.append(parent)
+        return frozenset(relevant)
+
+    def unreachable_fields(
+        self, node_type: _NodeType, relevant: FrozenSet[_NodeType]
+    ) -> Tuple[str, ...]:
+        """
+        Returns the fields of ``node_type`` that can't hold any of the ``relevant``
+        node types.
+        """
+        children = self.children.get(node_type)
+        if children is None:
+            # A node type that didn't exist yet when the graph was built.
+            return ()
+        return tuple(
+            name for name, types in children.items() if relevant.isdisjoint(types)
+        )
+
+
+_graph: Optional[NodeTypeGraph] = None
+
+
+def node_type_graph() -> NodeTypeGraph:
+    """
+    Returns the graph of all node types. It's rebuilt whenever new node types have
+    been defined since it was last built.
+    """
+    global _graph
+    graph = _graph
+    if graph is None:
+        graph = _graph = NodeTypeGraph()
+    return graph
+
+
+def node_type_defined() -> None:
+    """
+    Called whenever a new node type is defined, so that the next call to
+    :func:`node_type_graph` builds a graph that includes it.
+    """
+    global _graph
+    _graph = None
+
+
+def handled_node_types(callback_names: Collection[str]) -> FrozenSet[_NodeType]:
+    """
+    Returns the node types that visitor callbacks like ``visit_<Node>`` or
+    ``leave_<Node>_<attribute>`` with the given names are for.
+    """
+    handled = set()
+    for node_type in node_type_graph().node_types:
+        name = node_type.__name__
+        for prefix in (f"visit_{name}", f"leave_{name}"):
+            if prefix in callback_names or any(
+                n.startswith(f"{prefix}_") for n in callback_names
+            ):
+                handled.add(node_type)
+    return frozenset(handled)
@@ -3,10 +3,29 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import TYPE_CHECKING, Union
+from abc import ABCMeta
+from dataclasses import fields, is_dataclass
+from inspect import getattr_static
+from types import FunctionType
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Collection,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+from weakref import WeakKeyDictionary
 
 from libcst._flatten_sentinel import FlattenSentinel
 from libcst._metadata_dependent import MetadataDependent
+from libcst._reachability import handled_node_types, node_type_graph
 from libcst._removal_sentinel import RemovalSentinel
 from libcst._typed_visitor import CSTTypedTransformerFunctions, CSTTypedVisitorFunctions
 from libcst._types import CSTNodeT
@@ -18,8 +37,283 @@ if TYPE_CHECKING:
 
 CSTVisitorT = Union["CSTTransformer", "CSTVisitor"]
 
+# A visitor callback, taking the visitor as its first argument.
+_Callback = Callable[..., Any]
 
-class CSTTransformer(CSTTypedTransformerFunctions, MetadataDependent):
+
+class _Callbacks:
+    """
+    The callbacks a visitor has for one type of node, so that visiting a node doesn't
+    have to format and look up their names every time.
+    """
+
+    __slots__ = (
+        "visit",
+        "leave",
+        "visit_attributes",
+        "leave_attributes",
+        "silent",
+        "unreachable",
+    )
+
+    #: ``visit_<Node>``, if the visitor has one.
+    visit: Optional[_Callback]
+    #: ``leave_<Node>``, if the visitor has one.
+    leave: Optional[_Callback]
+    #: ``visit_<Node>_<attribute>`` by attribute, or None if there aren't any.
+    visit_attributes: Optional[Dict[str, _Callback]]
+    #: ``leave_<Node>_<attribute>`` by attribute, or None if there aren't any.
+    leave_attributes: Optional[Dict[str, _Callback]]
+    #: Whether ``on_visit_attribute`` and ``on_leave_attribute`` are known to do
+    #: nothing for this type of node, so that traversals can skip calling them.
+    silent: bool
+    #: The fields that can't contain a node the visitor is interested in, which
+    #: traversals skip, if the visitor asked for that.
+    unreachable: Tuple[str, ...]
+
+    def __init__(
+        self,
+        hooks: Dict[str, _Callback],
+        node_type: type,
+        default_attribute_callbacks: bool,
+        relevant: Optional[FrozenSet[type]],
+    ) -> None:
+        name = node_type.__name__
+        self.visit = hooks.get(f"visit_{name}")
+        self.leave = hooks.get(f"leave_{name}")
+        self.visit_attributes = _attribute_hooks(hooks, f"visit_{name}_")
+        self.leave_attributes = _attribute_hooks(hooks, f"leave_{name}_")
+        self.silent = (
+            default_attribute_callbacks
+            and self.visit_attributes is None
+            and self.leave_attributes is None
+        )
+        self.unreachable = (
+            ()
+            if relevant is None
+            else node_type_graph().unreachable_fields(node_type, relevant)
+        )
+
+
+def _attribute_hooks(
+    hooks: Dict[str, _Callback], prefix: str
+) -> Optional[Dict[str, _Callback]]:
+    attribute_hooks = {
+        name[len(prefix) :]: hook
+        for name, hook in hooks.items()
+        if name.startswith(prefix)
+    }
+    return attribute_hooks or None
+
+
+def _is_hook_name(name: str) -> bool:
+    return name.startswith("visit_") or name.startswith("leave_")
+
+
+def _class_hook(cls: type, name: str) -> Optional[_Callback]:
+    hook = getattr_static(cls, name)
+    if getattr(hook, "_is_no_op", False):
+        # The stubs from CSTTypedVisitorFunctions and CSTTypedTransformerFunctions
+        # don't do anything, so we don't need to call them.
+        return None
+    if isinstance(hook, FunctionType):
+        return hook
+
+    # Some other kind of attribute, like a staticmethod. Look it up on the visitor,
+    # and let the descriptor protocol do its thing.
+    def late_bound(visitor: object, *args: object) -> object:
+        return getattr(visitor, name)(*args)
+
+    return late_bound
+
+
+def _instance_hook(visitor: object, name: str) -> Optional[_Callback]:
+    method = getattr(visitor, name, None)
+    if method is None or getattr(method, "_is_no_op", False):
+        return None
+
+    def bound(_visitor: object, *args: object) -> object:
+        return method(*args)
+
+    return bound
+
+
+def _hook_names(node_type: type) -> List[str]:
+    # The names of all the callbacks a visitor might have for nodes of node_type.
+    name = node_type.__name__
+    names = [f"visit_{name}", f"leave_{name}"]
+    if is_dataclass(node_type):
+        for field in fields(node_type):
+            names += [f"visit_{name}_{field.name}", f"leave_{name}_{field.name}"]
+    return names
+
+
+def _has_dynamic_callbacks(cls: type) -> bool:
+    # Callbacks supplied by __getattr__ can't be found with dir(), so they're looked
+    # up by name for every type of node instead.
+    return hasattr(cls, "__getattr__")
+
+
+class _CallbackTable:
+    """
+    All callbacks of a visitor class, or of a visitor instance which has callbacks of
+    its own, by the type of node they're for.
+    """
+
+    __slots__ = (
+        "hooks",
+        "callbacks",
+        "default_attribute_callbacks",
+        "relevant",
+        "dynamic",
+    )
+
+    def __init__(self, visitor: object, per_instance: bool) -> None:
+        cls = type(visitor)
+        # The visitor, if its __getattr__ might supply more callbacks.
+        self.dynamic: Optional[object] = (
+            visitor if per_instance and _has_dynamic_callbacks(cls) else None
+        )
+        self.hooks: Dict[str, _Callback] = {}
+        for name in dir(visitor if per_instance else cls):
+            if not _is_hook_name(name):
+                continue
+            hook = (
+                _instance_hook(visitor, name)
+                if per_instance
+                else _class_hook(cls, name)
+            )
+            if hook is not None:
+                self.hooks[name] = hook
+        self.callbacks: Dict[type, _Callbacks] = {}
+        # pyre-ignore[16]: Every visitor has these.
+        self.default_attribute_callbacks: bool = (
+            cls.on_visit_attribute in _DEFAULT_ON_VISIT_ATTRIBUTE
+            and cls.on_leave_attribute in _DEFAULT_ON_LEAVE_ATTRIBUTE
+        )
+        # The node types worth visiting, or None to visit everything.
+        self.relevant: Optional[FrozenSet[type]] = None
+        if self.dynamic is None and getattr(
+            visitor, "SKIP_UNREACHABLE_CHILDREN", False
+        ):
+            # pyre-ignore[16]: Visitors that can skip children have this.
+            handled = visitor._handled_node_types(self.hooks.keys())
+            if handled is not None:
+                self.relevant = node_type_graph().relevant_node_types(handled)
+
+    def resolve(self, node_type: type) -> _Callbacks:
+        hooks = self.hooks
+        if self.dynamic is not None:
+            hooks = dict(hooks)
+            for name in _hook_names(node_type):
+                hook = None if name in hooks else _instance_hook(self.dynamic, name)
+                if hook is not None:
+                    hooks[name] = hook
+        callbacks = self.callbacks[node_type] = _Callbacks(
+            hooks, node_type, self.default_attribute_callbacks, self.relevant
+        )
+        return callbacks
+
+
+# Callback tables by visitor class, shared by all instances of the class that don't
+# have callbacks of their own. Forgotten whenever a visitor class changes.
+_class_tables: "WeakKeyDictionary[type, _CallbackTable]" = WeakKeyDictionary()
+
+# Attributes other than callbacks that decide which callbacks a visitor has.
+_CALLBACK_ATTRIBUTES: FrozenSet[str] = frozenset(
+    {
+        "on_visit",
+        "on_leave",
+        "on_visit_attribute",
+        "on_leave_attribute",
+        "SKIP_UNREACHABLE_CHILDREN",
+        "_handled_node_types",
+        "__getattr__",
+        "__bases__",
+    }
+)
+
+
+class _VisitorMeta(ABCMeta):
+    """
+    The metaclass of visitors, which notices when a callback (or something else that
+    decides which callbacks there are) is set on or deleted from a visitor class, e.g.
+    by :func:`unittest.mock.patch.object`, and forgets the callbacks that the class
+    and its subclasses looked up before. Setting any other class attribute doesn't
+    affect them.
+    """
+
+    def __setattr__(cls, name: str, value: object) -> None:
+        super().__setattr__(name, value)
+        _class_changed(cls, name)
+
+    def __delattr__(cls, name: str) -> None:
+        super().__delattr__(name)
+        _class_changed(cls, name)
+
+
+def _class_changed(cls: type, name: str) -> None:
+    if _is_hook_name(name) or name in _CALLBACK_ATTRIBUTES:
+        for table_cls in [c for c in _class_tables if issubclass(c, cls)]:
+            del _class_tables[table_cls]
+
+
+def _has_instance_callbacks(visitor: object) -> bool:
+    # Instances that opt into skipping unreachable children by themselves can't share
+    # their class' table either.
+    instance_dict = getattr(visitor, "__dict__", {})
+    return instance_dict.get("SKIP_UNREACHABLE_CHILDREN", False) or any(
+        _is_hook_name(name) for name in instance_dict
+    )
+
+
+def _callback_table(visitor: object) -> _CallbackTable:
+    cls = type(visitor)
+    if _has_instance_callbacks(visitor) or _has_dynamic_callbacks(cls):
+        return _CallbackTable(visitor, per_instance=True)
+    table = _class_tables.get(cls)
+    if table is None:
+        table = _class_tables[cls] = _CallbackTable(visitor, per_instance=False)
+    return table
+
+
+def _start_traversal(visitor: object) -> None:
+    """
+    Called when ``visitor`` starts visiting a tree, to forget the callbacks it used
+    before, since some may have been added to or replaced on it in the meantime.
+    """
+    instance_dict = getattr(visitor, "__dict__", None)
+    if instance_dict is not None:
+        instance_dict.pop("_visitor_callback_table", None)
+
+
+def _visitor_callbacks(visitor: object, node_type: type) -> _Callbacks:
+    """
+    Returns ``visitor``'s callbacks for nodes of type ``node_type``. Callbacks are
+    found with :func:`dir` once per traversal, or once per visitor class if the
+    visitor doesn't have callbacks of its own.
+    """
+    try:
+        # pyre-ignore[16]: Set below.
+        return visitor._visitor_callback_table.callbacks[node_type]
+    except AttributeError:
+        table = _callback_table(visitor)
+        try:
+            # pyre-ignore[16]: We're adding the attribute.
+            visitor._visitor_callback_table = table
+        except AttributeError:
+            # The visitor doesn't allow new attributes, we'll have to look its table
+            # up every time.
+            pass
+    except KeyError:
+        table = visitor._visitor_callback_table
+    callbacks = table.callbacks.get(node_type)
+    return callbacks if callbacks is not None else table.resolve(node_type)
+
+
+class CSTTransformer(
+    CSTTypedTransformerFunctions, MetadataDependent, metaclass=_VisitorMeta
+):
     """
     The low-level base visitor class for traversing a CST and creating an
     updated copy of the original CST. This should be used in conjunction with
@@ -30,8 +324,36 @@ class CSTTransformer(CSTTypedTransformerFunctions, MetadataDependent):
     When visiting nodes using a :class:`CSTTransformer`, the return value of
     :func:`~libcst.CSTNode.visit` will be a new tree with any changes made in
     :func:`~libcst.CSTTransformer.on_leave` calls reflected in its children.
+    Nodes whose children all came back unchanged are not copied, so unchanged
+    subtrees are shared with the original tree, and a transform that doesn't change
+    anything returns the original tree itself.
+
+    Callbacks like ``visit_<Node>`` and ``leave_<Node>_<attribute>`` are looked up
+    once per visitor class and type of node, and again after one of them is set on
+    or deleted from the class. Callbacks set on a transformer itself, or supplied by
+    its ``__getattr__``, are looked up once per traversal.
     """
 
+    #: Set this to ``True`` to skip the children of nodes that can't be, or contain,
+    #: any of the nodes this transformer has callbacks for, going by the annotations
+    #: of the nodes' fields. This saves visiting whitespace, comments and the like
+    #: in transformers that only care about a few types of node. Transformers that
+    #: override :func:`~libcst.CSTTransformer.on_visit` or any of the other ``on_*``
+    #: methods visit everything regardless.
+    SKIP_UNREACHABLE_CHILDREN: ClassVar[bool] = False
+
+    # How many calls to CSTNode.visit deep we are in the traversal we're in.
+    _traversal_depth: int = 0
+
+    def _handled_node_types(
+        self, callback_names: Collection[str]
+    ) -> Optional[Collection[Type["CSTNode"]]]:
+        """
+        Returns the types of node this transformer is interested in, given the names
+        of its callbacks, or None if it might be interested in any node.
+        """
+        return _default_handled_node_types(self, callback_names)
+
     def on_visit(self, node: "CSTNode") -> bool:
         """
         Called every time a node is visited, before we've visited its children.
@@ -39,9 +361,9 @@ class CSTTransformer(CSTTypedTransformerFunctions, MetadataDependent):
         Returns ``True`` if children should be visited, and returns ``False``
         otherwise.
         """
-        visit_func = getattr(self, f"visit_{type(node).__name__}", None)
+        visit_func = _visitor_callbacks(self, type(node)).visit
         if visit_func is not None:
-            retval = visit_func(node)
+            retval = visit_func(self, node)
         else:
             retval = True
         # Don't visit children IFF the visit function returned False.
@@ -66,9 +388,9 @@ class CSTTransformer(CSTTypedTransformerFunctions, MetadataDependent):
         exception if this node is required. As a convenience, you can use
         :func:`RemoveFromParent` as an alias to :attr:`RemovalSentinel.REMOVE`.
         """
-        leave_func = getattr(self, f"leave_{type(original_node).__name__}", None)
+        leave_func = _visitor_callbacks(self, type(original_node)).leave
         if leave_func is not None:
-            updated_node = leave_func(original_node, updated_node)
+            updated_node = leave_func(self, original_node, updated_node)
 
         return updated_node
 
@@ -79,9 +401,11 @@ class CSTTransformer(CSTTypedTransformerFunctions, MetadataDependent):
         attributes are visited in the order that they appear in source that this
         node originates from.
         """
-        visit_func = getattr(self, f"visit_{type(node).__name__}_{attribute}", None)
-        if visit_func is not None:
-            visit_func(node)
+        visit_funcs = _visitor_callbacks(self, type(node)).visit_attributes
+        if visit_funcs is not None:
+            visit_func = visit_funcs.get(attribute)
+            if visit_func is not None:
+                visit_func(self, node)
 
     def on_leave_attribute(self, original_node: "CSTNode", attribute: str) -> None:
         """
@@ -92,14 +416,14 @@ class CSTTransformer(CSTTypedTransformerFunctions, MetadataDependent):
         not allow modifications to the tree and is provided solely for state
         management.
         """
-        leave_func = getattr(
-            self, f"leave_{type(original_node).__name__}_{attribute}", None
-        )
-        if leave_func is not None:
-            leave_func(original_node)
+        leave_funcs = _visitor_callbacks(self, type(original_node)).leave_attributes
+        if leave_funcs is not None:
+            leave_func = leave_funcs.get(attribute)
+            if leave_func is not None:
+                leave_func(self, original_node)
 
 
-class CSTVisitor(CSTTypedVisitorFunctions, MetadataDependent):
+class CSTVisitor(CSTTypedVisitorFunctions, MetadataDependent, metaclass=_VisitorMeta):
     """
     The low-level base visitor class for traversing a CST. This should be used in
     conjunction with the :func:`~libcst.CSTNode.visit` method on a
@@ -109,8 +433,40 @@ class CSTVisitor(CSTTypedVisitorFunctions, MetadataDependent):
 
     When visiting nodes using a :class:`CSTVisitor`, the return value of
     :func:`~libcst.CSTNode.visit` will equal the passed in tree.
+
+    Like with :class:`CSTTransformer`, callbacks are looked up once per visitor class
+    and type of node.
     """
 
+    #: Set this to ``True`` to skip the children of nodes that can't be, or contain,
+    #: any of the nodes this visitor has callbacks for, going by the annotations of
+    #: the nodes' fields. See :attr:`CSTTransformer.SKIP_UNREACHABLE_CHILDREN`.
+    SKIP_UNREACHABLE_CHILDREN: ClassVar[bool] = False
+
+    # Whether stop_traversal was called during the traversal we're in, and how many
+    # calls to CSTNode.visit deep we are in it.
+    _traversal_stopped: bool = False
+    _traversal_depth: int = 0
+
+    def _handled_node_types(
+        self, callback_names: Collection[str]
+    ) -> Optional[Collection[Type["CSTNode"]]]:
+        """
+        Returns the types of node this visitor is interested in, given the names of
+        its callbacks, or None if it might be interested in any node.
+        """
+        return _default_handled_node_types(self, callback_names)
+
+    def stop_traversal(self) -> None:
+        """
+        Stops the traversal this visitor is in, without raising an exception. Once
+        the callback that calls this returns, no more nodes are visited or left, not
+        even the ones the traversal is in the middle of, and
+        :func:`~libcst.CSTNode.visit` returns. Useful for visitors that look for
+        something and have found it.
+        """
+        self._traversal_stopped = True
+
     def on_visit(self, node: "CSTNode") -> bool:
         """
         Called every time a node is visited, before we've visited its children.
@@ -118,9 +474,9 @@ class CSTVisitor(CSTTypedVisitorFunctions, MetadataDependent):
         Returns ``True`` if children should be visited, and returns ``False``
         otherwise.
         """
-        visit_func = getattr(self, f"visit_{type(node).__name__}", None)
+        visit_func = _visitor_callbacks(self, type(node)).visit
         if visit_func is not None:
-            retval = visit_func(node)
+            retval = visit_func(self, node)
         else:
             retval = True
         # Don't visit children IFF the visit function returned False.
@@ -130,11 +486,12 @@ class CSTVisitor(CSTTypedVisitorFunctions, MetadataDependent):
         """
         Called every time we leave a node, after we've visited its children. If
         the :func:`~libcst.CSTVisitor.on_visit` function for this node returns
-        ``False``, this function will still be called on that node.
+        ``False``, this function will still be called on that node, unless it
+        called :func:`~libcst.CSTVisitor.stop_traversal`.
         """
-        leave_func = getattr(self, f"leave_{type(original_node).__name__}", None)
+        leave_func = _visitor_callbacks(self, type(original_node)).leave
         if leave_func is not None:
-            leave_func(original_node)
+            leave_func(self, original_node)
 
     def on_visit_attribute(self, node: "CSTNode", attribute: str) -> None:
         """
@@ -143,17 +500,50 @@ class CSTVisitor(CSTTypedVisitorFunctions, MetadataDependent):
         attributes are visited in the order that they appear in source that this
         node originates from.
         """
-        visit_func = getattr(self, f"visit_{type(node).__name__}_{attribute}", None)
-        if visit_func is not None:
-            visit_func(node)
+        visit_funcs = _visitor_callbacks(self, type(node)).visit_attributes
+        if visit_funcs is not None:
+            visit_func = visit_funcs.get(attribute)
+            if visit_func is not None:
+                visit_func(self, node)
 
     def on_leave_attribute(self, original_node: "CSTNode", attribute: str) -> None:
         """
         Called after a node's child attribute is visited and before we have called
         :func:`~libcst.CSTVisitor.on_leave` on the node.
         """
-        leave_func = getattr(
-            self, f"leave_{type(original_node).__name__}_{attribute}", None
-        )
-        if leave_func is not None:
-            leave_func(original_node)
+        leave_funcs = _visitor_callbacks(self, type(original_node)).leave_attributes
+        if leave_funcs is not None:
+            leave_func = leave_funcs.get(attribute)
+            if leave_func is not None:
+                leave_func(self, original_node)
+
+
+_DEFAULT_ON_VISIT_ATTRIBUTE = (
+    CSTTransformer.on_visit_attribute,
+    CSTVisitor.on_visit_attribute,
+)
+_DEFAULT_ON_LEAVE_ATTRIBUTE = (
+    CSTTransformer.on_leave_attribute,
+    CSTVisitor.on_leave_attribute,
+)
+_DEFAULT_ON_VISIT = (CSTTransformer.on_visit, CSTVisitor.on_visit)
+_DEFAULT_ON_LEAVE = (CSTTransformer.on_leave, CSTVisitor.on_leave)
+
+
+def _default_handled_node_types(
+    visitor: object, callback_names: Collection[str]
+) -> Optional[Collection[Type["CSTNode"]]]:
+    cls = type(visitor)
+    if (
+        # pyre-ignore[16]: Every visitor has these.
+        cls.on_visit not in _DEFAULT_ON_VISIT
+        # pyre-ignore[16]
+        or cls.on_leave not in _DEFAULT_ON_LEAVE
+        # pyre-ignore[16]
+        or cls.on_visit_attribute not in _DEFAULT_ON_VISIT_ATTRIBUTE
+        # pyre-ignore[16]
+        or cls.on_leave_attribute not in _DEFAULT_ON_LEAVE_ATTRIBUTE
+    ):
+        # Its callbacks might be interested in anything.
+        return None
+    return handled_node_types(callback_names)
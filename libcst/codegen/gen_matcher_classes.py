@@ -447,7 +447,7 @@ generated_code.append("from typing import Literal, Optional, Sequence, Union")
 generated_code.append("import libcst as cst")
 generated_code.append("")
 generated_code.append(
-    "from libcst.matchers._matcher_base import AbstractBaseMatcherNodeMeta, BaseMatcherNode, DoNotCareSentinel, DoNotCare, TypeOf, OneOf, AllOf, DoesNotMatch, MatchIfTrue, MatchRegex, MatchMetadata, MatchMetadataIfTrue, ZeroOrMore, AtLeastN, ZeroOrOne, AtMostN, SaveMatchedNode, extract, extractall, findall, matches, replace"
+    "from libcst.matchers._matcher_base import AbstractBaseMatcherNodeMeta, BaseMatcherNode, DoNotCareSentinel, DoNotCare, TypeOf, OneOf, AllOf, DoesNotMatch, MatchIfTrue, MatchRegex, MatchMetadata, MatchMetadataIfTrue, ZeroOrMore, AtLeastN, ZeroOrOne, AtMostN, SaveMatchedNode, contains, extract, extractall, find_first, findall, matches, replace"
 )
 all_exports.update(
     [
@@ -467,13 +467,19 @@ all_exports.update(
         "ZeroOrOne",
         "AtMostN",
         "SaveMatchedNode",
+        "contains",
         "extract",
         "extractall",
+        "find_first",
         "findall",
         "matches",
         "replace",
     ]
 )
+generated_code.append("from libcst.matchers._compile import compile, CompiledMatcher")
+all_exports.update(["compile", "CompiledMatcher"])
+generated_code.append("from libcst.matchers._matcher_set import MatcherSet")
+all_exports.update(["MatcherSet"])
 generated_code.append(
     "from libcst.matchers._decorators import call_if_inside, call_if_not_inside, visit, leave"
 )
@@ -16,11 +16,12 @@ import time
 import traceback
 from copy import deepcopy
 from dataclasses import dataclass, replace
+from functools import lru_cache
 from multiprocessing import cpu_count, Pool
 from pathlib import Path
 from typing import Any, AnyStr, cast, Dict, List, Optional, Sequence, Union
 
-from libcst import parse_module, PartialParserConfig
+from libcst import parse_module, ParseCache, PartialParserConfig
 from libcst.codemod._codemod import Codemod
 from libcst.codemod._context import CodemodContext
 from libcst.codemod._dummy_pool import DummyPool
@@ -207,11 +208,18 @@ class ExecutionConfig:
     formatter_args: Sequence[str] = ()
     generated_code_marker: str = _DEFAULT_GENERATED_CODE_MARKER
     include_generated: bool = False
+    parse_cache: Optional[str] = None
     python_version: Optional[str] = None
     repo_root: Optional[str] = None
     unified_diff: Optional[int] = None
 
 
+@lru_cache(maxsize=None)
+def _get_parse_cache(directory: str) -> ParseCache:
+    # One instance per process, so that it can keep track of how much it has written.
+    return ParseCache(directory)
+
+
 def _execute_transform(  # noqa: C901
     transformer: Codemod,
     filename: str,
@@ -272,15 +280,28 @@ def _execute_transform(  # noqa: C901
 
         # Run the transform, bail if we failed or if we aren't formatting code
         try:
-            input_tree = parse_module(
-                oldcode,
-                config=(
-                    PartialParserConfig(python_version=str(config.python_version))
-                    if config.python_version is not None
-                    else PartialParserConfig()
-                ),
+            parser_config = (
+                PartialParserConfig(python_version=str(config.python_version))
+                if config.python_version is not None
+                else PartialParserConfig()
             )
+            if config.parse_cache is not None:
+                input_tree = _get_parse_cache(config.parse_cache).parse_module(
+                    oldcode, parser_config
+                )
+            else:
+                input_tree = parse_module(oldcode, config=parser_config)
             output_tree = transformer.transform_module(input_tree)
+            # Transforms return the tree they were given if they didn't change it, so
+            # there's no need to generate, format or diff any code.
+            if output_tree is input_tree:
+                return ExecutionResult(
+                    filename=filename,
+                    changed=False,
+                    transform_result=TransformSuccess(
+                        warning_messages=transformer.context.warnings, code=""
+                    ),
+                )
             newcode = output_tree.bytes
             encoding = output_tree.encoding
         except KeyboardInterrupt:
@@ -527,6 +548,7 @@ def parallel_exec_transform_with_prettyprint(  # noqa: C901
     blacklist_patterns: Sequence[str] = (),
     python_version: Optional[str] = None,
     repo_root: Optional[str] = None,
+    parse_cache: Optional[str] = None,
 ) -> ParallelTransformResult:
     """
     Given a list of files and an instantiated codemod we should apply to them,
@@ -539,7 +561,9 @@ def parallel_exec_transform_with_prettyprint(  # noqa: C901
     themselves will be updated with changes and formatting. If a
     ``python_version`` is provided, then we will parse each source file using
     this version. Otherwise, we will use the version of the currently executing python
-    binary.
+    binary. If ``parse_cache`` is set to a directory, parsed files are cached there
+    (see :class:`~libcst.ParseCache`), which speeds up running codemods repeatedly
+    over the same files.
 
     A progress indicator as well as any generated warnings will be printed to stderr.
     To supress the interactive progress indicator, set ``hide_progress`` to ``True``.
@@ -605,6 +629,7 @@ def parallel_exec_transform_with_prettyprint(  # noqa: C901
         formatter_args=formatter_args,
         blacklist_patterns=blacklist_patterns,
         python_version=python_version,
+        parse_cache=parse_cache,
     )
 
     if total == 1 or jobs == 1:
@@ -71,23 +71,24 @@ class Codemod(MetadataDependent, ABC):
         """
         ...
 
-    @contextmanager
-    def _handle_metadata_reference(
-        self, module: Module
-    ) -> Generator[Module, None, None]:
-        oldwrapper = self.context.wrapper
+    def _make_metadata_wrapper(self, module: Module) -> MetadataWrapper:
         metadata_manager = self.context.metadata_manager
         filename = self.context.filename
         if metadata_manager is not None and filename:
             # We can look up full-repo metadata for this codemod!
             cache = metadata_manager.get_cache_for_path(filename)
-            wrapper = MetadataWrapper(module, cache=cache)
+            return MetadataWrapper(module, cache=cache)
         else:
             # We are missing either the repo manager or the current path,
             # which can happen when we are codemodding from stdin or when
             # an upstream dependency manually instantiates us.
-            wrapper = MetadataWrapper(module)
+            return MetadataWrapper(module)
 
+    @contextmanager
+    def _use_metadata_wrapper(
+        self, wrapper: MetadataWrapper
+    ) -> Generator[Module, None, None]:
+        oldwrapper = self.context.wrapper
         with self.resolve(wrapper):
             self.context = replace(self.context, wrapper=wrapper)
             try:
@@ -95,6 +96,14 @@ class Codemod(MetadataDependent, ABC):
             finally:
                 self.context = replace(self.context, wrapper=oldwrapper)
 
+    @contextmanager
+    def _handle_metadata_reference(
+        self, module: Module
+    ) -> Generator[Module, None, None]:
+        wrapper = self._make_metadata_wrapper(module)
+        with self._use_metadata_wrapper(wrapper) as tree_with_metadata:
+            yield tree_with_metadata
+
     def transform_module(self, tree: Module) -> Module:
         """
         Transform entrypoint which handles multi-pass logic and metadata calculation
@@ -103,17 +112,20 @@ class Codemod(MetadataDependent, ABC):
         :func:`~libcst.codemod.transform_module`.
         """
 
+        # The transform works on a copy of the tree made by the metadata wrapper. If
+        # it hands that copy back, nothing changed, and we return the tree we were
+        # given, so that callers can skip generating code by checking identity.
         if not self.should_allow_multiple_passes():
             with self._handle_metadata_reference(tree) as tree_with_metadata:
-                return self.transform_module_impl(tree_with_metadata)
+                result = self.transform_module_impl(tree_with_metadata)
+            return tree if result is tree_with_metadata else result
 
         # We allow multiple passes, so we execute 1+ passes until there are
         # no more changes.
         previous: Module = tree
         while True:
-            with self._handle_metadata_reference(tree) as tree_with_metadata:
+            with self._handle_metadata_reference(previous) as tree_with_metadata:
                 tree = self.transform_module_impl(tree_with_metadata)
-            if tree.deep_equals(previous):
-                break
+            if tree is tree_with_metadata or tree.deep_equals(previous):
+                return previous
             previous = tree
-        return tree
@@ -6,9 +6,10 @@
 import argparse
 import inspect
 from abc import ABC, abstractmethod
-from typing import Dict, Generator, List, Type, TypeVar
+from contextlib import ExitStack
+from typing import cast, Dict, Generator, List, Type, TypeVar
 
-from libcst import Module
+from libcst import Module, transform_batched
 from libcst.codemod._codemod import Codemod
 from libcst.codemod._context import CodemodContext
 from libcst.codemod._visitor import ContextAwareTransformer
@@ -115,6 +116,11 @@ class MagicArgsCodemodCommand(CodemodCommand, ABC):
     you wish to chain transforms, adding to the scratch in one transform will make
     the value available to the constructor in subsequent transforms as well as the
     scratch for subsequent transforms.
+
+    Consecutive transforms that set
+    :attr:`~libcst.codemod.ContextAwareTransformer.FUSABLE` are instantiated
+    together, and run in a single traversal of the tree using
+    :func:`~libcst.transform_batched`.
     """
 
     def __init__(self, context: CodemodContext, **kwargs: Dict[str, object]) -> None:
@@ -173,8 +179,43 @@ class MagicArgsCodemodCommand(CodemodCommand, ABC):
         # Return an instance of the transform with those arguments
         return transform(self.context, *args, **kwargs)
 
+    def _transform_fused(
+        self, transforms: List[ContextAwareTransformer], tree: Module
+    ) -> Module:
+        if len(transforms) <= 1:
+            for inst in transforms:
+                tree = inst.transform_module(tree)
+            return tree
+        # All the transforms share one metadata wrapper, and therefore the tree.
+        wrapper = transforms[0]._make_metadata_wrapper(tree)
+        with ExitStack() as stack:
+            for inst in transforms:
+                stack.enter_context(inst._use_metadata_wrapper(wrapper))
+            result = cast(Module, transform_batched(wrapper.module, transforms))
+        return tree if result is wrapper.module else result
+
     def transform_module_impl(self, tree: Module) -> Module:
+        fused: List[ContextAwareTransformer] = []
         for transform in self.get_transforms():
+            if _is_fusable(transform):
+                fused.append(
+                    cast(ContextAwareTransformer, self._instantiate(transform))
+                )
+                continue
+            # Run the fused transforms first, since this one might depend on them.
+            tree = self._transform_fused(fused, tree)
+            fused = []
             inst = self._instantiate(transform)
             tree = inst.transform_module(tree)
-        return tree
+        return self._transform_fused(fused, tree)
+
+
+def _is_fusable(transform: Type[Codemod]) -> bool:
+    return (
+        issubclass(transform, ContextAwareTransformer)
+        and transform.FUSABLE
+        and transform.transform_module_impl
+        is ContextAwareTransformer.transform_module_impl
+        and transform.should_allow_multiple_passes
+        is Codemod.should_allow_multiple_passes
+    )
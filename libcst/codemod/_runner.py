@@ -142,7 +142,9 @@ def transform_module(
         )
         output_tree = transformer.transform_module(input_tree)
         return TransformSuccess(
-            code=output_tree.code, warning_messages=transformer.context.warnings
+            # An untouched tree generates the code it was parsed from.
+            code=code if output_tree is input_tree else output_tree.code,
+            warning_messages=transformer.context.warnings,
         )
     except KeyboardInterrupt:
         return TransformExit()
@@ -3,10 +3,11 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 #
-from typing import Mapping
+from typing import ClassVar, Mapping
 
 import libcst as cst
 from libcst import MetadataDependent
+from libcst._metadata_dependent import _DeferredMetadata
 from libcst.codemod._codemod import Codemod
 from libcst.codemod._context import CodemodContext
 from libcst.matchers import MatcherDecoratableTransformer, MatcherDecoratableVisitor
@@ -24,6 +25,17 @@ class ContextAwareTransformer(Codemod, MatcherDecoratableTransformer):
     class.
     """
 
+    #: Set this to ``True`` to let a :class:`~libcst.codemod.MagicArgsCodemodCommand`
+    #: run this transform in the same traversal as the fusable transforms right
+    #: before and after it, using :func:`~libcst.transform_batched`. Only do so if
+    #: the transform works on any tree it's given (it will see the nodes the
+    #: transforms before it visited, not the ones they returned), and if its
+    #: constructor doesn't need anything the transforms before it put into
+    #: :attr:`~libcst.codemod.CodemodContext.scratch`. Transforms that override
+    #: :meth:`~libcst.codemod.Codemod.transform_module_impl` or
+    #: :meth:`~libcst.codemod.Codemod.should_allow_multiple_passes` are never fused.
+    FUSABLE: ClassVar[bool] = False
+
     def __init__(self, context: CodemodContext) -> None:
         Codemod.__init__(self, context)
         MatcherDecoratableTransformer.__init__(self)
@@ -57,7 +69,9 @@ class ContextAwareVisitor(MatcherDecoratableVisitor, MetadataDependent):
     metadata using :meth:`~libcst.MetadataDependent.get_metadata`, even if the parent
     codemod has listed its own metadata dependencies. Note also that the dependencies
     listed on this class must be a strict subset of the dependencies listed in the
-    parent codemod.
+    parent codemod, unless they are listed in
+    :attr:`~libcst.MetadataDependent.DEFERRED_METADATA_DEPENDENCIES`, in which case
+    they are resolved the first time they are needed.
     """
 
     def __init__(self, context: CodemodContext) -> None:
@@ -74,8 +88,9 @@ class ContextAwareVisitor(MatcherDecoratableVisitor, MetadataDependent):
                     + "an active transform. This means that metadata hasn't been "
                     + "calculated and we cannot successfully create this visitor."
                 )
+            deferred = self.get_deferred_dependencies()
             for dep in dependencies:
-                if dep not in wrapper._metadata:
+                if dep not in wrapper._metadata and dep not in deferred:
                     raise Exception(
                         f"Attempting to access metadata {dep.__name__} that was not a "
                         + "declared dependency of parent transform! This means it is "
@@ -83,9 +98,14 @@ class ContextAwareVisitor(MatcherDecoratableVisitor, MetadataDependent):
                         + f"parent transforms of {self.__class__.__name__} declare "
                         + f"{dep.__name__} as a metadata dependency."
                     )
-            self.metadata: Mapping[ProviderT, Mapping[cst.CSTNode, object]] = {
-                dep: wrapper._metadata[dep] for dep in dependencies
+            metadata = {
+                dep: wrapper._metadata[dep]
+                for dep in dependencies
+                if dep in wrapper._metadata
             }
+            self.metadata: Mapping[ProviderT, Mapping[cst.CSTNode, object]] = (
+                _DeferredMetadata(wrapper, metadata, deferred) if deferred else metadata
+            )
 
     def warn(self, warning: str) -> None:
         """
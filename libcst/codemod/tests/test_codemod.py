@@ -8,6 +8,7 @@ from unittest import expectedFailure
 import libcst as cst
 import libcst.matchers as m
 from libcst.codemod import Codemod, CodemodContext, CodemodTest, SkipFile
+from libcst.testing.utils import UnitTest
 
 
 class SimpleCodemod(Codemod):
@@ -97,3 +98,20 @@ class TestMultipass(CodemodTest):
         """
 
         self.assertCodemod(before, after, iterations=5)
+
+
+class TestUnchangedTree(UnitTest):
+    def test_returns_input_tree(self) -> None:
+        tree = cst.parse_module("x = 5\n")
+        codemod = SimpleCodemod(CodemodContext(), skip=False)
+        self.assertIs(codemod.transform_module(tree), tree)
+
+    def test_multiple_passes(self) -> None:
+        tree = cst.parse_module("x = 5\n")
+        codemod = IncrementCodemod(CodemodContext(), iterations=0)
+        self.assertIs(codemod.transform_module(tree), tree)
+
+        codemod = IncrementCodemod(CodemodContext(), iterations=2)
+        result = codemod.transform_module(tree)
+        self.assertEqual(result.code, "x = 7\n")
+        self.assertEqual(codemod.iterations, 0)
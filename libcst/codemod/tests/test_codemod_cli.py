@@ -11,9 +11,12 @@ import sys
 import tempfile
 from pathlib import Path
 from unittest import skipIf
+from unittest.mock import patch, PropertyMock
 
+import libcst as cst
 from libcst._parser.entrypoints import is_native
-from libcst.codemod import CodemodTest
+from libcst.codemod import Codemod, CodemodContext, CodemodTest, TransformSuccess
+from libcst.codemod._cli import _execute_transform, ExecutionConfig
 from libcst.testing.utils import UnitTest
 
 
@@ -124,3 +127,32 @@ class TestCodemodCLI(UnitTest):
                 f"Transformed {file_count} files successfully.",
                 output.stderr,
             )
+
+    def test_unchanged_file_is_not_regenerated(self) -> None:
+        class NoopCodemod(Codemod):
+            def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+                self.warn("Testing")
+                return tree
+
+        code = "def foo() -> None:\n    pass\n"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "mod.py"
+            path.write_text(code)
+            mtime = path.stat().st_mtime_ns
+            with patch.object(
+                cst.Module,
+                "bytes",
+                new_callable=PropertyMock,
+                side_effect=AssertionError,
+            ):
+                result = _execute_transform(
+                    NoopCodemod(CodemodContext()),
+                    str(path),
+                    ExecutionConfig(),
+                    {},
+                )
+            self.assertFalse(result.changed)
+            self.assertIsInstance(result.transform_result, TransformSuccess)
+            self.assertEqual(result.transform_result.warning_messages, ["Testing"])
+            self.assertEqual(path.read_text(), code)
+            self.assertEqual(path.stat().st_mtime_ns, mtime)
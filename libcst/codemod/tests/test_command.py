@@ -0,0 +1,91 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+from typing import Generator, List, Type
+from unittest.mock import patch
+
+import libcst as cst
+from libcst.codemod import (
+    Codemod,
+    CodemodContext,
+    ContextAwareTransformer,
+    MagicArgsCodemodCommand,
+)
+from libcst.metadata import PositionProvider
+from libcst.testing.utils import UnitTest
+
+
+class AppendToNames(ContextAwareTransformer):
+    FUSABLE = True
+    SUFFIX = ""
+
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
+        return updated_node.with_changes(value=updated_node.value + self.SUFFIX)
+
+
+class AppendA(AppendToNames):
+    SUFFIX = "_a"
+
+
+class AppendB(AppendToNames):
+    SUFFIX = "_b"
+
+
+class AppendC(AppendToNames):
+    FUSABLE = False
+    SUFFIX = "_c"
+
+
+class RecordPasses(ContextAwareTransformer):
+    FUSABLE = True
+    METADATA_DEPENDENCIES = (PositionProvider,)
+
+    def visit_Pass(self, node: cst.Pass) -> None:
+        position = self.get_metadata(PositionProvider, node).start
+        self.context.scratch.setdefault("passes", []).append(
+            (position.line, position.column)
+        )
+
+
+class Command(MagicArgsCodemodCommand):
+    def __init__(
+        self, context: CodemodContext, transforms: List[Type[Codemod]]
+    ) -> None:
+        super().__init__(context)
+        self.transforms = transforms
+
+    def get_transforms(self) -> Generator[Type[Codemod], None, None]:
+        yield from self.transforms
+
+
+class TestFusedTransforms(UnitTest):
+    def transform(self, code: str, transforms: List[Type[Codemod]]) -> str:
+        command = Command(CodemodContext(), transforms)
+        return command.transform_module(cst.parse_module(code)).code
+
+    def test_fuses_consecutive_transforms(self) -> None:
+        with patch(
+            "libcst.codemod._command.transform_batched",
+            wraps=cst.transform_batched,
+        ) as transform_batched:
+            code = self.transform("x = y\n", [AppendA, AppendB, AppendC, AppendA])
+        self.assertEqual(code, "x_a_b_c_a = y_a_b_c_a\n")
+        # AppendC isn't fusable, and the last AppendA is on its own.
+        transform_batched.assert_called_once()
+        self.assertEqual(
+            [type(t) for t in transform_batched.call_args[0][1]], [AppendA, AppendB]
+        )
+
+    def test_fused_transforms_get_metadata(self) -> None:
+        command = Command(CodemodContext(), [AppendA, RecordPasses])
+        tree = command.transform_module(cst.parse_module("if x:\n    pass\n"))
+        self.assertEqual(tree.code, "if x_a:\n    pass\n")
+        self.assertEqual(command.context.scratch["passes"], [(2, 4)])
+
+    def test_unchanged_tree(self) -> None:
+        tree = cst.parse_module("pass\n")
+        command = Command(CodemodContext(), [RecordPasses, RecordPasses])
+        self.assertIs(command.transform_module(tree), tree)
+        self.assertEqual(command.context.scratch["passes"], [(1, 0), (1, 0)])
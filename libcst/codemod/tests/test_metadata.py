@@ -32,6 +32,19 @@ class TestingTransform(ContextAwareTransformer):
         node.visit(TestingCollector(self.context))
 
 
+class DeferredCollector(ContextAwareVisitor):
+    DEFERRED_METADATA_DEPENDENCIES = (PositionProvider,)
+
+    def visit_Return(self, node: cst.Return) -> None:
+        position = self.get_metadata(PositionProvider, node)
+        self.context.scratch["return"] = (position.start.line, position.start.column)
+
+
+class DeferredTransform(ContextAwareTransformer):
+    def visit_FunctionDef(self, node: cst.FunctionDef) -> None:
+        node.visit(DeferredCollector(self.context))
+
+
 class TestMetadata(UnitTest):
     def test_metadata_works(self) -> None:
         code = """
@@ -48,3 +61,18 @@ class TestMetadata(UnitTest):
         self.assertEqual(
             context.scratch, {"foo": (2, 0), "pass": (3, 4), "bar": (5, 0)}
         )
+
+    def test_deferred_metadata_works(self) -> None:
+        code = """
+            def foo() -> None:
+                pass
+
+            def bar() -> int:
+                return 5
+        """
+        module = parse_module(dedent(code))
+        context = CodemodContext()
+        transform = DeferredTransform(context)
+        transform.transform_module(module)
+        # The parent transform doesn't declare the visitor's deferred dependency.
+        self.assertEqual(context.scratch, {"return": (6, 4)})
@@ -5,6 +5,7 @@
 #
 from textwrap import dedent
 from typing import Dict
+from unittest.mock import patch, PropertyMock
 
 import libcst as cst
 from libcst.codemod import (
@@ -110,3 +111,19 @@ class TestRunner(CodemodTest):
         assert isinstance(response, TransformFailure)
         self.assertEqual(response.warning_messages, ["Testing"])
         self.assertIsInstance(response.error, KeyError)
+
+    def test_runner_unchanged(self) -> None:
+        code = "def foo() -> None:\n    pass\n"
+
+        class SimpleCodemod(Codemod):
+            def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+                return tree
+
+        transform = SimpleCodemod(CodemodContext())
+        with patch.object(
+            cst.Module, "code", new_callable=PropertyMock, side_effect=AssertionError
+        ):
+            response = transform_module(transform, code)
+        self.assertIsInstance(response, TransformSuccess)
+        assert isinstance(response, TransformSuccess)
+        self.assertEqual(response.code, code)
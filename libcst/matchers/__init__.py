@@ -9,6 +9,7 @@ from dataclasses import dataclass
 from typing import Literal, Optional, Sequence, Union
 
 import libcst as cst
+from libcst.matchers._compile import compile, CompiledMatcher
 from libcst.matchers._decorators import call_if_inside, call_if_not_inside, leave, visit
 
 from libcst.matchers._matcher_base import (
@@ -17,11 +18,13 @@ from libcst.matchers._matcher_base import (
     AtLeastN,
     AtMostN,
     BaseMatcherNode,
+    contains,
     DoesNotMatch,
     DoNotCare,
     DoNotCareSentinel,
     extract,
     extractall,
+    find_first,
     findall,
     matches,
     MatchIfTrue,
@@ -35,6 +38,7 @@ from libcst.matchers._matcher_base import (
     ZeroOrMore,
     ZeroOrOne,
 )
+from libcst.matchers._matcher_set import MatcherSet
 from libcst.matchers._visitors import (
     MatchDecoratorMismatch,
     MatcherDecoratableTransformer,
@@ -16142,6 +16146,7 @@ __all__ = [
     "CompIf",
     "Comparison",
     "ComparisonTarget",
+    "CompiledMatcher",
     "ConcatenatedString",
     "Continue",
     "Decorator",
@@ -16224,6 +16229,7 @@ __all__ = [
     "MatchValue",
     "MatcherDecoratableTransformer",
     "MatcherDecoratableVisitor",
+    "MatcherSet",
     "MatrixMultiply",
     "MatrixMultiplyAssign",
     "Minus",
@@ -16293,8 +16299,11 @@ __all__ = [
     "ZeroOrOne",
     "call_if_inside",
     "call_if_not_inside",
+    "compile",
+    "contains",
     "extract",
     "extractall",
+    "find_first",
     "findall",
     "leave",
     "matches",
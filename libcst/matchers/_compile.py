@@ -0,0 +1,390 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Turns matchers into Python functions that do the same checks as
+:func:`~libcst.matchers.matches`, without working out what each part of the matcher
+is every time it's evaluated.
+
+Each part of a matcher is compiled to a Python expression that mirrors the function
+of ``_matcher_base`` that evaluates that kind of matcher in that position, so that
+compiled matchers give exactly the same results. Anything that doesn't have a simple
+expression, such as a sequence with wildcards in it, calls back into those functions.
+"""
+
+import collections.abc
+import re
+from dataclasses import fields, is_dataclass
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import libcst
+import libcst.metadata as meta
+from libcst import MaybeSentinel, RemovalSentinel
+from libcst.matchers._matcher_base import (
+    _BaseMetadataMatcher,
+    _BaseWildcardNode,
+    _construct_metadata_fetcher_dependent,
+    _construct_metadata_fetcher_null,
+    _construct_metadata_fetcher_wrapper,
+    _ExtractMatchingNode,
+    _InverseOf,
+    _matches,
+    _metadata_matches,
+    _METADATA_MISSING_SENTINEL,
+    _sequence_matches,
+    AllOf,
+    AtLeastN,
+    AtMostN,
+    BaseMatcherNode,
+    DoNotCareSentinel,
+    MatchIfTrue,
+    MatchMetadata,
+    MatchMetadataIfTrue,
+    OneOf,
+    TypeOf,
+)
+
+_MetadataLookupT = Callable[[meta.ProviderT, libcst.CSTNode], object]
+_NO_METADATA: _MetadataLookupT = _construct_metadata_fetcher_null()
+
+
+class _Compiler:
+    """
+    Builds the expression for a matcher. Expressions are returned along with whether
+    they're only true for nodes whose class has the name of one of the matcher
+    classes in them, which makes other checks on the value's type redundant.
+    """
+
+    def __init__(self) -> None:
+        self.namespace: Dict[str, object] = {
+            "_MAYBE": MaybeSentinel.DEFAULT,
+            "_REMOVE": RemovalSentinel.REMOVE,
+            "_MISSING": _METADATA_MISSING_SENTINEL,
+            "_Sequence": collections.abc.Sequence,
+        }
+        self.uses_metadata = False
+        self._locals = 0
+
+    def constant(self, value: object) -> str:
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def local(self) -> str:
+        self._locals += 1
+        return f"_v{self._locals}"
+
+    def bind(
+        self, value: str, compile_with: Callable[[object, str], str], matcher: object
+    ) -> str:
+        # Compiles the matcher against value, first storing value in a local if the
+        # expression uses it more than once.
+        name = self.local()
+        expression = compile_with(matcher, name)
+        pattern = rf"\b{name}\b"
+        if len(re.findall(pattern, expression)) <= 1:
+            return re.sub(pattern, lambda _: value, expression)
+        return f"((({name} := {value}) or True) and {expression})"
+
+    def fallback(
+        self,
+        evaluate: Callable[[object, _MetadataLookupT], bool],
+        var: str,
+        *,
+        uses_metadata: bool = True,
+    ) -> str:
+        # For the few cases where the only way to be sure we get the same result is
+        # to call the interpreter.
+        self.uses_metadata |= uses_metadata
+        return f"{self.constant(evaluate)}({var}, lookup)"
+
+    def matches(self, matcher: object, var: str) -> Tuple[str, bool]:
+        # Mirrors _matches, where var might be a MaybeSentinel.
+        if isinstance(matcher, (OneOf, TypeOf)):
+            options = [self.node_matches(option, var) for option in matcher.options]
+            expression = _any(e for e, _ in options)
+            typed = bool(options) and all(typed for _, typed in options)
+        elif isinstance(matcher, AllOf):
+            options = [self.node_matches(option, var) for option in matcher.options]
+            expression = _all(e for e, _ in options)
+            typed = any(typed for _, typed in options)
+        else:
+            expression, typed = self.node_matches(matcher, var)
+            if isinstance(matcher, _InverseOf):
+                return f"({var} is _MAYBE or {expression})", False
+        if not typed:
+            expression = f"({var} is not _MAYBE and {expression})"
+        return expression, typed
+
+    def element_matches(self, matcher: object, var: str) -> str:
+        expression, _ = self.matches(matcher, var)
+        return expression
+
+    def node_matches(self, matcher: object, var: str) -> Tuple[str, bool]:
+        # Mirrors _node_matches.
+        if isinstance(matcher, _InverseOf):
+            expression, _ = self.node_matches(matcher.matcher, var)
+            return f"(not {expression})", False
+        if isinstance(matcher, _ExtractMatchingNode):
+            return self.node_matches(matcher.matcher, var)
+        if isinstance(matcher, MatchIfTrue):
+            return f"{self.constant(matcher.func)}({var})", False
+        if isinstance(matcher, (MatchMetadata, MatchMetadataIfTrue)):
+            return self.metadata_matches(matcher, var), False
+
+        # The type check comes first, so nothing else is evaluated for most nodes.
+        checks = [f"{var}.__class__.__name__ == {type(matcher).__name__!r}"]
+        if not is_dataclass(matcher):
+            # Not a matcher for a node, e.g. a list outside of a sequence. The type
+            # check never passes in practice, and the interpreter raises if it does.
+            evaluate = _node_fallback(matcher)
+            checks.append(self.fallback(evaluate, var, uses_metadata=False))
+            return _all(checks), True
+        for field in fields(matcher):
+            if field.name == "_metadata":
+                continue
+            desired = getattr(matcher, field.name)
+            if isinstance(desired, DoNotCareSentinel):
+                continue
+            if field.name == "metadata":
+                checks.append(self.metadata_matches(desired, var))
+            else:
+                checks.append(
+                    self.bind(f"{var}.{field.name}", self.attribute_matches, desired)
+                )
+        return _all(checks), True
+
+    def attribute_matches(self, matcher: object, var: str) -> str:
+        # Mirrors _attribute_matches.
+        if isinstance(matcher, DoNotCareSentinel):
+            return "True"
+        if isinstance(matcher, _InverseOf):
+            return f"(not {self.attribute_matches(matcher.matcher, var)})"
+        if isinstance(matcher, _ExtractMatchingNode):
+            return self.attribute_matches(matcher.matcher, var)
+        if isinstance(matcher, MatchIfTrue):
+            return self.predicate_matches(matcher, var)
+        if matcher is None or isinstance(matcher, (str, bool)):
+            return self.value_matches(matcher, var)
+        return self.node_or_sequence_matches(matcher, var)
+
+    def predicate_matches(self, matcher: MatchIfTrue[object], var: str) -> str:
+        # Also covers MatchRegex, which is a MatchIfTrue.
+        return f"{self.constant(matcher.func)}({var})"
+
+    def value_matches(self, matcher: Union[None, str, bool], var: str) -> str:
+        if matcher is None:
+            return f"({var} is None)"
+        if isinstance(matcher, str):
+            return f"({var} == {matcher!r})"
+        return f"({var} is {matcher!r})"
+
+    def node_or_sequence_matches(self, matcher: object, var: str) -> str:
+        # What the matcher means depends on whether the value is a sequence.
+        if isinstance(matcher, OneOf):
+            sequence_expression = self.one_of_sequences_match(matcher, var)
+        elif isinstance(matcher, AllOf):
+            sequence_expression = self.all_of_sequences_match(matcher, var)
+        elif isinstance(matcher, collections.abc.Sequence):
+            sequence_expression = self.sequence_matches(matcher, var)
+        else:
+            sequence_expression = "False"
+        node_expression, typed = self.matches(matcher, var)
+        if sequence_expression != "False":
+            return (
+                f"({sequence_expression} if isinstance({var}, _Sequence) "
+                f"else {node_expression})"
+            )
+        if typed:
+            # Sequences never have the class name of a matcher.
+            return node_expression
+        return f"(not isinstance({var}, _Sequence) and {node_expression})"
+
+    def one_of_sequences_match(self, matcher: OneOf[object], var: str) -> str:
+        # The expression for a OneOf when the value is a sequence.
+        options = []
+        for option in matcher.options:
+            if isinstance(option, collections.abc.Sequence):
+                options.append(self.sequence_matches(option, var))
+            elif isinstance(option, MatchIfTrue):
+                options.append(self.predicate_matches(option, var))
+                break
+        return _any(options)
+
+    def all_of_sequences_match(self, matcher: AllOf[object], var: str) -> str:
+        # The expression for an AllOf when the value is a sequence.
+        if not all(
+            isinstance(option, collections.abc.Sequence) for option in matcher.options
+        ):
+            return "False"
+        return _all(self.sequence_matches(option, var) for option in matcher.options)
+
+    def sequence_matches(self, matchers: Sequence[object], var: str) -> str:
+        # Mirrors _sequence_matches, for sequences that can only match a sequence of
+        # the same length.
+        if isinstance(matchers, str) or any(_has_wildcard(m) for m in matchers):
+            return self.fallback(_sequence_fallback(matchers), var)
+        checks = [f"len({var}) == {len(matchers)}"]
+        for i, matcher in enumerate(matchers):
+            while isinstance(matcher, _ExtractMatchingNode):
+                matcher = matcher.matcher
+            if isinstance(matcher, DoNotCareSentinel):
+                continue
+            checks.append(self.bind(f"{var}[{i}]", self.element_matches, matcher))
+        return _all(checks)
+
+    def metadata_matches(self, matcher: object, var: str) -> str:
+        # Mirrors _metadata_matches.
+        self.uses_metadata = True
+        if isinstance(matcher, OneOf):
+            return _any(self.metadata_matches(m, var) for m in matcher.options)
+        if isinstance(matcher, AllOf):
+            return _all(self.metadata_matches(m, var) for m in matcher.options)
+        if isinstance(matcher, _InverseOf):
+            return f"(not {self.metadata_matches(matcher.matcher, var)})"
+        if isinstance(matcher, _ExtractMatchingNode):
+            return self.metadata_matches(matcher.matcher, var)
+        if isinstance(matcher, (MatchMetadataIfTrue, MatchMetadata)):
+            value = self.local()
+            key = self.constant(matcher.key)
+            if isinstance(matcher, MatchMetadataIfTrue):
+                check = f"{self.constant(matcher.func)}({value})"
+            else:
+                check = f"{value} == {self.constant(matcher.value)}"
+            return f"((({value} := lookup({key}, {var})) is not _MISSING) and {check})"
+        # This raises the same error as the interpreter does.
+        return self.fallback(_metadata_fallback(matcher), var)
+
+
+def _any(expressions: Iterable[str]) -> str:
+    options = list(expressions)
+    if not options:
+        return "False"
+    if len(options) == 1:
+        return options[0]
+    return f"({' or '.join(options)})"
+
+
+def _all(expressions: Iterable[str]) -> str:
+    # Checks that always pass, like ones for a DoNotCare(), are left out.
+    checks = [e for e in expressions if e != "True"]
+    if not checks:
+        return "True"
+    if len(checks) == 1:
+        return checks[0]
+    return f"({' and '.join(checks)})"
+
+
+def _has_wildcard(matcher: object) -> bool:
+    if isinstance(matcher, _ExtractMatchingNode):
+        return _has_wildcard(matcher.matcher)
+    return isinstance(matcher, _BaseWildcardNode)
+
+
+def _node_fallback(matcher: object) -> Callable[[object, _MetadataLookupT], bool]:
+    def evaluate(node: object, lookup: _MetadataLookupT) -> bool:
+        # pyre-ignore[6]: The interpreter takes whatever the matcher was built from.
+        return _matches(node, matcher, lookup) is not None
+
+    return evaluate
+
+
+def _sequence_fallback(
+    matchers: Sequence[object],
+) -> Callable[[object, _MetadataLookupT], bool]:
+    def evaluate(nodes: object, lookup: _MetadataLookupT) -> bool:
+        # pyre-ignore[6]: The interpreter takes whatever the matcher was built from.
+        return _sequence_matches(nodes, matchers, lookup).sequence_capture is not None
+
+    return evaluate
+
+
+def _metadata_fallback(matcher: object) -> Callable[[object, _MetadataLookupT], bool]:
+    def evaluate(node: object, lookup: _MetadataLookupT) -> bool:
+        # pyre-ignore[6]: The interpreter takes whatever the matcher was built from.
+        return _metadata_matches(node, matcher, lookup) is not None
+
+    return evaluate
+
+
+class CompiledMatcher:
+    """
+    A matcher compiled by :func:`compile`. Call it with a node, and optionally a
+    ``metadata_resolver``, to find out whether the node matches, exactly like
+    :func:`matches` would.
+    """
+
+    def __init__(
+        self,
+        matcher: BaseMatcherNode,
+        function: Callable[[object, _MetadataLookupT], bool],
+        uses_metadata: bool,
+    ) -> None:
+        self._matcher = matcher
+        self._function = function
+        self._uses_metadata = uses_metadata
+
+    @property
+    def matcher(self) -> BaseMatcherNode:
+        """
+        The matcher that was compiled.
+        """
+        return self._matcher
+
+    def __call__(
+        self,
+        node: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode],
+        *,
+        metadata_resolver: Optional[
+            Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+        ] = None,
+    ) -> bool:
+        """
+        Returns whether the node matches, like :func:`matches` does when it's called
+        with the same arguments.
+        """
+        if not self._uses_metadata or metadata_resolver is None:
+            fetcher = _NO_METADATA
+        elif isinstance(metadata_resolver, libcst.MetadataWrapper):
+            fetcher = _construct_metadata_fetcher_wrapper(metadata_resolver)
+        else:
+            fetcher = _construct_metadata_fetcher_dependent(metadata_resolver)
+        return self._function(node, fetcher)
+
+    def __repr__(self) -> str:
+        return f"compile({self._matcher!r})"
+
+
+def compile(matcher: BaseMatcherNode) -> CompiledMatcher:
+    """
+    Compiles a matcher into a :class:`CompiledMatcher`, a function that returns
+    whether a node matches it, with the same result as :func:`matches`. Use this when
+    the same matcher is checked against many nodes, since a compiled matcher is much
+    faster to evaluate. For example::
+
+        is_print = m.compile(m.Call(func=m.Name("print")))
+        prints = [node for node in nodes if is_print(node)]
+
+    Compiling works out once what each part of the matcher checks, instead of every
+    time it's evaluated. Checks for the type of the node come first, parts of the
+    matcher that match anything are left out, and nested matchers are compiled into
+    the same function rather than evaluated one by one.
+
+    The matchers that decorate the functions of a :class:`MatcherDecoratableVisitor`
+    or a :class:`MatcherDecoratableTransformer` are compiled automatically.
+    """
+    compiler = _Compiler()
+    if isinstance(matcher, (AtLeastN, AtMostN, MatchIfTrue, _BaseMetadataMatcher)):
+        # These are never allowed at the top level, so they never match.
+        expression = "False"
+    else:
+        expression, typed = compiler.matches(matcher, "node")
+        if not typed:
+            expression = f"(node is not _REMOVE and {expression})"
+    source = f"def _compiled(node, lookup):\n    return True if {expression} else False"
+    exec(source, compiler.namespace)
+    function = compiler.namespace["_compiled"]
+    # pyre-ignore[6]: exec defined it.
+    return CompiledMatcher(matcher, function, compiler.uses_metadata)
@@ -13,6 +13,7 @@ from typing import (
     Callable,
     cast,
     Dict,
+    Generator,
     Generic,
     Iterator,
     List,
@@ -21,6 +22,7 @@ from typing import (
     Optional,
     Pattern,
     Sequence,
+    Set,
     Tuple,
     Type,
     TypeVar,
@@ -556,6 +558,9 @@ class MatchMetadata(_BaseMetadataMatcher):
     raised and ask you to provide a :class:`~libcst.metadata.MetadataWrapper`.
     If the metadata value does not exist for a particular node, :class:`MatchMetadata`
     will be considered not a match.
+    Metadata is only looked up once the rest of a node matcher matches, so listing
+    the provider in :attr:`~libcst.MetadataDependent.DEFERRED_METADATA_DEPENDENCIES`
+    of a visitor means that it's only computed if some node gets that far.
 
     For example, to match against any function call which has one parameter which
     is used in a load expression context::
@@ -1038,155 +1043,226 @@ class _SequenceMatchesResult:
     ]
 
 
-def _sequence_matches(  # noqa: C901
-    nodes: Sequence[Union[MaybeSentinel, libcst.CSTNode]],
-    matchers: Sequence[
-        Union[
-            BaseMatcherNode,
-            _BaseWildcardNode,
-            MatchIfTrue[libcst.CSTNode],
-            _BaseMetadataMatcher,
-            DoNotCareSentinel,
-        ]
-    ],
-    metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
-) -> _SequenceMatchesResult:
-    if not nodes and not matchers:
-        # Base case, empty lists are always matches
-        return _SequenceMatchesResult({}, None)
-    if not nodes and matchers:
-        # Base case, we have one or more matcher that wasn't matched
-        if all(_matches_zero_nodes(m) for m in matchers):
-            return _SequenceMatchesResult(
-                # pyre-ignore[16]: `MatchIfTrue` has no attribute `name`.
-                {m.name: () for m in matchers if isinstance(m, _ExtractMatchingNode)},
-                (),
-            )
-        else:
-            return _SequenceMatchesResult(None, None)
-    if nodes and not matchers:
-        # Base case, we have nodes left that don't match any matcher
-        return _SequenceMatchesResult(None, None)
+_SequenceMatcherT = Union[
+    BaseMatcherNode,
+    _BaseWildcardNode,
+    MatchIfTrue[libcst.CSTNode],
+    _BaseMetadataMatcher,
+    DoNotCareSentinel,
+]
+# How far a sequence match has got: the index of the next node, the index of the next
+# matcher, how many SaveMatchedNode wrappers of that matcher have been unwrapped, and
+# how many more nodes it has to match (for AtLeastN) or may match (for AtMostN).
+_SequenceStateT = Tuple[int, int, int, int]
+# The nodes a matcher matched: a single node, or the start and end index of the nodes
+# that a wildcard matched.
+_SequenceMatchedT = Optional[Union[MaybeSentinel, libcst.CSTNode, Tuple[int, int]]]
+_SequenceCaptureT = Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]
+# The captures and matched nodes of a state, or None if it doesn't match.
+_SequenceOutcomeT = Optional[Tuple[_SequenceCaptureT, _SequenceMatchedT]]
+
+
+class _SequenceMatcher:
+    """
+    Finds the match that trying the matchers of a sequence in order would, where
+    wildcards first try to match one more node and then to match no more nodes.
+
+    Instead of backtracking into the same state of the match again and again, which
+    takes exponential time for several wildcards in a row, the outcome of every state
+    is worked out once, from an explicit stack. It only depends on the state, so this
+    finds the same match with the same captures, in time proportional to the number
+    of nodes times the number of matchers.
+    """
 
-    # Recursive case, nodes and matchers LHS matches
-    node = nodes[0]
-    matcher = matchers[0]
-    if isinstance(matcher, DoNotCareSentinel):
-        # We don't care about the value for this node.
-        return _SequenceMatchesResult(
-            _sequence_matches(
-                nodes[1:], matchers[1:], metadata_lookup
-            ).sequence_capture,
-            node,
-        )
-    elif isinstance(matcher, _BaseWildcardNode):
-        if isinstance(matcher, AtMostN):
-            if matcher.n > 0:
-                # First, assume that this does match a node (greedy).
-                # Consume one node since it matched this matcher.
-                attribute_capture = _attribute_matches(
-                    nodes[0], matcher.matcher, metadata_lookup
-                )
-                if attribute_capture is not None:
-                    result = _sequence_matches(
-                        nodes[1:],
-                        [AtMostN(matcher.matcher, n=matcher.n - 1), *matchers[1:]],
-                        metadata_lookup,
-                    )
-                    if result.sequence_capture is not None:
-                        matched = result.matched_nodes
-                        assert isinstance(matched, Sequence)
-                        return _SequenceMatchesResult(
-                            {**attribute_capture, **result.sequence_capture},
-                            # pyre-fixme[6]: Expected `Union[None, Sequence[libcst._n...
-                            (node, *matched),
-                        )
-            # Finally, assume that this does not match the current node.
-            # Consume the matcher but not the node.
-            return _SequenceMatchesResult(
-                _sequence_matches(
-                    nodes, matchers[1:], metadata_lookup
-                ).sequence_capture,
-                (),
+    def __init__(
+        self,
+        nodes: Sequence[Union[MaybeSentinel, libcst.CSTNode]],
+        matchers: Sequence[_SequenceMatcherT],
+        metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
+    ) -> None:
+        self.nodes = nodes
+        self.matchers = matchers
+        self.metadata_lookup = metadata_lookup
+        # The matcher at each position, followed by the ones it saves, if any.
+        self.chains: List[List[_SequenceMatcherT]] = []
+        for matcher in matchers:
+            chain = [matcher]
+            while isinstance(chain[-1], _ExtractMatchingNode):
+                # pyre-ignore[16]: We just checked that this is a SaveMatchedNode.
+                chain.append(chain[-1].matcher)
+            self.chains.append(chain)
+        # Whether each node matches each wildcard, and what it captures if it does.
+        # Other matchers are only ever checked against a node once.
+        self.wildcard_captures: Dict[
+            Tuple[int, int, int], Optional[_SequenceCaptureT]
+        ] = {}
+        self.outcomes: Dict[_SequenceStateT, _SequenceOutcomeT] = {}
+
+    def start(
+        self, node_index: int, matcher_index: int, depth: int = 0
+    ) -> _SequenceStateT:
+        if matcher_index < len(self.chains):
+            matcher = self.chains[matcher_index][depth]
+            if isinstance(matcher, _BaseWildcardNode):
+                return (node_index, matcher_index, depth, matcher.n)
+        return (node_index, matcher_index, depth, 0)
+
+    def matched_nodes(
+        self, matched: _SequenceMatchedT
+    ) -> Optional[Union[libcst.CSTNode, MaybeSentinel, Sequence[libcst.CSTNode]]]:
+        if isinstance(matched, tuple):
+            # pyre-ignore[7]: Sequences being matched only contain nodes.
+            return tuple(self.nodes[matched[0] : matched[1]])
+        return matched
+
+    def wildcard_capture(
+        self, node_index: int, matcher_index: int, depth: int
+    ) -> Optional[_SequenceCaptureT]:
+        key = (node_index, matcher_index, depth)
+        if key not in self.wildcard_captures:
+            matcher = self.chains[matcher_index][depth]
+            assert isinstance(matcher, _BaseWildcardNode)
+            self.wildcard_captures[key] = _attribute_matches(
+                self.nodes[node_index], matcher.matcher, self.metadata_lookup
             )
-        elif isinstance(matcher, AtLeastN):
-            if matcher.n > 0:
-                # Only match if we can consume one of the matches, since we still
-                # need to match N nodes.
-                attribute_capture = _attribute_matches(
-                    nodes[0], matcher.matcher, metadata_lookup
-                )
-                if attribute_capture is not None:
-                    result = _sequence_matches(
-                        nodes[1:],
-                        [AtLeastN(matcher.matcher, n=matcher.n - 1), *matchers[1:]],
-                        metadata_lookup,
-                    )
-                    if result.sequence_capture is not None:
-                        matched = result.matched_nodes
-                        assert isinstance(matched, Sequence)
-                        return _SequenceMatchesResult(
-                            {**attribute_capture, **result.sequence_capture},
-                            # pyre-fixme[6]: Expected `Union[None, Sequence[libcst._n...
-                            (node, *matched),
-                        )
-                return _SequenceMatchesResult(None, None)
-            else:
-                # First, assume that this does match a node (greedy).
-                # Consume one node since it matched this matcher.
-                attribute_capture = _attribute_matches(
-                    nodes[0], matcher.matcher, metadata_lookup
-                )
-                if attribute_capture is not None:
-                    result = _sequence_matches(nodes[1:], matchers, metadata_lookup)
-                    if result.sequence_capture is not None:
-                        matched = result.matched_nodes
-                        assert isinstance(matched, Sequence)
-                        return _SequenceMatchesResult(
-                            {**attribute_capture, **result.sequence_capture},
-                            # pyre-fixme[6]: Expected `Union[None, Sequence[libcst._n...
-                            (node, *matched),
-                        )
-                # Now, assume that this does not match the current node.
-                # Consume the matcher but not the node.
-                return _SequenceMatchesResult(
-                    _sequence_matches(
-                        nodes, matchers[1:], metadata_lookup
-                    ).sequence_capture,
-                    (),
-                )
+        return self.wildcard_captures[key]
+
+    def is_end(self, state: _SequenceStateT) -> bool:
+        return state[0] == len(self.nodes) or state[1] == len(self.matchers)
+
+    def end_outcome(self, state: _SequenceStateT) -> _SequenceOutcomeT:
+        # The outcome of a state without any nodes or any matchers left.
+        node_index, matcher_index, depth, n = state
+        if matcher_index == len(self.matchers):
+            if node_index == len(self.nodes):
+                # Base case, empty lists are always matches
+                return ({}, None)
+            # Base case, we have nodes left that don't match any matcher
+            return None
+        # Base case, we have one or more matcher that wasn't matched
+        matcher = self.chains[matcher_index][depth]
+        rest = self.matchers[matcher_index + 1 :]
+        if isinstance(matcher, AtLeastN):
+            matches_zero_nodes = n == 0
         else:
-            # There are no other types of wildcard consumers, but we're making
-            # pyre happy with that fact.
-            raise Exception(f"Logic error unrecognized wildcard {type(matcher)}!")
-    elif isinstance(matcher, _ExtractMatchingNode):
-        # See if the raw matcher matches. If it does, capture the sequence we matched and store it.
-        result = _sequence_matches(
-            nodes, [matcher.matcher, *matchers[1:]], metadata_lookup
-        )
-        if result.sequence_capture is not None:
-            return _SequenceMatchesResult(
+            matches_zero_nodes = _matches_zero_nodes(matcher)
+        if matches_zero_nodes and all(_matches_zero_nodes(m) for m in rest):
+            return (
                 {
-                    # Our own match capture comes first, since we wnat to allow the same
-                    # name later in the sequence to override us.
-                    matcher.name: result.matched_nodes,
-                    **result.sequence_capture,
+                    # pyre-ignore[16]: `MatchIfTrue` has no attribute `name`.
+                    m.name: ()
+                    for m in (matcher, *rest)
+                    if isinstance(m, _ExtractMatchingNode)
                 },
-                result.matched_nodes,
+                (node_index, node_index),
             )
-        return _SequenceMatchesResult(None, None)
+        return None
 
-    match_capture = _matches(node, matcher, metadata_lookup)
-    if match_capture is not None:
-        # These values match directly
-        result = _sequence_matches(nodes[1:], matchers[1:], metadata_lookup)
-        if result.sequence_capture is not None:
-            return _SequenceMatchesResult(
-                {**match_capture, **result.sequence_capture}, node
+    def outcome(
+        self, state: _SequenceStateT
+    ) -> Generator[_SequenceStateT, _SequenceOutcomeT, _SequenceOutcomeT]:
+        # Yields the states whose outcome the outcome of this state depends on, which
+        # are sent back, and returns it. The state has nodes and matchers left.
+        node_index, matcher_index, depth, _ = state
+        node = self.nodes[node_index]
+        matcher = self.chains[matcher_index][depth]
+
+        if isinstance(matcher, DoNotCareSentinel):
+            # We don't care about the value for this node.
+            outcome = yield self.start(node_index + 1, matcher_index + 1)
+            if outcome is None:
+                return None
+            return (outcome[0], node)
+        elif isinstance(matcher, _BaseWildcardNode):
+            return (yield from self.wildcard_outcome(state, matcher))
+        elif isinstance(matcher, _ExtractMatchingNode):
+            # See if the raw matcher matches. If it does, capture the sequence we
+            # matched and store it.
+            outcome = yield self.start(node_index, matcher_index, depth + 1)
+            if outcome is None:
+                return None
+            return (
+                {
+                    # Our own match capture comes first, since we want to allow the
+                    # same name later in the sequence to override us.
+                    matcher.name: self.matched_nodes(outcome[1]),
+                    **outcome[0],
+                },
+                outcome[1],
             )
 
-    # Failed recursive case, no match
-    return _SequenceMatchesResult(None, None)
+        capture = _matches(node, matcher, self.metadata_lookup)
+        if capture is None:
+            return None
+        # These values match directly
+        outcome = yield self.start(node_index + 1, matcher_index + 1)
+        if outcome is None:
+            return None
+        return ({**capture, **outcome[0]}, node)
+
+    def wildcard_outcome(
+        self, state: _SequenceStateT, matcher: _BaseWildcardNode
+    ) -> Generator[_SequenceStateT, _SequenceOutcomeT, _SequenceOutcomeT]:
+        # Like outcome, for a state whose matcher is a ZeroOrMore, AtLeastN or AtMostN
+        # wildcard, where n is how many more nodes the wildcard can (or, for AtLeastN,
+        # has to) match.
+        node_index, matcher_index, depth, n = state
+        if n > 0 or isinstance(matcher, AtLeastN):
+            # First, assume that this does match a node (greedy).
+            # Consume one node since it matched this matcher.
+            capture = self.wildcard_capture(node_index, matcher_index, depth)
+            if capture is not None:
+                child = (node_index + 1, matcher_index, depth, max(n - 1, 0))
+                outcome = yield child
+                if outcome is not None:
+                    matched = outcome[1]
+                    assert isinstance(matched, tuple)
+                    return ({**capture, **outcome[0]}, (node_index, matched[1]))
+            if isinstance(matcher, AtLeastN) and n > 0:
+                # We still need to match N nodes.
+                return None
+        # Now, assume that this does not match the current node.
+        # Consume the matcher but not the node.
+        outcome = yield self.start(node_index, matcher_index + 1)
+        if outcome is None:
+            return None
+        return (outcome[0], (node_index, node_index))
+
+    def match(self) -> _SequenceMatchesResult:
+        outcomes = self.outcomes
+        root = self.start(0, 0)
+        if self.is_end(root):
+            outcomes[root] = self.end_outcome(root)
+        stack = [(root, self.outcome(root))] if root not in outcomes else []
+        outcome: _SequenceOutcomeT = None
+        while stack:
+            state, generator = stack[-1]
+            try:
+                child = generator.send(outcome)
+            except StopIteration as done:
+                # Send the outcome of this state to the state that needs it.
+                outcome = outcomes[state] = done.value
+                stack.pop()
+                continue
+            if child in outcomes:
+                outcome = outcomes[child]
+            elif self.is_end(child):
+                outcome = outcomes[child] = self.end_outcome(child)
+            else:
+                stack.append((child, self.outcome(child)))
+                outcome = None
+        outcome = outcomes[root]
+        if outcome is None:
+            return _SequenceMatchesResult(None, None)
+        return _SequenceMatchesResult(outcome[0], self.matched_nodes(outcome[1]))
+
+
+def _sequence_matches(
+    nodes: Sequence[Union[MaybeSentinel, libcst.CSTNode]],
+    matchers: Sequence[_SequenceMatcherT],
+    metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
+) -> _SequenceMatchesResult:
+    return _SequenceMatcher(nodes, matchers, metadata_lookup).match()
 
 
 _AttributeValueT = Optional[Union[MaybeSentinel, libcst.CSTNode, str, bool]]
@@ -1612,9 +1688,12 @@ class _FindAllVisitor(libcst.CSTVisitor):
             ],
         ],
         metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
+        *,
+        first_only: bool = False,
     ) -> None:
         self.matcher = matcher
         self.metadata_lookup = metadata_lookup
+        self.first_only = first_only
         self.found_nodes: List[libcst.CSTNode] = []
         self.extracted_nodes: List[
             Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]
@@ -1625,9 +1704,80 @@ class _FindAllVisitor(libcst.CSTVisitor):
         if match is not None:
             self.found_nodes.append(node)
             self.extracted_nodes.append(match)
+            if self.first_only:
+                self.stop_traversal()
         return True
 
 
+def _matched_class_names(
+    matcher: Union[
+        BaseMatcherNode,
+        MatchIfTrue[libcst.CSTNode],
+        _BaseMetadataMatcher,
+        _InverseOf[
+            Union[
+                BaseMatcherNode,
+                MatchIfTrue[libcst.CSTNode],
+                _BaseMetadataMatcher,
+            ]
+        ],
+        _ExtractMatchingNode[
+            Union[
+                BaseMatcherNode,
+                MatchIfTrue[libcst.CSTNode],
+                _BaseMetadataMatcher,
+            ]
+        ],
+    ],
+    *,
+    top_level: bool = True,
+) -> Optional[Set[str]]:
+    # Returns the names of the node classes that the matcher can match, mirroring
+    # _matches (at the top level) and _node_matches, or None if it could match a
+    # node of any class.
+    if top_level and isinstance(matcher, (OneOf, TypeOf)):
+        names = set()
+        for option in matcher.options:
+            option_names = _matched_class_names(option, top_level=False)
+            if option_names is None:
+                return None
+            names |= option_names
+        return names
+    if top_level and isinstance(matcher, AllOf):
+        all_names = None
+        for option in matcher.options:
+            option_names = _matched_class_names(option, top_level=False)
+            if option_names is not None:
+                all_names = (
+                    option_names if all_names is None else all_names & option_names
+                )
+        return all_names
+    if isinstance(matcher, _ExtractMatchingNode):
+        return _matched_class_names(matcher.matcher, top_level=False)
+    if isinstance(
+        matcher, (_InverseOf, MatchIfTrue, MatchMetadata, MatchMetadataIfTrue)
+    ):
+        return None
+    return {matcher.__class__.__name__}
+
+
+def _node_type_index(
+    root: libcst.CSTNode,
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ],
+) -> Optional[meta.NodeTypeIndex]:
+    # Returns the index of the tree that root is in, if the resolver has one.
+    if metadata_resolver is None:
+        return None
+    if isinstance(metadata_resolver, libcst.MetadataWrapper):
+        resolved = metadata_resolver._metadata
+    else:
+        resolved = metadata_resolver.metadata
+    index = resolved.get(meta.NodeTypeIndexProvider, {}).get(root)
+    return index if isinstance(index, meta.NodeTypeIndex) else None
+
+
 def _find_or_extract_all(
     tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
     matcher: Union[
@@ -1652,6 +1802,7 @@ def _find_or_extract_all(
     metadata_resolver: Optional[
         Union[libcst.MetadataDependent, libcst.MetadataWrapper]
     ] = None,
+    first_only: bool = False,
 ) -> Tuple[
     Sequence[libcst.CSTNode],
     Sequence[Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]],
@@ -1676,7 +1827,24 @@ def _find_or_extract_all(
     else:
         fetcher = _construct_metadata_fetcher_dependent(metadata_resolver)
 
-    finder = _FindAllVisitor(matcher, fetcher)
+    root = tree.module if isinstance(tree, meta.MetadataWrapper) else tree
+    index = _node_type_index(root, metadata_resolver)
+    names = _matched_class_names(matcher) if index is not None else None
+    if index is not None and names is not None:
+        # Only the nodes of the classes the matcher can match need testing, and
+        # the index has them in the order a traversal would visit them in.
+        found_nodes = []
+        extracted_nodes = []
+        for node in index.nodes_of_types(lambda t: t.__name__ in names, root):
+            match = _matches(node, matcher, fetcher)
+            if match is not None:
+                found_nodes.append(node)
+                extracted_nodes.append(match)
+                if first_only:
+                    break
+        return found_nodes, extracted_nodes
+
+    finder = _FindAllVisitor(matcher, fetcher, first_only=first_only)
     tree.visit(finder)
     return finder.found_nodes, finder.extracted_nodes
 
@@ -1714,6 +1882,52 @@ def findall(
     return nodes
 
 
+def find_first(
+    tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
+    matcher: Union[BaseMatcherNode, MatchIfTrue[libcst.CSTNode], _BaseMetadataMatcher],
+    *,
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ] = None,
+) -> Optional[libcst.CSTNode]:
+    """
+    Like :func:`findall`, but returns only the first node that matches the given
+    matcher, or ``None`` if none of them do. Nodes are matched in the order they're
+    visited in, so a node comes before its children, and its children come in the
+    order they appear in the code. The traversal stops at the first match, so the
+    work done is proportional to how early in the tree the match is, rather than to
+    the size of the tree.
+
+    The tree, matcher and ``metadata_resolver`` can be anything that
+    :func:`findall` accepts.
+    """
+    nodes, _ = _find_or_extract_all(
+        tree, matcher, metadata_resolver=metadata_resolver, first_only=True
+    )
+    return nodes[0] if nodes else None
+
+
+def contains(
+    tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
+    matcher: Union[BaseMatcherNode, MatchIfTrue[libcst.CSTNode], _BaseMetadataMatcher],
+    *,
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ] = None,
+) -> bool:
+    """
+    Returns ``True`` if the tree or any of its children match the given matcher. This
+    is equivalent to checking whether :func:`findall` returns any nodes, but stops at
+    the first match, like :func:`find_first`. It's a cheap check to make before
+    doing anything more expensive with a tree, e.g. whether a module calls a
+    function at all before transforming it.
+
+    The tree, matcher and ``metadata_resolver`` can be anything that
+    :func:`findall` accepts.
+    """
+    return find_first(tree, matcher, metadata_resolver=metadata_resolver) is not None
+
+
 def extractall(
     tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
     matcher: Union[BaseMatcherNode, MatchIfTrue[libcst.CSTNode], _BaseMetadataMatcher],
@@ -1884,9 +2098,8 @@ def replace(
     the supplied matcher with the replacement node. If you provide a callable,
     :func:`replace` will run :func:`extract` over all matched nodes and call the
     callable with both the node that should be replaced and the dictionary returned
-    by :func:`extract`. Under all circumstances a new tree is returned.
-    :func:`extract` should be viewed as a short-cut to writing a transform which
-    also returns a new tree even when no changes are applied.
+    by :func:`extract`. Like any transform, :func:`replace` only rebuilds the nodes
+    that contain a replacement, and returns ``tree`` itself if nothing matched.
 
     Note that the tree can also be a :class:`~libcst.RemovalSentinel` or a
     :class:`~libcst.MaybeSentinel` in order to use replace directly on transform
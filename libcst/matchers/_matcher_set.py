@@ -0,0 +1,289 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Checks many matchers against every node of a tree in a single traversal. Each node
+is only checked against the matchers that can match it, found by looking up its type
+and then the value of the string attribute that most of those matchers require.
+"""
+
+import collections.abc
+from dataclasses import fields, is_dataclass
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+import libcst
+import libcst.metadata as meta
+from libcst import MaybeSentinel, RemovalSentinel
+from libcst.matchers._compile import compile
+from libcst.matchers._matcher_base import (
+    _BaseMetadataMatcher,
+    _BaseWildcardNode,
+    _construct_metadata_fetcher_dependent,
+    _construct_metadata_fetcher_null,
+    _construct_metadata_fetcher_wrapper,
+    _ExtractMatchingNode,
+    _matched_class_names,
+    _matches,
+    _node_type_index,
+    AllOf,
+    AtLeastN,
+    AtMostN,
+    BaseMatcherNode,
+    MatchIfTrue,
+    OneOf,
+    TypeOf,
+)
+
+_MatcherT = Union[BaseMatcherNode, MatchIfTrue[libcst.CSTNode], _BaseMetadataMatcher]
+_MetadataLookupT = Callable[[meta.ProviderT, libcst.CSTNode], object]
+_CaptureT = Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]
+# The attributes to follow from a node to reach a string attribute, along with the
+# class name the value of each has to have, and the name of the string attribute.
+_FieldPathT = Tuple[Tuple[Tuple[str, str], ...], str]
+
+
+class _Candidate:
+    """
+    A matcher of a :class:`MatcherSet`, and a function that returns whether a node
+    matches it.
+    """
+
+    __slots__ = ("name", "matcher", "predicate", "saves", "class_names", "fields")
+
+    def __init__(self, name: str, matcher: _MatcherT) -> None:
+        self.name = name
+        self.matcher = matcher
+        self.predicate: Callable[[libcst.CSTNode, _MetadataLookupT], bool]
+        if isinstance(matcher, (MatchIfTrue, _BaseMetadataMatcher)):
+            # findall accepts these at the top level, unlike compile.
+            self.predicate = lambda node, lookup: (
+                _matches(node, matcher, lookup) is not None
+            )
+        else:
+            # pyre-ignore[16]: The compiled function is internal to the package.
+            self.predicate = compile(matcher)._function
+        # Matchers that don't save anything always capture nothing, so there's no
+        # need to evaluate them again to find their captures.
+        self.saves: bool = _saves(matcher)
+        self.class_names: Optional[Set[str]] = _matched_class_names(matcher)
+        self.fields: Dict[_FieldPathT, str] = dict(_string_fields(matcher, ()))
+
+
+def _saves(matcher: object) -> bool:
+    # Whether the matcher might capture something. Inverted matchers never do.
+    if isinstance(matcher, _ExtractMatchingNode):
+        return True
+    if isinstance(matcher, (OneOf, AllOf, TypeOf)):
+        return any(_saves(option) for option in matcher.options)
+    if isinstance(matcher, _BaseWildcardNode):
+        return _saves(matcher.matcher)
+    if isinstance(matcher, collections.abc.Sequence) and not isinstance(matcher, str):
+        return any(_saves(element) for element in matcher)
+    if isinstance(matcher, BaseMatcherNode) and is_dataclass(matcher):
+        return any(_saves(getattr(matcher, field.name)) for field in fields(matcher))
+    return False
+
+
+def _string_fields(
+    matcher: object, steps: Tuple[Tuple[str, str], ...]
+) -> Iterator[Tuple[_FieldPathT, str]]:
+    # The string attributes that a node has to have to match the matcher, with the
+    # path to each. Only attributes of plain node matchers are followed, since only
+    # they require every attribute to match.
+    while isinstance(matcher, _ExtractMatchingNode):
+        matcher = matcher.matcher
+    if not isinstance(matcher, BaseMatcherNode) or not is_dataclass(matcher):
+        return
+    for field in fields(matcher):
+        if field.name in ("_metadata", "metadata"):
+            continue
+        desired = getattr(matcher, field.name)
+        while isinstance(desired, _ExtractMatchingNode):
+            desired = desired.matcher
+        if isinstance(desired, str):
+            yield (steps, field.name), desired
+        else:
+            yield from _string_fields(
+                desired, (*steps, (field.name, desired.__class__.__name__))
+            )
+
+
+class _NodeTypeCandidates:
+    """
+    The candidates that can match nodes of one type. Those that require the same
+    string attribute are keyed on its value, so only the ones whose value the node
+    has are checked.
+    """
+
+    __slots__ = ("path", "keyed", "unkeyed")
+
+    def __init__(self, candidates: Sequence[_Candidate]) -> None:
+        # Key on the attribute that the most candidates require.
+        counts: Dict[_FieldPathT, int] = {}
+        for candidate in candidates:
+            for path in candidate.fields:
+                counts[path] = counts.get(path, 0) + 1
+        self.path: Optional[_FieldPathT] = (
+            max(counts, key=counts.__getitem__) if counts else None
+        )
+        # The candidates for each value of the attribute, and for any other value,
+        # in the order they were added to the set.
+        self.unkeyed: Sequence[_Candidate] = [
+            c for c in candidates if self.path not in c.fields
+        ]
+        self.keyed: Dict[str, Sequence[_Candidate]] = {}
+        for value in {c.fields[self.path] for c in candidates if self.path in c.fields}:
+            self.keyed[value] = [
+                c
+                for c in candidates
+                if self.path not in c.fields or c.fields[self.path] == value
+            ]
+
+    def candidates(self, node: libcst.CSTNode) -> Sequence[_Candidate]:
+        path = self.path
+        if path is None:
+            return self.unkeyed
+        steps, attribute = path
+        value: object = node
+        for step, class_name in steps:
+            value = getattr(value, step)
+            if value.__class__.__name__ != class_name:
+                return self.unkeyed
+        value = getattr(value, attribute)
+        if not isinstance(value, str):
+            return self.unkeyed
+        return self.keyed.get(value, self.unkeyed)
+
+
+class _MatcherSetVisitor(libcst.CSTVisitor):
+    def __init__(
+        self,
+        candidates: Callable[[libcst.CSTNode], Sequence[_Candidate]],
+        metadata_lookup: _MetadataLookupT,
+    ) -> None:
+        self.candidates = candidates
+        self.metadata_lookup = metadata_lookup
+        self.found: List[Tuple[str, libcst.CSTNode, _CaptureT]] = []
+
+    def on_visit(self, node: libcst.CSTNode) -> bool:
+        for candidate in self.candidates(node):
+            if not candidate.predicate(node, self.metadata_lookup):
+                continue
+            if candidate.saves:
+                match = _matches(node, candidate.matcher, self.metadata_lookup)
+                assert match is not None
+            else:
+                match = {}
+            self.found.append((candidate.name, node, match))
+        return True
+
+
+class MatcherSet:
+    """
+    A set of named matchers that are all checked against every node of a tree in a
+    single traversal, which is much faster than calling :func:`findall` for each of
+    them when there are many. For example::
+
+        checks = m.MatcherSet(
+            {
+                "print": m.Call(func=m.Name("print")),
+                "eval": m.Call(func=m.Name("eval")),
+                "assert_tuple": m.Assert(test=m.Tuple()),
+            }
+        )
+        for name, node, captures in checks.findall(module):
+            ...
+
+    Each node is only checked against the matchers that can match nodes of its type.
+    Among those, matchers that require the same string attribute (like the ``value``
+    of the :class:`~libcst.Name` in a :class:`~libcst.Call`'s ``func`` above) are
+    grouped by its value, so they cost a single lookup for nodes that match none of
+    them. Matchers are compiled with :func:`compile` to check the remaining ones.
+    """
+
+    def __init__(self, matchers: Mapping[str, _MatcherT]) -> None:
+        self._candidates: Sequence[_Candidate] = [
+            _Candidate(name, matcher)
+            for name, matcher in matchers.items()
+            # These are forbidden at the top level, so they never match.
+            if not isinstance(matcher, (AtLeastN, AtMostN))
+        ]
+        self._node_types: Dict[Type[libcst.CSTNode], _NodeTypeCandidates] = {}
+        self._uses_every_type: bool = any(
+            c.class_names is None for c in self._candidates
+        )
+
+    def _node_candidates(self, node: libcst.CSTNode) -> Sequence[_Candidate]:
+        node_type = type(node)
+        candidates = self._node_types.get(node_type)
+        if candidates is None:
+            name = node_type.__name__
+            candidates = self._node_types[node_type] = _NodeTypeCandidates(
+                [
+                    c
+                    for c in self._candidates
+                    if c.class_names is None or name in c.class_names
+                ]
+            )
+        return candidates.candidates(node)
+
+    def findall(
+        self,
+        tree: Union[
+            MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper
+        ],
+        *,
+        metadata_resolver: Optional[
+            Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+        ] = None,
+    ) -> Sequence[Tuple[str, libcst.CSTNode, _CaptureT]]:
+        """
+        Given an arbitrary node from a LibCST tree, and an optional metadata
+        resolver, returns ``(name, node, captures)`` for every node in the tree that
+        matches one of the matchers, in the order the nodes are visited in and then
+        in the order the matchers were given in. ``captures`` is what
+        :func:`extractall` would have captured for the node. The arguments work
+        like those of :func:`findall`, and metadata is only fetched for matchers
+        that use it.
+        """
+        if isinstance(tree, (RemovalSentinel, MaybeSentinel)):
+            # We can't possibly match on a removal sentinel, so it doesn't match.
+            return []
+
+        if isinstance(tree, meta.MetadataWrapper) and metadata_resolver is None:
+            # Provide a convenience for calling findall directly on a MetadataWrapper.
+            metadata_resolver = tree
+
+        if metadata_resolver is None:
+            fetcher = _construct_metadata_fetcher_null()
+        elif isinstance(metadata_resolver, libcst.MetadataWrapper):
+            fetcher = _construct_metadata_fetcher_wrapper(metadata_resolver)
+        else:
+            fetcher = _construct_metadata_fetcher_dependent(metadata_resolver)
+
+        finder = _MatcherSetVisitor(self._node_candidates, fetcher)
+        root = tree.module if isinstance(tree, meta.MetadataWrapper) else tree
+        index = _node_type_index(root, metadata_resolver)
+        if index is not None and not self._uses_every_type:
+            # Only the nodes of the classes the matchers can match need testing,
+            # and the index has them in the order a traversal would visit them in.
+            names = set().union(*(c.class_names or () for c in self._candidates))
+            for node in index.nodes_of_types(lambda t: t.__name__ in names, root):
+                finder.on_visit(node)
+        else:
+            tree.visit(finder)
+        return finder.found
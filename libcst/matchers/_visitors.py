@@ -4,10 +4,12 @@
 # LICENSE file in the root directory of this source tree.
 
 from inspect import ismethod, signature
+from types import MethodType
 from typing import (
     Any,
     Callable,
     cast,
+    Collection,
     Dict,
     get_type_hints,
     List,
@@ -18,10 +20,13 @@ from typing import (
     Type,
     Union,
 )
+from weakref import WeakKeyDictionary
 
 import libcst as cst
 from libcst import CSTTransformer, CSTVisitor
+from libcst._reachability import handled_node_types
 from libcst._types import CSTNodeT
+from libcst.matchers._compile import compile, CompiledMatcher
 from libcst.matchers._decorators import (
     CONSTRUCTED_LEAVE_MATCHER_ATTR,
     CONSTRUCTED_VISIT_MATCHER_ATTR,
@@ -29,6 +34,7 @@ from libcst.matchers._decorators import (
     VISIT_POSITIVE_MATCHER_ATTR,
 )
 from libcst.matchers._matcher_base import (
+    _matched_class_names,
     AllOf,
     AtLeastN,
     AtMostN,
@@ -360,37 +366,207 @@ def _gather_constructed_leave_funcs(
     return constructed_visitors
 
 
+def _compiled_matches(
+    visitor: Union["MatcherDecoratableTransformer", "MatcherDecoratableVisitor"],
+    node: cst.CSTNode,
+    matcher: BaseMatcherNode,
+) -> bool:
+    # The matchers of a visitor are checked against every node, so they're compiled
+    # the first time they're used.
+    compiled = visitor._compiled_matchers.get(matcher)
+    if compiled is None:
+        compiled = visitor._compiled_matchers[matcher] = compile(matcher)
+    return compiled(node, metadata_resolver=visitor)
+
+
+class _NodeTypeMatchers:
+    """
+    The matchers of a visitor that can match nodes of one type, so that only those
+    are evaluated for each node of the type.
+    """
+
+    __slots__ = ("gating", "visit", "leave")
+
+    def __init__(
+        self,
+        gating: Sequence[BaseMatcherNode],
+        visit: Sequence[BaseMatcherNode],
+        leave: Sequence[BaseMatcherNode],
+    ) -> None:
+        self.gating = gating
+        self.visit = visit
+        # In the order the leave functions are called in.
+        self.leave = leave
+
+
+# A method gathered from the first instance of a visitor class, and whether it has to
+# be bound to each instance.
+# pyre-ignore We only care that the method is callable.
+_UnboundFunc = Tuple[Callable[..., Any], bool]
+
+
+# pyre-ignore We only care that func is callable.
+def _unbind(visitor: object, func: Callable[..., Any]) -> _UnboundFunc:
+    if ismethod(func) and func.__self__ is visitor:
+        return (func.__func__, True)
+    return (func, False)
+
+
+# pyre-ignore We only care that the methods are callable.
+def _bind(
+    visitor: object, unbound_funcs: Dict[BaseMatcherNode, Sequence[_UnboundFunc]]
+) -> Dict[BaseMatcherNode, Sequence[Callable[..., Any]]]:
+    return {
+        matcher: tuple(
+            MethodType(func, visitor) if per_instance else func
+            for func, per_instance in funcs
+        )
+        for matcher, funcs in unbound_funcs.items()
+    }
+
+
+class _DecoratorTable:
+    """
+    The matchers that the decorators of a visitor class use and the methods they
+    gate or call, gathered and checked when the first instance of the class is
+    created, and shared with all of its other instances.
+    """
+
+    def __init__(
+        self,
+        visitor: Union["MatcherDecoratableTransformer", "MatcherDecoratableVisitor"],
+        *,
+        leave_param_count: int,
+        leave_none_return: bool,
+    ) -> None:
+        visit_funcs = _gather_constructed_visit_funcs(visitor)
+        leave_funcs = _gather_constructed_leave_funcs(visitor)
+        # Make sure visit/leave functions constructed with @visit and @leave decorators
+        # have correct type annotations.
+        _check_types(
+            visit_funcs,
+            "visit",
+            expected_param_count=1,
+            expected_none_return=True,
+        )
+        _check_types(
+            leave_funcs,
+            "leave",
+            expected_param_count=leave_param_count,
+            expected_none_return=leave_none_return,
+        )
+        self.gating: Sequence[BaseMatcherNode] = tuple(_gather_matchers(visitor))
+        self.visit_funcs: Dict[BaseMatcherNode, Sequence[_UnboundFunc]] = {
+            matcher: tuple(_unbind(visitor, func) for func in funcs)
+            for matcher, funcs in visit_funcs.items()
+        }
+        self.leave_funcs: Dict[BaseMatcherNode, Sequence[_UnboundFunc]] = {
+            matcher: tuple(_unbind(visitor, func) for func in funcs)
+            for matcher, funcs in leave_funcs.items()
+        }
+        self.compiled_matchers: Dict[BaseMatcherNode, CompiledMatcher] = {}
+        # The names of the node classes each matcher can match, or None if it could
+        # match a node of any class.
+        self.class_names: Dict[BaseMatcherNode, Optional[Set[str]]] = {
+            matcher: _matched_class_names(matcher)
+            for matcher in (*self.gating, *self.visit_funcs, *self.leave_funcs)
+        }
+        self.node_types: Dict[Type[cst.CSTNode], _NodeTypeMatchers] = {}
+
+    def resolve(self, node_type: Type[cst.CSTNode]) -> _NodeTypeMatchers:
+        def can_match(matcher: BaseMatcherNode) -> bool:
+            names = self.class_names[matcher]
+            return names is None or node_type.__name__ in names
+
+        node_matchers = self.node_types[node_type] = _NodeTypeMatchers(
+            tuple(filter(can_match, self.gating)),
+            tuple(filter(can_match, self.visit_funcs)),
+            tuple(filter(can_match, reversed(list(self.leave_funcs)))),
+        )
+        return node_matchers
+
+
+# Decorator tables by visitor class.
+_decorator_tables: "WeakKeyDictionary[type, _DecoratorTable]" = WeakKeyDictionary()
+
+
+def _decorator_table(
+    visitor: Union["MatcherDecoratableTransformer", "MatcherDecoratableVisitor"],
+    *,
+    leave_param_count: int,
+    leave_none_return: bool,
+) -> _DecoratorTable:
+    cls = type(visitor)
+    table = _decorator_tables.get(cls)
+    if table is None:
+        table = _decorator_tables[cls] = _DecoratorTable(
+            visitor,
+            leave_param_count=leave_param_count,
+            leave_none_return=leave_none_return,
+        )
+    return table
+
+
+# The attributes that _set_up_decorators sets on a visitor.
+_DECORATOR_ATTRS: Sequence[str] = (
+    "_decorator_table",
+    "_matchers",
+    "_compiled_matchers",
+    "_extra_visit_funcs",
+    "_extra_leave_funcs",
+)
+
+
+def _state_without_decorators(visitor: object) -> Dict[str, object]:
+    # Matchers are compared by identity, so unpickled copies of them wouldn't be the
+    # ones that the decorators of the class use in another process (like a codemod
+    # worker). Visitors set their decorator state up again from their class instead.
+    return {
+        name: value
+        for name, value in visitor.__dict__.items()
+        if name not in _DECORATOR_ATTRS
+    }
+
+
+def _node_type_matchers(
+    visitor: Union["MatcherDecoratableTransformer", "MatcherDecoratableVisitor"],
+    node: cst.CSTNode,
+) -> _NodeTypeMatchers:
+    table = visitor._decorator_table
+    node_matchers = table.node_types.get(type(node))
+    if node_matchers is None:
+        node_matchers = table.resolve(type(node))
+    return node_matchers
+
+
 def _visit_matchers(
     matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]],
+    node_matchers: Sequence[BaseMatcherNode],
     node: cst.CSTNode,
-    metadata_resolver: cst.MetadataDependent,
-) -> Dict[BaseMatcherNode, Optional[cst.CSTNode]]:
-    new_matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]] = {}
-    for matcher, existing_node in matchers.items():
+    metadata_resolver: Union[
+        "MatcherDecoratableTransformer", "MatcherDecoratableVisitor"
+    ],
+) -> None:
+    for matcher in node_matchers:
         # We don't care about visiting matchers that are already true.
-        if existing_node is None and matches(
-            node, matcher, metadata_resolver=metadata_resolver
+        if matchers[matcher] is None and _compiled_matches(
+            metadata_resolver, node, matcher
         ):
             # This node matches! Remember which node it was so we can
             # cancel it later.
-            new_matchers[matcher] = node
-        else:
-            new_matchers[matcher] = existing_node
-    return new_matchers
+            matchers[matcher] = node
 
 
 def _leave_matchers(
-    matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]], node: cst.CSTNode
-) -> Dict[BaseMatcherNode, Optional[cst.CSTNode]]:
-    new_matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]] = {}
-    for matcher, existing_node in matchers.items():
-        if node is existing_node:
+    matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]],
+    node_matchers: Sequence[BaseMatcherNode],
+    node: cst.CSTNode,
+) -> None:
+    # Only matchers that can match the node can have been activated by it.
+    for matcher in node_matchers:
+        if matchers[matcher] is node:
             # This node matches, so we are no longer inside it.
-            new_matchers[matcher] = None
-        else:
-            # We aren't leaving this node.
-            new_matchers[matcher] = existing_node
-    return new_matchers
+            matchers[matcher] = None
 
 
 def _all_positive_matchers_true(
@@ -426,17 +602,43 @@ def _should_allow_visit(
 
 def _visit_constructed_funcs(
     visit_funcs: Dict[BaseMatcherNode, Sequence[Callable[[cst.CSTNode], None]]],
+    node_matchers: Sequence[BaseMatcherNode],
     all_matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]],
     node: cst.CSTNode,
-    metadata_resolver: cst.MetadataDependent,
+    metadata_resolver: Union[
+        "MatcherDecoratableTransformer", "MatcherDecoratableVisitor"
+    ],
 ) -> None:
-    for matcher, visit_funcs in visit_funcs.items():
-        if matches(node, matcher, metadata_resolver=metadata_resolver):
-            for visit_func in visit_funcs:
+    for matcher in node_matchers:
+        if _compiled_matches(metadata_resolver, node, matcher):
+            for visit_func in visit_funcs[matcher]:
                 if _should_allow_visit(all_matchers, visit_func):
                     visit_func(node)
 
 
+def _matcher_handled_node_types(
+    visitor: Union["MatcherDecoratableTransformer", "MatcherDecoratableVisitor"],
+    callback_names: Collection[str],
+) -> Optional[Collection[Type[cst.CSTNode]]]:
+    # Besides the nodes that the visitor has callbacks for, it needs to see the ones
+    # that its decorators match, which we can only tell for matchers of nodes.
+    handled = set(handled_node_types(callback_names))
+    for matcher in (
+        *visitor._matchers,
+        *visitor._extra_visit_funcs,
+        *visitor._extra_leave_funcs,
+    ):
+        try:
+            handled.update(_get_possible_match_classes(matcher))
+        except AttributeError:
+            return None
+    if not all(
+        isinstance(cls, type) and issubclass(cls, cst.CSTNode) for cls in handled
+    ):
+        return None
+    return handled
+
+
 class MatcherDecoratableTransformer(CSTTransformer):
     """
     This class provides all of the features of a :class:`libcst.CSTTransformer`, and
@@ -447,13 +649,28 @@ class MatcherDecoratableTransformer(CSTTransformer):
 
     def __init__(self) -> None:
         CSTTransformer.__init__(self)
-        self.__matchers: Optional[Dict[BaseMatcherNode, Optional[cst.CSTNode]]] = None
+        self._set_up_decorators()
+
+    def _set_up_decorators(self) -> None:
+        # The decorators of a class are the same for all of its instances, so they're
+        # only gathered and checked for the first one.
+        self._decorator_table: _DecoratorTable = _decorator_table(
+            self, leave_param_count=2, leave_none_return=False
+        )
+        # Set of gating matchers that we need to track and evaluate, and the nodes
+        # that activated them.
+        self._matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]] = dict.fromkeys(
+            self._decorator_table.gating
+        )
+        self._compiled_matchers: Dict[BaseMatcherNode, CompiledMatcher] = (
+            self._decorator_table.compiled_matchers
+        )
         # Mapping of matchers to functions. If in the course of visiting the tree,
         # a node matches one of these matchers, the corresponding function will be
         # called as if it was a visit_* method.
         self._extra_visit_funcs: Dict[
             BaseMatcherNode, Sequence[Callable[[cst.CSTNode], None]]
-        ] = _gather_constructed_visit_funcs(self)
+        ] = _bind(self, self._decorator_table.visit_funcs)
         # Mapping of matchers to functions. If in the course of leaving the tree,
         # a node matches one of these matchers, the corresponding function will be
         # called as if it was a leave_* method.
@@ -464,38 +681,30 @@ class MatcherDecoratableTransformer(CSTTransformer):
                     [cst.CSTNode, cst.CSTNode], Union[cst.CSTNode, cst.RemovalSentinel]
                 ]
             ],
-        ] = _gather_constructed_leave_funcs(self)
-        # Make sure visit/leave functions constructed with @visit and @leave decorators
-        # have correct type annotations.
-        _check_types(
-            self._extra_visit_funcs,
-            "visit",
-            expected_param_count=1,
-            expected_none_return=True,
-        )
-        _check_types(
-            self._extra_leave_funcs,
-            "leave",
-            expected_param_count=2,
-            expected_none_return=False,
-        )
+        ] = _bind(self, self._decorator_table.leave_funcs)
+
+    def __getstate__(self) -> Dict[str, object]:
+        return _state_without_decorators(self)
 
-    @property
-    def _matchers(self) -> Dict[BaseMatcherNode, Optional[cst.CSTNode]]:
-        if self.__matchers is None:
-            self.__matchers = _gather_matchers(self)
-        return self.__matchers
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._set_up_decorators()
 
-    @_matchers.setter
-    def _matchers(self, value: Dict[BaseMatcherNode, Optional[cst.CSTNode]]) -> None:
-        self.__matchers = value
+    def _handled_node_types(
+        self, callback_names: Collection[str]
+    ) -> Optional[Collection[Type[cst.CSTNode]]]:
+        return _matcher_handled_node_types(self, callback_names)
 
     def on_visit(self, node: cst.CSTNode) -> bool:
+        node_matchers = _node_type_matchers(self, node)
+
         # First, evaluate any matchers that we have which we are not inside already.
-        self._matchers = _visit_matchers(self._matchers, node, self)
+        _visit_matchers(self._matchers, node_matchers.gating, node, self)
 
         # Now, call any visitors that were hooked using a visit decorator.
-        _visit_constructed_funcs(self._extra_visit_funcs, self._matchers, node, self)
+        _visit_constructed_funcs(
+            self._extra_visit_funcs, node_matchers.visit, self._matchers, node, self
+        )
 
         # Now, evaluate whether this current function has any matchers it requires.
         if not _should_allow_visit(
@@ -521,17 +730,18 @@ class MatcherDecoratableTransformer(CSTTransformer):
             retval = updated_node
 
         # Now, call any visitors that were hooked using a leave decorator.
-        for matcher, leave_funcs in reversed(list(self._extra_leave_funcs.items())):
-            if not self.matches(original_node, matcher):
+        node_matchers = _node_type_matchers(self, original_node)
+        for matcher in node_matchers.leave:
+            if not _compiled_matches(self, original_node, matcher):
                 continue
-            for leave_func in leave_funcs:
+            for leave_func in self._extra_leave_funcs[matcher]:
                 if _should_allow_visit(self._matchers, leave_func) and isinstance(
                     retval, cst.CSTNode
                 ):
                     retval = leave_func(original_node, retval)
 
         # Now, see if we have any matchers we should deactivate.
-        self._matchers = _leave_matchers(self._matchers, original_node)
+        _leave_matchers(self._matchers, node_matchers.gating, original_node)
 
         # pyre-ignore The return value of on_leave is subtly wrong in that we can
         # actually return any value that passes this node's parent's constructor
@@ -664,50 +874,57 @@ class MatcherDecoratableVisitor(CSTVisitor):
 
     def __init__(self) -> None:
         CSTVisitor.__init__(self)
-        self.__matchers: Optional[Dict[BaseMatcherNode, Optional[cst.CSTNode]]] = None
+        self._set_up_decorators()
+
+    def _set_up_decorators(self) -> None:
+        # The decorators of a class are the same for all of its instances, so they're
+        # only gathered and checked for the first one.
+        self._decorator_table: _DecoratorTable = _decorator_table(
+            self, leave_param_count=1, leave_none_return=True
+        )
+        # Set of gating matchers that we need to track and evaluate, and the nodes
+        # that activated them.
+        self._matchers: Dict[BaseMatcherNode, Optional[cst.CSTNode]] = dict.fromkeys(
+            self._decorator_table.gating
+        )
+        self._compiled_matchers: Dict[BaseMatcherNode, CompiledMatcher] = (
+            self._decorator_table.compiled_matchers
+        )
         # Mapping of matchers to functions. If in the course of visiting the tree,
         # a node matches one of these matchers, the corresponding function will be
         # called as if it was a visit_* method.
         self._extra_visit_funcs: Dict[
             BaseMatcherNode, Sequence[Callable[[cst.CSTNode], None]]
-        ] = _gather_constructed_visit_funcs(self)
+        ] = _bind(self, self._decorator_table.visit_funcs)
         # Mapping of matchers to functions. If in the course of leaving the tree,
         # a node matches one of these matchers, the corresponding function will be
         # called as if it was a leave_* method.
         self._extra_leave_funcs: Dict[
             BaseMatcherNode, Sequence[Callable[[cst.CSTNode], None]]
-        ] = _gather_constructed_leave_funcs(self)
-        # Make sure visit/leave functions constructed with @visit and @leave decorators
-        # have correct type annotations.
-        _check_types(
-            self._extra_visit_funcs,
-            "visit",
-            expected_param_count=1,
-            expected_none_return=True,
-        )
-        _check_types(
-            self._extra_leave_funcs,
-            "leave",
-            expected_param_count=1,
-            expected_none_return=True,
-        )
+        ] = _bind(self, self._decorator_table.leave_funcs)
+
+    def __getstate__(self) -> Dict[str, object]:
+        return _state_without_decorators(self)
 
-    @property
-    def _matchers(self) -> Dict[BaseMatcherNode, Optional[cst.CSTNode]]:
-        if self.__matchers is None:
-            self.__matchers = _gather_matchers(self)
-        return self.__matchers
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._set_up_decorators()
 
-    @_matchers.setter
-    def _matchers(self, value: Dict[BaseMatcherNode, Optional[cst.CSTNode]]) -> None:
-        self.__matchers = value
+    def _handled_node_types(
+        self, callback_names: Collection[str]
+    ) -> Optional[Collection[Type[cst.CSTNode]]]:
+        return _matcher_handled_node_types(self, callback_names)
 
     def on_visit(self, node: cst.CSTNode) -> bool:
+        node_matchers = _node_type_matchers(self, node)
+
         # First, evaluate any matchers that we have which we are not inside already.
-        self._matchers = _visit_matchers(self._matchers, node, self)
+        _visit_matchers(self._matchers, node_matchers.gating, node, self)
 
         # Now, call any visitors that were hooked using a visit decorator.
-        _visit_constructed_funcs(self._extra_visit_funcs, self._matchers, node, self)
+        _visit_constructed_funcs(
+            self._extra_visit_funcs, node_matchers.visit, self._matchers, node, self
+        )
 
         # Now, evaluate whether this current function has a decorator on it.
         if not _should_allow_visit(
@@ -729,15 +946,16 @@ class MatcherDecoratableVisitor(CSTVisitor):
             CSTVisitor.on_leave(self, original_node)
 
         # Now, call any visitors that were hooked using a leave decorator.
-        for matcher, leave_funcs in reversed(list(self._extra_leave_funcs.items())):
-            if not self.matches(original_node, matcher):
+        node_matchers = _node_type_matchers(self, original_node)
+        for matcher in node_matchers.leave:
+            if not _compiled_matches(self, original_node, matcher):
                 continue
-            for leave_func in leave_funcs:
+            for leave_func in self._extra_leave_funcs[matcher]:
                 if _should_allow_visit(self._matchers, leave_func):
                     leave_func(original_node)
 
         # Now, see if we have any matchers we should deactivate.
-        self._matchers = _leave_matchers(self._matchers, original_node)
+        _leave_matchers(self._matchers, node_matchers.gating, original_node)
 
     def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
         # Evaluate whether this current function has a decorator on it.
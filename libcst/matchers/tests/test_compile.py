@@ -0,0 +1,148 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from textwrap import dedent
+from typing import List
+from unittest import mock
+
+import libcst as cst
+import libcst.matchers as m
+import libcst.metadata as meta
+from libcst.testing.utils import data_provider, UnitTest
+
+_CODE = dedent(
+    '''
+    import os
+    from a import b as c
+    def f(x, y=1, *args, **kwargs):
+        """doc"""
+        print("hi", x)
+        return foo.bar(x, y, z=3) + g(*args)
+    class A(B, metaclass=M):
+        x: int = 1
+        async def g(self):
+            await h()
+    print(f(1), end="")
+    x = [1, 2, 3] if y else None
+    '''
+)
+
+_STORE = m.MatchMetadata(meta.ExpressionContextProvider, meta.ExpressionContext.STORE)
+_LOAD = m.MatchMetadata(meta.ExpressionContextProvider, meta.ExpressionContext.LOAD)
+
+
+def _all_nodes(tree: cst.CSTNode) -> List[cst.CSTNode]:
+    nodes: List[cst.CSTNode] = []
+
+    class Collector(cst.CSTVisitor):
+        def on_visit(self, node: cst.CSTNode) -> bool:
+            nodes.append(node)
+            return True
+
+    tree.visit(Collector())
+    return nodes
+
+
+class CompileTest(UnitTest):
+    @data_provider(
+        (
+            # Nodes and their attributes.
+            (m.Name(),),
+            (m.Name("print"),),
+            (m.Call(func=m.Attribute(value=m.Name("foo"), attr=m.Name("bar"))),),
+            (m.FunctionDef(asynchronous=None),),
+            (m.FunctionDef(asynchronous=m.Asynchronous()),),
+            (m.Arg(keyword=None, star=""),),
+            (m.Arg(star="*"),),
+            (m.Name(value=m.MatchRegex(r"^p")),),
+            (m.Name(m.MatchIfTrue(lambda value: len(value) == 1)),),
+            (m.Param(default=m.Integer()),),
+            (m.AnnAssign(value=~m.Integer()),),
+            # Special matchers.
+            (m.Name() | m.Integer(),),
+            (m.Name() & m.Name("x"),),
+            (m.TypeOf(m.Call, m.BinaryOperation)(),),
+            (~m.Name(),),
+            (m.DoesNotMatch(m.Name() | m.Integer()),),
+            (m.FunctionDef(asynchronous=~m.Asynchronous()),),
+            (m.Call(func=~(m.Name("print") | m.Name("f"))),),
+            (m.IfExp(orelse=m.Name("None") | m.Integer()),),
+            (m.SaveMatchedNode(m.Call(), "call"),),
+            (m.Call(func=m.SaveMatchedNode(~m.Name(), "func")),),
+            # Sequences.
+            (m.Call(args=[m.DoNotCare(), m.DoNotCare()]),),
+            (m.Call(args=(m.Arg(m.Name()), m.DoNotCare())),),
+            (m.Call(args=[m.ZeroOrMore(), m.Arg(keyword=m.Name("z"))]),),
+            (m.Call(args=[m.AtLeastN(n=1)]),),
+            (m.List([m.ZeroOrOne(m.Element(m.Integer("1"))), m.ZeroOrMore()]),),
+            (m.Call(args=m.OneOf([m.Arg()], [m.Arg(), m.Arg()])),),
+            (m.Call(args=m.AllOf([m.DoNotCare()], [m.Arg(m.Integer())])),),
+            (m.Call(args=m.MatchIfTrue(lambda args: len(args) > 1)),),
+            (m.ImportFrom(names=[m.ImportAlias(asname=m.AsName())]),),
+            (m.ImportFrom(names=m.DoesNotMatch([m.ImportAlias()])),),
+            (m.ClassDef(keywords=[m.SaveMatchedNode(m.Arg(), "keyword")]),),
+            # Metadata.
+            (m.Name(metadata=_STORE),),
+            (m.Name(metadata=_LOAD | _STORE),),
+            (m.Name(metadata=~_LOAD),),
+            (m.Name(metadata=m.MatchMetadataIfTrue(meta.ParentNodeProvider, bool)),),
+            (m.Assign(targets=[m.AssignTarget(m.Name(metadata=_STORE))]),),
+            # These are never allowed at the top level.
+            (m.ZeroOrMore(),),
+            (m.MatchIfTrue(lambda node: True),),
+            (_STORE,),
+        )
+    )
+    def test_compiled_matches_like_matches(self, matcher: m.BaseMatcherNode) -> None:
+        wrapper = meta.MetadataWrapper(cst.parse_module(_CODE))
+        compiled = m.compile(matcher)
+        self.assertIs(compiled.matcher, matcher)
+        values = [
+            *_all_nodes(wrapper.module),
+            cst.MaybeSentinel.DEFAULT,
+            cst.RemovalSentinel.REMOVE,
+        ]
+        for value in values:
+            self.assertEqual(
+                compiled(value, metadata_resolver=wrapper),
+                m.matches(value, matcher, metadata_resolver=wrapper),
+                value,
+            )
+
+    def test_metadata_needs_resolver(self) -> None:
+        compiled = m.compile(m.Name(metadata=_STORE))
+        with self.assertRaises(LookupError):
+            compiled(cst.Name("x"))
+        # Metadata is only looked up for nodes that pass the other checks.
+        self.assertFalse(compiled(cst.Integer("1")))
+
+    def test_visitors_use_compiled_matchers(self) -> None:
+        class TestVisitor(m.MatcherDecoratableVisitor):
+            METADATA_DEPENDENCIES = (meta.ExpressionContextProvider,)
+
+            def __init__(self) -> None:
+                super().__init__()
+                self.calls: List[str] = []
+                self.stores: List[str] = []
+
+            @m.call_if_inside(m.Call(func=m.Name("print")))
+            def visit_Name(self, node: cst.Name) -> None:
+                self.calls.append(node.value)
+
+            @m.leave(m.Name(metadata=_STORE))
+            def leave_store(self, original_node: cst.Name) -> None:
+                self.stores.append(original_node.value)
+
+        visitor = TestVisitor()
+        with mock.patch(
+            "libcst.matchers._visitors.matches", side_effect=AssertionError
+        ):
+            meta.MetadataWrapper(cst.parse_module(_CODE)).visit(visitor)
+        self.assertEqual(visitor.calls, ["print", "x", "print", "f", "end"])
+        self.assertEqual(
+            visitor.stores,
+            ["c", "f", "x", "y", "args", "kwargs", "A", "x", "g", "self", "x"],
+        )
+        self.assertEqual(len(visitor._compiled_matchers), 2)
@@ -7,7 +7,7 @@ import sys
 from ast import literal_eval
 from textwrap import dedent
 from typing import List, Set
-from unittest import skipIf
+from unittest import mock, skipIf
 
 import libcst as cst
 import libcst.matchers as m
@@ -997,6 +997,60 @@ class MatchersVisitLeaveDecoratorsTest(UnitTest):
         self.assertEqual(visitor.visits, ['"baz"'])
 
 
+class MatchersSkipUnreachableChildrenTest(UnitTest):
+    def test_skips_unreachable_children(self) -> None:
+        class TestVisitor(MatcherDecoratableVisitor):
+            SKIP_UNREACHABLE_CHILDREN = True
+
+            def __init__(self) -> None:
+                super().__init__()
+                self.visits: List[str] = []
+
+            @call_if_inside(m.FunctionDef(m.Name("foo")))
+            def visit_SimpleString(self, node: cst.SimpleString) -> None:
+                self.visits.append(node.value)
+
+            @visit(m.Call())
+            def _call_visit(self, node: cst.Call) -> None:
+                self.visits.append(cst.ensure_type(node.func, cst.Name).value)
+
+        module = fixture(
+            """
+            a = f("foo")  # comment
+
+            def foo() -> None:
+                return g("baz")  # comment
+        """
+        )
+        visitor = TestVisitor()
+        with mock.patch.object(visitor, "on_visit", wraps=visitor.on_visit) as on_visit:
+            module.visit(visitor)
+
+        self.assertEqual(visitor.visits, ["f", "g", '"baz"'])
+        visited = [call.args[0] for call in on_visit.call_args_list]
+        self.assertFalse(any(isinstance(node, cst.Comment) for node in visited))
+
+    def test_arbitrary_matchers_visit_everything(self) -> None:
+        class TestVisitor(MatcherDecoratableVisitor):
+            SKIP_UNREACHABLE_CHILDREN = True
+
+            @call_if_inside(m.MatchIfTrue(lambda node: True))
+            def visit_SimpleString(self, node: cst.SimpleString) -> None:
+                pass
+
+        module = fixture(
+            """
+            a = "foo"  # comment
+        """
+        )
+        visitor = TestVisitor()
+        with mock.patch.object(visitor, "on_visit", wraps=visitor.on_visit) as on_visit:
+            module.visit(visitor)
+
+        visited = [call.args[0] for call in on_visit.call_args_list]
+        self.assertTrue(any(isinstance(node, cst.Comment) for node in visited))
+
+
 class MatchersUnionDecoratorsTest(UnitTest):
     @skipIf(bool(sys.version_info < (3, 10)), "new union syntax not available")
     def test_init_with_new_union_annotation(self) -> None:
@@ -5,12 +5,13 @@
 #
 
 from textwrap import dedent
-from typing import Optional, Sequence
+from typing import List, Optional, Sequence
+from unittest import mock
 
 import libcst as cst
 import libcst.matchers as m
 import libcst.metadata as meta
-from libcst.matchers import extractall, findall
+from libcst.matchers import contains, extractall, find_first, findall
 from libcst.testing.utils import UnitTest
 
 
@@ -198,6 +199,120 @@ class MatchersFindAllTest(UnitTest):
         )
 
 
+class MatchersFindFirstTest(UnitTest):
+    def test_find_first_with_sentinels(self) -> None:
+        self.assertIsNone(find_first(cst.RemovalSentinel.REMOVE, m.Name()))
+        self.assertIsNone(find_first(cst.MaybeSentinel.DEFAULT, m.Name()))
+        self.assertFalse(contains(cst.RemovalSentinel.REMOVE, m.Name()))
+
+    def test_simple_find_first(self) -> None:
+        module = cst.parse_module("a = 1\nb = foo.bar(c)\nfoo.bar(d)\n")
+        call = m.Call(func=m.Attribute(m.Name("foo"), m.Name("bar")))
+        found = find_first(module, call)
+        self.assertIs(found, findall(module, call)[0])
+        self.assertTrue(found.deep_equals(cst.parse_expression("foo.bar(c)")))
+        # Parents come before their children.
+        self.assertIs(find_first(module, m.Module() | m.Name()), module)
+        self.assertIsNone(find_first(module, m.Name("e")))
+        self.assertTrue(contains(module, call))
+        self.assertFalse(contains(module, m.Name("e")))
+
+    def test_find_first_stops_at_the_first_match(self) -> None:
+        module = cst.parse_module("foo()\n" + "x = y\n" * 100)
+        visited: List[cst.CSTNode] = []
+
+        def is_call(node: cst.CSTNode) -> bool:
+            visited.append(node)
+            return isinstance(node, cst.Call)
+
+        self.assertTrue(contains(module, m.MatchIfTrue(is_call)))
+        # Module, SimpleStatementLine, Expr and Call.
+        self.assertEqual(len(visited), 4)
+
+    def test_find_first_with_metadata_wrapper(self) -> None:
+        wrapper = meta.MetadataWrapper(cst.parse_module("a = b\nc = d\n"))
+        store = m.MatchMetadata(
+            meta.ExpressionContextProvider, meta.ExpressionContext.STORE
+        )
+        found = find_first(wrapper, store)
+        self.assertIs(found, findall(wrapper, store)[0])
+        self.assertEqual(cst.ensure_type(found, cst.Name).value, "a")
+
+
+class MatchersNodeTypeIndexTest(UnitTest):
+    def test_findall_with_index(self) -> None:
+        code = "def f(a):\n    return g(a) + h(b)\nx = f(1)\n"
+        wrapper = meta.MetadataWrapper(cst.parse_module(code))
+        matchers = [
+            m.Name(),
+            m.Call(func=m.Name("g")),
+            m.Name() | m.Integer(),
+            m.Call | m.Name,
+            m.AllOf(m.Name(), m.MatchIfTrue(lambda node: True)),
+            m.SaveMatchedNode(m.Name(), "name"),
+            m.Call(func=m.SaveMatchedNode(m.Name(), "func")),
+        ]
+        expected = [
+            (findall(wrapper, matcher), extractall(wrapper, matcher))
+            for matcher in matchers
+        ]
+        wrapper.resolve(meta.NodeTypeIndexProvider)
+        with mock.patch.object(m._matcher_base._FindAllVisitor, "on_visit") as on_visit:
+            for matcher, (nodes, extractions) in zip(matchers, expected):
+                self.assertEqual(findall(wrapper, matcher), nodes)
+                self.assertEqual(extractall(wrapper, matcher), extractions)
+                self.assertIs(find_first(wrapper, matcher), nodes[0])
+            self.assertFalse(contains(wrapper, m.Lambda()))
+        # The tree was never traversed.
+        on_visit.assert_not_called()
+
+    def test_findall_with_index_falls_back(self) -> None:
+        wrapper = meta.MetadataWrapper(cst.parse_module("a = b\nc = d\n"))
+        wrapper.resolve(meta.NodeTypeIndexProvider)
+        # Matchers that can match nodes of any type still need a traversal.
+        self.assertEqual(len(findall(wrapper, ~m.Name())), 17)
+        self.assertEqual(
+            len(findall(wrapper, m.MatchIfTrue(lambda n: isinstance(n, cst.Name)))),
+            4,
+        )
+        # So do trees that aren't in the index.
+        name = cst.parse_expression("x")
+        self.assertEqual(findall(name, m.Name(), metadata_resolver=wrapper), [name])
+
+    def test_findall_with_index_in_visitors(self) -> None:
+        class TestVisitor(m.MatcherDecoratableVisitor):
+            METADATA_DEPENDENCIES = (meta.NodeTypeIndexProvider,)
+
+            def __init__(self) -> None:
+                super().__init__()
+                self.names: List[List[str]] = []
+
+            def visit_FunctionDef(self, node: cst.FunctionDef) -> None:
+                self.names.append(
+                    [
+                        cst.ensure_type(name, cst.Name).value
+                        for name in self.findall(node.body, m.Name())
+                    ]
+                )
+
+        module = cst.parse_module(
+            dedent(
+                """
+                def f(a):
+                    return g(a)
+                def h():
+                    pass
+                x = f(1)
+                """
+            )
+        )
+        visitor = TestVisitor()
+        with mock.patch.object(m._matcher_base._FindAllVisitor, "on_visit") as on_visit:
+            meta.MetadataWrapper(module).visit(visitor)
+        on_visit.assert_not_called()
+        self.assertEqual(visitor.names, [["g", "a"], []])
+
+
 class MatchersExtractAllTest(UnitTest):
     def test_extractall_simple(self) -> None:
         expression = cst.parse_expression("a + b[c], d(e, f * g, h.i.j)")
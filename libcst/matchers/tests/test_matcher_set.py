@@ -0,0 +1,125 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from textwrap import dedent
+from typing import Dict, List, Union
+
+import libcst as cst
+import libcst.matchers as m
+import libcst.metadata as meta
+from libcst.testing.utils import UnitTest
+
+_CODE = dedent(
+    """
+    import os
+    def f(x, y=1):
+        print("hi", x)
+        return os.getenv("A") + eval(x)
+    class A(B):
+        x: int = 1
+        def g(self):
+            print(self.x, end="")
+    print(f(1))
+    """
+)
+
+_STORE = m.MatchMetadata(meta.ExpressionContextProvider, meta.ExpressionContext.STORE)
+
+_MATCHERS: Dict[str, Union[m.BaseMatcherNode, m.MatchIfTrue[cst.CSTNode]]] = {
+    "print": m.Call(func=m.Name("print")),
+    "print_first_arg": m.Call(
+        func=m.Name("print"), args=[m.SaveMatchedNode(m.Arg(), "arg"), m.ZeroOrMore()]
+    ),
+    "eval": m.Call(func=m.Name("eval")),
+    "getenv": m.Call(func=m.Attribute(value=m.Name("os"), attr=m.Name("getenv"))),
+    "call": m.Call(),
+    "self": m.Name("self"),
+    "short_name": m.Name(m.MatchIfTrue(lambda value: len(value) == 1)),
+    "integer": m.Integer() | m.SimpleString(),
+    "not_name": ~m.Name(),
+    "anything": m.MatchIfTrue(lambda node: isinstance(node, cst.Param)),
+    "store": m.Name(metadata=_STORE),
+    "store_anywhere": _STORE,
+    "wildcard": m.ZeroOrMore(),
+}
+
+
+class MatcherSetTest(UnitTest):
+    def test_findall_like_extractall(self) -> None:
+        wrapper = meta.MetadataWrapper(cst.parse_module(_CODE))
+        found = m.MatcherSet(_MATCHERS).findall(wrapper)
+
+        # Every matcher finds what extractall does.
+        for name, matcher in _MATCHERS.items():
+            self.assertEqual(
+                [(node, captures) for n, node, captures in found if n == name],
+                list(
+                    zip(
+                        m.findall(wrapper, matcher),
+                        m.extractall(wrapper, matcher),
+                    )
+                ),
+                name,
+            )
+        # Matches come in the order of the nodes, and then of the matchers.
+        nodes = [node for _, node, _ in found]
+        visited: List[cst.CSTNode] = []
+
+        class Collector(cst.CSTVisitor):
+            def on_visit(self, node: cst.CSTNode) -> bool:
+                if node in nodes and node not in visited:
+                    visited.append(node)
+                return True
+
+        wrapper.visit(Collector())
+        self.assertEqual(sorted(nodes, key=visited.index), nodes)
+        names = list(_MATCHERS)
+        for (name, node, _), (next_name, next_node, _) in zip(found, found[1:]):
+            if node is next_node:
+                self.assertLess(names.index(name), names.index(next_name))
+
+    def test_findall_with_sentinels(self) -> None:
+        matchers = m.MatcherSet({"name": m.Name()})
+        self.assertEqual(matchers.findall(cst.RemovalSentinel.REMOVE), [])
+        self.assertEqual(matchers.findall(cst.MaybeSentinel.DEFAULT), [])
+
+    def test_findall_needs_resolver_for_metadata(self) -> None:
+        module = cst.parse_module(_CODE)
+        self.assertEqual(len(m.MatcherSet({"self": m.Name("self")}).findall(module)), 2)
+        with self.assertRaises(LookupError):
+            m.MatcherSet({"store": m.Name(metadata=_STORE)}).findall(module)
+
+    def test_findall_with_node_type_index(self) -> None:
+        wrapper = meta.MetadataWrapper(cst.parse_module(_CODE))
+        wrapper.resolve(meta.NodeTypeIndexProvider)
+        matchers = {
+            name: _MATCHERS[name] for name in ("print", "getenv", "self", "integer")
+        }
+        found = m.MatcherSet(matchers).findall(wrapper)
+        self.assertEqual(found, m.MatcherSet(matchers).findall(wrapper.module))
+        self.assertEqual(len(found), 12)
+
+    def test_only_candidates_checked(self) -> None:
+        checked: List[str] = []
+
+        def check(name: str) -> m.MatchIfTrue[cst.CSTNode]:
+            def func(args: object) -> bool:
+                checked.append(name)
+                return True
+
+            return m.MatchIfTrue(func)
+
+        found = m.MatcherSet(
+            {
+                "print": m.Call(func=m.Name("print"), args=check("print")),
+                "eval": m.Call(func=m.Name("eval"), args=check("eval")),
+                "f": m.Call(func=m.Name("f"), args=check("f")),
+                "method": m.Call(func=m.Attribute(), args=check("method")),
+            }
+        ).findall(cst.parse_module(_CODE))
+        # Calls are keyed on the name they call, so each of these is only checked
+        # for the calls it can match.
+        self.assertEqual(checked, ["print", "method", "eval", "print", "print", "f"])
+        self.assertEqual([name for name, _, _ in found], checked)
@@ -1465,3 +1465,105 @@ class MatchersMatcherTest(UnitTest):
         identity = m.Name("True")
         self.assertTrue(m.DoesNotMatch(m.DoesNotMatch(identity)) is identity)
         self.assertTrue((~(~identity)) is identity)
+
+
+class MatchersSequenceTest(UnitTest):
+    def _call(self, *values: str) -> cst.Call:
+        return cst.Call(cst.Name("f"), [cst.Arg(cst.Name(value)) for value in values])
+
+    def test_wildcards_are_greedy(self) -> None:
+        call = self._call("a", "x", "b", "x", "c")
+        self.assertEqual(
+            m.extract(
+                call,
+                m.Call(
+                    args=[
+                        m.SaveMatchedNode(m.ZeroOrMore(), "first"),
+                        m.SaveMatchedNode(m.ZeroOrMore(), "second"),
+                        m.SaveMatchedNode(m.Arg(m.Name("x")), "x"),
+                        m.SaveMatchedNode(m.AtMostN(n=2), "last"),
+                    ]
+                ),
+            ),
+            {
+                "first": tuple(call.args[:3]),
+                "second": (),
+                "x": call.args[3],
+                "last": (call.args[4],),
+            },
+        )
+        self.assertEqual(
+            m.extract(
+                call,
+                m.Call(
+                    args=[
+                        m.AtLeastN(m.SaveMatchedNode(m.Arg(), "arg"), n=2),
+                        m.SaveMatchedNode(m.AtLeastN(n=2), "rest"),
+                    ]
+                ),
+            ),
+            {"arg": call.args[2], "rest": tuple(call.args[3:])},
+        )
+        self.assertIsNone(
+            m.extract(
+                call,
+                m.Call(args=[m.AtMostN(n=1), m.Arg(m.Name("x")), m.AtMostN(n=1)]),
+            )
+        )
+
+    def test_wildcards_matching_zero_nodes(self) -> None:
+        self.assertEqual(
+            m.extract(
+                self._call("a"),
+                m.Call(
+                    args=[
+                        m.DoNotCare(),
+                        m.SaveMatchedNode(m.ZeroOrOne(), "optional"),
+                        m.SaveMatchedNode(m.ZeroOrMore(), "rest"),
+                    ]
+                ),
+            ),
+            {"optional": (), "rest": ()},
+        )
+        self.assertFalse(
+            matches(
+                self._call("a"),
+                m.Call(args=[m.DoNotCare(), m.SaveMatchedNode(m.AtLeastN(n=1), "x")]),
+            )
+        )
+
+    def test_pathological_wildcards(self) -> None:
+        # Backtracking would try every way of splitting the arguments between the
+        # wildcards before giving up, which is cubic in the number of arguments here,
+        # and takes seconds for a couple of hundred of them.
+        evaluated = []
+
+        def is_x(arg: cst.Arg) -> bool:
+            evaluated.append(arg)
+            return m.matches(arg, m.Arg(m.Name("x")))
+
+        call = self._call(*["a"] * 200)
+        matcher = m.Call(
+            args=[m.ZeroOrMore(), m.ZeroOrMore(), m.ZeroOrMore(), m.MatchIfTrue(is_x)]
+        )
+        self.assertFalse(matches(call, matcher))
+        # Each argument is only checked once.
+        self.assertEqual(len(evaluated), len(call.args))
+
+    def test_long_sequences(self) -> None:
+        # Long sequences don't need deep recursion either.
+        call = self._call(*["a"] * 5000, "x", "b")
+        self.assertEqual(
+            m.extract(
+                call,
+                m.Call(
+                    args=[
+                        m.SaveMatchedNode(m.ZeroOrMore(m.Arg(m.Name("a"))), "a"),
+                        m.ZeroOrMore(),
+                        m.Arg(m.Name("x")),
+                        m.SaveMatchedNode(m.ZeroOrMore(), "rest"),
+                    ]
+                ),
+            ),
+            {"a": tuple(call.args[:5000]), "rest": (call.args[5001],)},
+        )
@@ -4,7 +4,7 @@
 # LICENSE file in the root directory of this source tree.
 
 from textwrap import dedent
-from typing import Sequence, Set, Tuple
+from typing import List, Sequence, Set, Tuple
 
 import libcst as cst
 import libcst.matchers as m
@@ -636,3 +636,40 @@ class MatchersVisitorMetadataTest(UnitTest):
         module.visit(visitor)
 
         self.assertEqual(visitor.match_names, {"a", "b", "c", "foo", "bar"})
+
+    def test_deferred_metadata_on_decorators(self) -> None:
+        resolved: List[cst.Module] = []
+
+        class UpperCaseProvider(meta.VisitorMetadataProvider[bool]):
+            def visit_Module(self, node: cst.Module) -> None:
+                resolved.append(node)
+
+            def visit_Name(self, node: cst.Name) -> None:
+                self.set_metadata(node, node.value.isupper())
+
+        class TestVisitor(m.MatcherDecoratableVisitor):
+            DEFERRED_METADATA_DEPENDENCIES: Sequence[meta.ProviderT] = (
+                UpperCaseProvider,
+            )
+
+            def __init__(self) -> None:
+                super().__init__()
+                self.match_names: List[str] = []
+
+            @m.visit(
+                m.Call(func=m.Name(metadata=m.MatchMetadata(UpperCaseProvider, True)))
+            )
+            def _visit_constant_calls(self, node: cst.Call) -> None:
+                self.match_names.append(cst.ensure_type(node.func, cst.Name).value)
+
+        # Nothing gets as far as the metadata check, so it's never computed.
+        visitor = TestVisitor()
+        self._make_fixture("a = b.C(d)\nE = [f]").visit(visitor)
+        self.assertEqual(resolved, [])
+        self.assertEqual(visitor.match_names, [])
+
+        visitor = TestVisitor()
+        module = self._make_fixture("a = B(c)\nd(E)\nF()")
+        module.visit(visitor)
+        self.assertEqual(resolved, [module.module])
+        self.assertEqual(visitor.match_names, ["B", "F"])
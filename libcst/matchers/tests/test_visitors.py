@@ -4,7 +4,8 @@
 # LICENSE file in the root directory of this source tree.
 
 import pickle
-from typing import Union
+from typing import List, Tuple, Union
+from unittest import mock
 
 import libcst as cst
 import libcst.matchers as m
@@ -15,9 +16,21 @@ from libcst.matchers import (
     MatcherDecoratableVisitor,
     visit,
 )
+from libcst.matchers._visitors import _compiled_matches, _gather_matchers
 from libcst.testing.utils import UnitTest
 
 
+class _CollectingVisitor(MatcherDecoratableVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.visited: List[str] = []
+
+    @m.call_if_inside(m.FunctionDef())
+    @visit(m.Name())
+    def _name_visit(self, node: cst.Name) -> None:
+        self.visited.append(node.value)
+
+
 class MatchersVisitLeaveDecoratorTypingTest(UnitTest):
     def test_valid_collector_simple(self) -> None:
         class TestVisitor(MatcherDecoratableVisitor):
@@ -508,3 +521,89 @@ class MatchersVisitLeaveDecoratorTypingTest(UnitTest):
         unserialized = pickle.loads(serialized)
         self.assertEqual(original.message, unserialized.message)
         self.assertEqual(original.func, unserialized.func)
+
+
+class MatchersDecoratorTableTest(UnitTest):
+    def test_decorators_gathered_once_per_class(self) -> None:
+        class TestVisitor(_CollectingVisitor):
+            pass
+
+        module = cst.parse_module("a\ndef f():\n    b\n")
+        with mock.patch(
+            "libcst.matchers._visitors._gather_matchers", wraps=_gather_matchers
+        ) as gather:
+            first, second = TestVisitor(), TestVisitor()
+        gather.assert_called_once()
+
+        # The decorated methods are still bound to each instance, which track their
+        # own gating matchers.
+        module.visit(first)
+        module.visit(second)
+        self.assertEqual(first.visited, ["f", "b"])
+        self.assertEqual(second.visited, ["f", "b"])
+        self.assertIsNot(first._matchers, second._matchers)
+
+    def test_pickled_visitor(self) -> None:
+        # Unpickled visitors use the matchers of their class' decorators, not copies.
+        visitor = pickle.loads(pickle.dumps(_CollectingVisitor()))
+        cst.parse_module("a\ndef f():\n    b\n").visit(visitor)
+        self.assertEqual(visitor.visited, ["f", "b"])
+
+    def test_invalid_class_raises_for_every_instance(self) -> None:
+        class TestVisitor(MatcherDecoratableVisitor):
+            @visit(m.SimpleString())
+            def _string_visit(self, node: cst.SimpleString) -> bool:
+                return False
+
+        for _ in range(2):
+            with self.assertRaisesRegex(
+                MatchDecoratorMismatch,
+                "@visit should only decorate functions that do not return",
+            ):
+                TestVisitor()
+
+    def test_matchers_only_evaluated_for_matching_node_types(self) -> None:
+        class TestTransformer(MatcherDecoratableTransformer):
+            @m.call_if_not_inside(m.ClassDef() | m.Lambda())
+            def visit_Name(self, node: cst.Name) -> None:
+                pass
+
+            @m.call_if_inside(~m.Lambda())
+            @visit(m.Call(func=m.Name("print")))
+            def _print_visit(self, node: cst.Call) -> None:
+                pass
+
+            @leave(m.Name() | m.Integer())
+            def _leave_atom(
+                self,
+                original_node: cst.BaseExpression,
+                updated_node: cst.BaseExpression,
+            ) -> cst.BaseExpression:
+                return updated_node
+
+        evaluated: List[Tuple[str, str]] = []
+
+        def compiled_matches(
+            visitor: MatcherDecoratableTransformer,
+            node: cst.CSTNode,
+            matcher: m.BaseMatcherNode,
+        ) -> bool:
+            evaluated.append((type(node).__name__, type(matcher).__name__))
+            return _compiled_matches(visitor, node, matcher)
+
+        transformer = TestTransformer()
+        with mock.patch(
+            "libcst.matchers._visitors._compiled_matches", compiled_matches
+        ):
+            cst.parse_module("class A:\n    print(x)\n").visit(transformer)
+        # The gating matcher that can match anything is only evaluated until it first
+        # matches.
+        self.assertEqual(
+            sorted(set(evaluated)),
+            [
+                ("Call", "Call"),
+                ("ClassDef", "OneOf"),
+                ("Module", "_InverseOf"),
+                ("Name", "OneOf"),
+            ],
+        )
@@ -22,6 +22,10 @@ from libcst.metadata.name_provider import (
     FullyQualifiedNameProvider,
     QualifiedNameProvider,
 )
+from libcst.metadata.node_type_index_provider import (
+    NodeTypeIndex,
+    NodeTypeIndexProvider,
+)
 from libcst.metadata.parent_node_provider import ParentNodeProvider
 from libcst.metadata.position_provider import (
     PositionProvider,
@@ -76,6 +80,8 @@ __all__ = [
     "ComprehensionScope",
     "ScopeProvider",
     "ParentNodeProvider",
+    "NodeTypeIndex",
+    "NodeTypeIndexProvider",
     "QualifiedName",
     "QualifiedNameSource",
     "MetadataWrapper",
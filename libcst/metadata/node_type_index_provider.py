@@ -0,0 +1,116 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+
+from bisect import bisect_left
+from heapq import merge
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+import libcst as cst
+from libcst.metadata.base_provider import VisitorMetadataProvider
+
+_CSTNodeT = TypeVar("_CSTNodeT", bound=cst.CSTNode)
+
+
+class NodeTypeIndex:
+    """
+    The nodes of a tree, grouped by their type. Nodes are kept in the order they're
+    visited in, so a node comes before its children, and children come in the order
+    they appear in the code. Built by :class:`NodeTypeIndexProvider`.
+    """
+
+    def __init__(self) -> None:
+        # The nodes of each type, and where each of them is in the order all the
+        # nodes were visited in.
+        self._nodes: Dict[Type[cst.CSTNode], List[cst.CSTNode]] = {}
+        self._positions: Dict[Type[cst.CSTNode], List[int]] = {}
+        # The positions of each node and of the first node after its children.
+        self._ranges: Dict[cst.CSTNode, Tuple[int, int]] = {}
+        self._count = 0
+
+    def _visit(self, node: cst.CSTNode) -> None:
+        node_type = type(node)
+        nodes = self._nodes.get(node_type)
+        if nodes is None:
+            nodes = self._nodes[node_type] = []
+            self._positions[node_type] = []
+        nodes.append(node)
+        self._positions[node_type].append(self._count)
+        self._ranges[node] = (self._count, self._count)
+        self._count += 1
+
+    def _leave(self, node: cst.CSTNode) -> None:
+        self._ranges[node] = (self._ranges[node][0], self._count)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._ranges
+
+    def nodes_of_types(
+        self,
+        is_selected: Callable[[Type[cst.CSTNode]], bool],
+        within: Optional[cst.CSTNode] = None,
+    ) -> Sequence[cst.CSTNode]:
+        """
+        Returns the nodes whose exact type ``is_selected`` returns ``True`` for, in the
+        order they're visited in. ``is_selected`` is called once for each type of node
+        in the tree. ``within`` works like with :meth:`nodes`.
+        """
+        start, end = (0, self._count) if within is None else self._ranges[within]
+        selected = []
+        for node_type, nodes in self._nodes.items():
+            if is_selected(node_type):
+                positions = self._positions[node_type]
+                first = bisect_left(positions, start)
+                last = bisect_left(positions, end, first)
+                if first < last:
+                    selected.append((positions[first:last], nodes[first:last]))
+        if not selected:
+            return []
+        if len(selected) == 1:
+            return selected[0][1]
+        merged = merge(*(zip(positions, nodes) for positions, nodes in selected))
+        return [node for _, node in merged]
+
+    def nodes(
+        self,
+        node_type: Union[Type[_CSTNodeT], Tuple[Type[_CSTNodeT], ...]],
+        within: Optional[cst.CSTNode] = None,
+    ) -> Sequence[_CSTNodeT]:
+        """
+        Returns the nodes that are instances of ``node_type``, which can also be a
+        tuple of types like with :func:`isinstance`, in the order they're visited in.
+        If ``within`` is given, only that node and the nodes below it are returned.
+        It has to be one of the indexed nodes.
+        """
+        # pyre-ignore[7]: We only select nodes of the given type.
+        return self.nodes_of_types(lambda t: issubclass(t, node_type), within)
+
+
+class NodeTypeIndexProvider(VisitorMetadataProvider[NodeTypeIndex]):
+    """
+    Indexes the nodes of a module by their type in a single traversal, so that
+    looking up all the nodes of a type (e.g. every :class:`~libcst.Call`) doesn't
+    need one. Every node's metadata is the same :class:`NodeTypeIndex`.
+
+    Once this is resolved on the :class:`~libcst.metadata.MetadataWrapper` that's
+    passed to :func:`~libcst.matchers.findall`, :func:`~libcst.matchers.extractall`,
+    :func:`~libcst.matchers.find_first` or :func:`~libcst.matchers.contains`, or
+    declared as a dependency of the visitor whose helper methods of the same names
+    are used, they only test nodes of the types that the matcher can match, instead
+    of every node in the tree. Indexes belong to a wrapper, like all metadata, so a
+    new tree gets a new index.
+    """
+
+    def _gen_impl(self, module: cst.Module) -> None:
+        self._index = NodeTypeIndex()
+        super()._gen_impl(module)
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        self._index._visit(node)
+        self.set_metadata(node, self._index)
+        return True
+
+    def on_leave(self, original_node: cst.CSTNode) -> None:
+        self._index._leave(original_node)
@@ -4,13 +4,14 @@
 # LICENSE file in the root directory of this source tree.
 
 
-from typing import Optional
+from typing import List, Optional
 from unittest.mock import Mock
 
 import libcst as cst
 from libcst.metadata import (
     BatchableMetadataProvider,
     MetadataWrapper,
+    PositionProvider,
     VisitorMetadataProvider,
 )
 from libcst.testing.utils import UnitTest
@@ -128,3 +129,68 @@ class MetadataWrapperTest(UnitTest):
         wrapper.resolve(ProviderA)
         mock.visited_a.assert_called_once()
         mock.visited_b.assert_called_once()
+
+    def test_deferred_dependencies(self) -> None:
+        """
+        Tests that deferred dependencies are only resolved once they're needed
+        """
+        mock = Mock()
+
+        class ProviderA(VisitorMetadataProvider[bool]):
+            def visit_Module(self, node: cst.Module) -> None:
+                mock.visited_a()
+
+            def visit_Name(self, node: cst.Name) -> None:
+                self.set_metadata(node, node.value == "x")
+
+        class NameVisitor(cst.CSTVisitor):
+            DEFERRED_METADATA_DEPENDENCIES = (ProviderA,)
+
+            def __init__(self) -> None:
+                super().__init__()
+                self.names: List[str] = []
+
+            def visit_Name(self, node: cst.Name) -> None:
+                if self.get_metadata(ProviderA, node):
+                    self.names.append(node.value)
+
+        self.assertEqual(NameVisitor.get_inherited_dependencies(), {ProviderA})
+        self.assertEqual(NameVisitor.get_deferred_dependencies(), {ProviderA})
+
+        visitor = NameVisitor()
+        MetadataWrapper(cst.parse_module("pass")).visit(visitor)
+        mock.visited_a.assert_not_called()
+
+        MetadataWrapper(cst.parse_module("x = y")).visit(visitor)
+        mock.visited_a.assert_called_once()
+        self.assertEqual(visitor.names, ["x"])
+
+        class EagerNameVisitor(NameVisitor):
+            METADATA_DEPENDENCIES = (ProviderA,)
+
+        # Dependencies that are also declared normally are resolved up front.
+        self.assertEqual(EagerNameVisitor.get_deferred_dependencies(), set())
+        mock.reset_mock()
+        MetadataWrapper(cst.parse_module("pass")).visit(EagerNameVisitor())
+        mock.visited_a.assert_called_once()
+
+    def test_transform_batched(self) -> None:
+        class RenameAtColumnZero(cst.CSTTransformer):
+            METADATA_DEPENDENCIES = (PositionProvider,)
+
+            def leave_Name(
+                self, original_node: cst.Name, updated_node: cst.Name
+            ) -> cst.Name:
+                if self.get_metadata(PositionProvider, original_node).start.column:
+                    return updated_node
+                return updated_node.with_changes(value=updated_node.value.upper())
+
+        class Suffix(cst.CSTTransformer):
+            def leave_Name(
+                self, original_node: cst.Name, updated_node: cst.Name
+            ) -> cst.Name:
+                return updated_node.with_changes(value=updated_node.value + "_")
+
+        wrapper = MetadataWrapper(cst.parse_module("x = y\n"))
+        module = wrapper.transform_batched([RenameAtColumnZero(), Suffix()])
+        self.assertEqual(module.code, "X_ = y_\n")
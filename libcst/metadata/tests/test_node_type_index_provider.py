@@ -0,0 +1,104 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+
+from typing import List
+
+import libcst as cst
+from libcst.metadata import MetadataWrapper, NodeTypeIndex, NodeTypeIndexProvider
+from libcst.testing.utils import UnitTest
+
+
+def _all_nodes(tree: cst.CSTNode) -> List[cst.CSTNode]:
+    nodes: List[cst.CSTNode] = []
+
+    class Collector(cst.CSTVisitor):
+        def on_visit(self, node: cst.CSTNode) -> bool:
+            nodes.append(node)
+            return True
+
+    tree.visit(Collector())
+    return nodes
+
+
+class NodeTypeIndexProviderTest(UnitTest):
+    def index(self, code: str) -> NodeTypeIndex:
+        wrapper = MetadataWrapper(cst.parse_module(code))
+        indexes = wrapper.resolve(NodeTypeIndexProvider)
+        # Every node has the same index.
+        index = indexes[wrapper.module]
+        self.assertTrue(all(other is index for other in indexes.values()))
+        return index
+
+    def test_nodes(self) -> None:
+        index = self.index("def f(a):\n    return g(a) + h(b)\nx = f(1)\n")
+        self.assertEqual(
+            [name.value for name in index.nodes(cst.Name)],
+            ["f", "a", "g", "a", "h", "b", "x", "f"],
+        )
+        self.assertEqual(
+            [cst.Module([]).code_for_node(call) for call in index.nodes(cst.Call)],
+            ["g(a)", "h(b)", "f(1)"],
+        )
+        self.assertEqual(index.nodes(cst.Lambda), [])
+
+    def test_nodes_in_visiting_order(self) -> None:
+        module = cst.parse_module("x = [a, 1, (b, 2.0)]\nif c:\n    pass\n")
+        wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+        index = wrapper.resolve(NodeTypeIndexProvider)[module]
+        self.assertEqual(index.nodes(cst.CSTNode), _all_nodes(module))
+        # Subclasses and tuples of types work like with isinstance.
+        for node_type in [cst.BaseExpression, (cst.Name, cst.Float, cst.If)]:
+            self.assertEqual(
+                index.nodes(node_type),
+                [node for node in _all_nodes(module) if isinstance(node, node_type)],
+            )
+
+    def test_nodes_within(self) -> None:
+        module = cst.parse_module("a = b\nif c:\n    d = e\nf = g\n")
+        wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+        index = wrapper.resolve(NodeTypeIndexProvider)[module]
+        if_statement = module.body[1]
+        self.assertEqual(
+            [name.value for name in index.nodes(cst.Name, within=if_statement)],
+            ["c", "d", "e"],
+        )
+        self.assertEqual(index.nodes(cst.If, within=if_statement), [if_statement])
+        self.assertEqual(
+            index.nodes(cst.BaseExpression, within=if_statement),
+            [
+                node
+                for node in _all_nodes(if_statement)
+                if isinstance(node, cst.BaseExpression)
+            ],
+        )
+
+    def test_nodes_of_types(self) -> None:
+        module = cst.parse_module("a = b\nif c:\n    d = 1\n")
+        wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+        index = wrapper.resolve(NodeTypeIndexProvider)[module]
+        names = {"Name", "Integer"}
+        self.assertEqual(
+            index.nodes_of_types(lambda t: t.__name__ in names),
+            [node for node in _all_nodes(module) if type(node).__name__ in names],
+        )
+        if_statement = module.body[1]
+        self.assertEqual(
+            [
+                cst.Module([]).code_for_node(node)
+                for node in index.nodes_of_types(
+                    lambda t: t.__name__ in names, within=if_statement
+                )
+            ],
+            ["c", "d", "1"],
+        )
+        self.assertEqual(index.nodes_of_types(lambda t: False), [])
+
+    def test_contains(self) -> None:
+        module = cst.parse_module("a = b\n")
+        wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+        index = wrapper.resolve(NodeTypeIndexProvider)[module]
+        self.assertIn(module.body[0], index)
+        self.assertNotIn(cst.Name("a"), index)
@@ -4,7 +4,9 @@
 # LICENSE file in the root directory of this source tree.
 
 
+import sys
 from textwrap import dedent
+from typing import Optional
 
 import libcst as cst
 from libcst.metadata import MetadataWrapper, ParentNodeProvider
@@ -62,3 +64,23 @@ class ParentNodeProviderTest(UnitTest):
     def test_parent_node_provier(self, code: str) -> None:
         wrapper = MetadataWrapper(cst.parse_module(dedent(code)))
         wrapper.visit(DependentVisitor(test=self))
+
+    def test_deep_tree(self) -> None:
+        # An `elif` chain that's longer than a recursive traversal could handle.
+        node: Optional[cst.If] = None
+        for i in range(sys.getrecursionlimit() * 2):
+            node = cst.If(
+                test=cst.Name(f"x{i}"),
+                body=cst.SimpleStatementSuite([cst.Pass()]),
+                orelse=node,
+            )
+        assert node is not None
+        module = cst.Module(body=[node])
+        parents = MetadataWrapper(module, unsafe_skip_copy=True).resolve(
+            ParentNodeProvider
+        )
+        self.assertIs(parents[node], module)
+        while isinstance(node.orelse, cst.If):
+            self.assertIs(parents[node.orelse], node)
+            self.assertIs(parents[node.test], node)
+            node = node.orelse
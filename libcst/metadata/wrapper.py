@@ -21,14 +21,19 @@ from typing import (
     TypeVar,
 )
 
-from libcst._batched_visitor import BatchableCSTVisitor, visit_batched, VisitorMethod
+from libcst._batched_visitor import (
+    BatchableCSTVisitor,
+    transform_batched,
+    visit_batched,
+    VisitorMethod,
+)
 from libcst._exceptions import MetadataException
 from libcst.metadata.base_provider import BatchableMetadataProvider
 
 if TYPE_CHECKING:
     from libcst._nodes.base import CSTNode  # noqa: F401
     from libcst._nodes.module import Module  # noqa: F401
-    from libcst._visitors import CSTVisitorT  # noqa: F401
+    from libcst._visitors import CSTTransformer, CSTVisitorT  # noqa: F401
     from libcst.metadata.base_provider import (  # noqa: F401
         BaseMetadataProvider,
         ProviderT,
@@ -219,3 +224,17 @@ class MetadataWrapper:
                 stack.enter_context(v.resolve(self))
 
             return visit_batched(self.module, visitors, before_visit, after_leave)
+
+    def transform_batched(self, transformers: Iterable["CSTTransformer"]) -> "Module":
+        """
+        Convenience method to resolve metadata before transforming ``self.module``
+        with ``transformers`` in a single traversal. See
+        :func:`~libcst.transform_batched`.
+        """
+        transformers = list(transformers)
+        with ExitStack() as stack:
+            # Resolve dependencies of transformers
+            for t in transformers:
+                stack.enter_context(t.resolve(self))
+
+            return cast("Module", transform_batched(self.module, transformers))
@@ -3,11 +3,11 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import cast
+from typing import cast, List, Optional
 from unittest.mock import Mock
 
 import libcst as cst
-from libcst import BatchableCSTVisitor, parse_module, visit_batched
+from libcst import BatchableCSTVisitor, parse_module, transform_batched, visit_batched
 from libcst.testing.utils import UnitTest
 
 
@@ -70,3 +70,112 @@ class BatchedVisitorTest(UnitTest):
         self.assertEqual(
             object.__getattribute__(if_, "whitespace_before_test"), mock.leave_If()
         )
+
+
+class _RenameTransformer(cst.CSTTransformer):
+    def __init__(self, old: str, new: str, log: List[str]) -> None:
+        super().__init__()
+        self.old = old
+        self.new = new
+        self.log = log
+
+    def visit_FunctionDef(self, node: cst.FunctionDef) -> Optional[bool]:
+        self.log.append(f"visit {self.old}->{self.new} {node.name.value}")
+        return None
+
+    def leave_FunctionDef(
+        self, original_node: cst.FunctionDef, updated_node: cst.FunctionDef
+    ) -> cst.FunctionDef:
+        self.log.append(f"leave {self.old}->{self.new} {updated_node.name.value}")
+        return updated_node
+
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
+        if updated_node.value == self.old:
+            return updated_node.with_changes(value=self.new)
+        return updated_node
+
+
+class TransformBatchedTest(UnitTest):
+    def test_pipes_nodes_in_order(self) -> None:
+        log: List[str] = []
+        module = parse_module("def a():\n    return b\n")
+        transformed = transform_batched(
+            module,
+            [_RenameTransformer("a", "b", log), _RenameTransformer("b", "c", log)],
+        )
+        # Both renames apply to `a`, since the second transformer gets the node
+        # returned by the first. Both visit the original function, but leave it
+        # after its name has been renamed.
+        self.assertEqual(
+            cst.ensure_type(transformed, cst.Module).code,
+            "def c():\n    return c\n",
+        )
+        self.assertEqual(
+            log,
+            [
+                "visit a->b a",
+                "visit b->c a",
+                "leave a->b c",
+                "leave b->c c",
+            ],
+        )
+
+    def test_unchanged(self) -> None:
+        module = parse_module("def a():\n    return b\n")
+        transformed = transform_batched(
+            module, [_RenameTransformer("x", "y", []), cst.CSTTransformer()]
+        )
+        self.assertIs(transformed, module)
+
+    def test_skipping_children(self) -> None:
+        class SkipFunctions(_RenameTransformer):
+            def visit_FunctionDef(self, node: cst.FunctionDef) -> Optional[bool]:
+                super().visit_FunctionDef(node)
+                return False
+
+        log: List[str] = []
+        module = parse_module("def f():\n    return a + b\n")
+        transformed = transform_batched(
+            module,
+            [SkipFunctions("a", "x", log), _RenameTransformer("b", "y", log)],
+        )
+        self.assertEqual(
+            cst.ensure_type(transformed, cst.Module).code,
+            "def f():\n    return a + y\n",
+        )
+        self.assertEqual(
+            log, ["visit a->x f", "visit b->y f", "leave a->x f", "leave b->y f"]
+        )
+
+    def test_removal_and_flattening(self) -> None:
+        class RemovePass(cst.CSTTransformer):
+            def leave_Pass(
+                self, original_node: cst.Pass, updated_node: cst.Pass
+            ) -> cst.RemovalSentinel:
+                return cst.RemoveFromParent()
+
+        class DuplicateExpr(cst.CSTTransformer):
+            def leave_Expr(
+                self, original_node: cst.Expr, updated_node: cst.Expr
+            ) -> cst.FlattenSentinel[cst.Expr]:
+                return cst.FlattenSentinel([updated_node, updated_node])
+
+        log: List[str] = []
+
+        class LogLeaves(cst.CSTTransformer):
+            def on_leave(
+                self, original_node: cst.CSTNode, updated_node: cst.CSTNode
+            ) -> cst.CSTNode:
+                if isinstance(original_node, (cst.Pass, cst.Expr)):
+                    log.append(type(updated_node).__name__)
+                    return cst.Pass()
+                return updated_node
+
+        module = parse_module("pass; x\n")
+        transformed = transform_batched(
+            module, [RemovePass(), DuplicateExpr(), LogLeaves()]
+        )
+        self.assertEqual(cst.ensure_type(transformed, cst.Module).code, "x; x\n")
+        # Later transformers still leave removed and flattened nodes, but what they
+        # return is ignored.
+        self.assertEqual(log, ["Pass", "Expr"])
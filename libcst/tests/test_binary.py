@@ -0,0 +1,102 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import sys
+
+import libcst as cst
+from libcst._binary import _HEADER, _Writer
+from libcst.testing.utils import data_provider, UnitTest
+
+
+class BinaryTest(UnitTest):
+    @data_provider(
+        {
+            "empty": {"code": ""},
+            "simple": {"code": "x = 1\n"},
+            "no_trailing_newline": {"code": "import os\nx = os.environ['x']"},
+            "crlf_and_tabs": {"code": "if x:\r\n\tpass\r\n"},
+            "unicode": {"code": "# 🐍\nx = 'ünïcödé'  # ✓\n"},
+            "blocks": {
+                "code": (
+                    "# header\n"
+                    + "@decorator\n"
+                    + "class C(Base, metaclass=Meta):\n"
+                    + "    def f(self, *args: int, **kwargs) -> None:\n"
+                    + "        with a as b, c:\n"
+                    + "            return [x async for x in y if x] or {1: 2}\n"
+                    + "# footer\n"
+                )
+            },
+        }
+    )
+    def test_round_trip(self, code: str) -> None:
+        module = cst.parse_module(code)
+        loaded = cst.load_binary(cst.dump_binary(module))
+        self.assertIsNot(loaded, module)
+        self.assertEqual(loaded.code, code)
+        self.assertTrue(module.deep_equals(loaded))
+
+    def test_preserves_sequence_types_and_sharing(self) -> None:
+        name = cst.Name("x")
+        module = cst.Module(
+            body=(
+                cst.SimpleStatementLine([cst.Expr(name)]),
+                cst.SimpleStatementLine([cst.Expr(name)]),
+            )
+        )
+        loaded = cst.load_binary(cst.dump_binary(module))
+        self.assertEqual(loaded.code, "x\nx\n")
+        self.assertIsInstance(loaded.body, tuple)
+        first, second = loaded.body
+        self.assertIsInstance(first.body, list)
+        self.assertIs(first.body[0].value, second.body[0].value)
+
+    def test_lazy_module(self) -> None:
+        code = "x = 1\ndef f():\n    pass\n"
+        loaded = cst.load_binary(cst.dump_binary(cst.parse_module(code, lazy=True)))
+        self.assertEqual(loaded.code, code)
+        self.assertTrue(loaded.deep_equals(cst.parse_module(code)))
+
+    def test_unsupported_value(self) -> None:
+        with self.assertRaises(TypeError):
+            cst.dump_binary(cst.Module(body=[], encoding=1))  # pyre-ignore[6]
+
+    def test_invalid_data(self) -> None:
+        data = cst.dump_binary(cst.parse_module("x = 1\n"))
+        for invalid in [
+            b"",
+            b"garbage",
+            data[:-1],
+            data + b"\0\0",
+            b"XXXX" + data[4:],
+            data[:4] + bytes([255]) + data[5:],
+            data[: _HEADER.size] + b"\xff" + data[_HEADER.size + 1 :],
+        ]:
+            with self.assertRaises(ValueError):
+                cst.load_binary(invalid)
+
+    def test_only_libcst_nodes(self) -> None:
+        class CustomName(cst.Name):
+            pass
+
+        with self.assertRaises(TypeError):
+            cst.dump_binary(cst.Module(body=[cst.Expr(CustomName("x"))]))
+
+        # Type names in the data are never imported, only looked up among the
+        # nodes that LibCST defines.
+        data = cst.dump_binary(cst.parse_module("x = 1\n"))
+        original = b"libcst._nodes.expression:Name"
+        foreign = b"wsgiref.simple_server:xxxxxxx"
+        self.assertEqual(len(original), len(foreign))
+        was_imported = "wsgiref.simple_server" in sys.modules
+        with self.assertRaisesRegex(ValueError, "is not a LibCST node"):
+            cst.load_binary(data.replace(original, foreign))
+        self.assertEqual("wsgiref.simple_server" in sys.modules, was_imported)
+
+    def test_root_must_be_module(self) -> None:
+        writer = _Writer()
+        writer.value(cst.Name("x"))
+        with self.assertRaises(ValueError):
+            cst.load_binary(writer.finish())
@@ -3,7 +3,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 from textwrap import dedent
-from typing import Optional
+from typing import List, Optional, Type
 
 import libcst as cst
 from libcst.testing.utils import UnitTest
@@ -135,3 +135,90 @@ class DeepReplaceTest(UnitTest):
             module.with_deep_changes(node, value='"Goodbye, world!"'), cst.Module
         )
         self.assertEqual(new_module.code, dedent(new_code))
+
+    def test_deep_replace_many(self) -> None:
+        module = cst.parse_module(
+            dedent(
+                """
+                def a():
+                    x = 1
+                    y = 2
+                def b():
+                    z = 3
+                w = 4
+                """
+            )
+        )
+        integers = {
+            integer: integer.with_changes(value=str(int(integer.value) * 10))
+            for integer in _find(module, cst.Integer)
+        }
+        new_module = cst.ensure_type(module.deep_replace_many(integers), cst.Module)
+        self.assertEqual(
+            new_module.code,
+            dedent(
+                """
+                def a():
+                    x = 10
+                    y = 20
+                def b():
+                    z = 30
+                w = 40
+                """
+            ),
+        )
+        # Only the paths to the replaced nodes are rebuilt.
+        for old_name, new_name in zip(
+            _find(module, cst.Name), _find(new_module, cst.Name)
+        ):
+            self.assertIs(old_name, new_name)
+        self.assertIs(module.header[0], new_module.header[0])
+
+    def test_deep_replace_many_removes_and_flattens(self) -> None:
+        module = cst.parse_module("a = 1\nb = 2\nc = 3\n")
+        first, second, third = module.body
+        new_module = cst.ensure_type(
+            module.deep_replace_many(
+                {
+                    first: cst.RemovalSentinel.REMOVE,
+                    third: cst.FlattenSentinel([second, third]),
+                }
+            ),
+            cst.Module,
+        )
+        self.assertEqual(new_module.code, "b = 2\nb = 2\nc = 3\n")
+        self.assertEqual(
+            [type(node) for node in new_module.body], [cst.SimpleStatementLine] * 3
+        )
+        self.assertIs(new_module.body[0], second)
+
+    def test_deep_replace_many_nested(self) -> None:
+        module = cst.parse_module("f(g(x))\n")
+        outer = _find(module, cst.Call)[0]
+        inner = _find(module, cst.Call)[1]
+        new_module = cst.ensure_type(
+            module.deep_replace_many(
+                {inner: cst.Name("y"), outer: cst.parse_expression("h()")}
+            ),
+            cst.Module,
+        )
+        # The outer replacement replaces the inner node too.
+        self.assertEqual(new_module.code, "h()\n")
+
+    def test_deep_replace_many_without_matches(self) -> None:
+        module = cst.parse_module("a = 1\n")
+        self.assertIs(module.deep_replace_many({}), module)
+        self.assertIs(module.deep_replace_many({cst.Name("a"): cst.Name("b")}), module)
+
+
+def _find(tree: cst.CSTNode, node_type: Type[cst.CSTNode]) -> List[cst.CSTNode]:
+    found: List[cst.CSTNode] = []
+
+    class Finder(cst.CSTVisitor):
+        def on_visit(self, node: cst.CSTNode) -> bool:
+            if isinstance(node, node_type):
+                found.append(node)
+            return True
+
+    tree.visit(Finder())
+    return found
@@ -0,0 +1,140 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Iterator, List
+from unittest import mock
+
+import libcst as cst
+from libcst._batched_visitor import _BatchedCSTVisitor
+from libcst._reachability import node_type_graph
+from libcst.testing.utils import UnitTest
+
+_SOURCE = """\
+# comment
+def f(a, b=g(1)):  # comment
+    return [h(x) for x in (a, b)]
+
+class C:
+    x: int = i(2)
+"""
+
+
+def _comments(on_visit: mock.Mock) -> int:
+    # How many comments a mocked on_visit was called with.
+    return sum(
+        isinstance(call.args[-1], cst.Comment) for call in on_visit.call_args_list
+    )
+
+
+class _CallCounter(cst.CSTVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: List[str] = []
+
+    def visit_Call(self, node: cst.Call) -> None:
+        self.calls.append(cst.ensure_type(node.func, cst.Name).value)
+
+
+class _SkippingCallCounter(_CallCounter):
+    SKIP_UNREACHABLE_CHILDREN = True
+
+
+class _IntegerReplacer(cst.CSTTransformer):
+    def leave_Integer(
+        self, original_node: cst.Integer, updated_node: cst.Integer
+    ) -> cst.Integer:
+        return updated_node.with_changes(value="0")
+
+
+class _SkippingIntegerReplacer(_IntegerReplacer):
+    SKIP_UNREACHABLE_CHILDREN = True
+
+
+class ReachabilityTest(UnitTest):
+    def _visited_comments(self, visitor: cst.CSTVisitor) -> int:
+        with mock.patch.object(visitor, "on_visit", wraps=visitor.on_visit) as on_visit:
+            cst.parse_module(_SOURCE).visit(visitor)
+        return _comments(on_visit)
+
+    def test_graph(self) -> None:
+        graph = node_type_graph()
+        relevant = graph.relevant_node_types([cst.Call])
+        self.assertIn(cst.Call, relevant)
+        self.assertIn(cst.Module, relevant)
+        self.assertIn(cst.Arg, relevant)
+        self.assertNotIn(cst.Comment, relevant)
+        self.assertNotIn(cst.Integer, relevant)
+        self.assertEqual(
+            graph.unreachable_fields(cst.Call, relevant),
+            ("lpar", "rpar", "whitespace_after_func", "whitespace_before_args"),
+        )
+        self.assertEqual(graph.unreachable_fields(cst.Comment, relevant), ("value",))
+
+    def test_visitor(self) -> None:
+        visitor = _CallCounter()
+        self.assertGreater(self._visited_comments(visitor), 0)
+        skipping_visitor = _SkippingCallCounter()
+        self.assertEqual(self._visited_comments(skipping_visitor), 0)
+        self.assertEqual(skipping_visitor.calls, ["g", "h", "i"])
+        self.assertEqual(skipping_visitor.calls, visitor.calls)
+
+    def test_overridden_callbacks_visit_everything(self) -> None:
+        class Visitor(_SkippingCallCounter):
+            def on_leave(self, original_node: cst.CSTNode) -> None:
+                pass
+
+        self.assertGreater(self._visited_comments(Visitor()), 0)
+
+    def test_transformer(self) -> None:
+        module = cst.parse_module(_SOURCE)
+        expected = module.visit(_IntegerReplacer()).code
+        with mock.patch.object(cst.Comment, "visit", autospec=True) as visit:
+            transformed = module.visit(_SkippingIntegerReplacer())
+        self.assertEqual(visit.call_count, 0)
+        self.assertEqual(transformed.code, expected)
+        self.assertIn("i(0)", expected)
+        # Subtrees that weren't visited are shared with the original tree.
+        self.assertIs(transformed.header[0], module.header[0])
+
+    def test_graph_is_reused(self) -> None:
+        graph = node_type_graph()
+        with mock.patch(
+            "libcst._reachability._concrete_node_types"
+        ) as concrete_node_types:
+            self.assertIs(node_type_graph(), graph)
+        concrete_node_types.assert_not_called()
+
+    def test_new_node_types(self) -> None:
+        graph = node_type_graph()
+
+        class Node(cst.Name):
+            pass
+
+        self.assertIsNot(node_type_graph(), graph)
+        self.assertIn(Node, node_type_graph().node_types)
+
+    def test_batched(self) -> None:
+        class Batchable(cst.BatchableCSTVisitor):
+            SKIP_UNREACHABLE_CHILDREN = True
+
+            def visit_Call(self, node: cst.Call) -> None:
+                pass
+
+        class OtherBatchable(cst.BatchableCSTVisitor):
+            def visit_Integer(self, node: cst.Integer) -> None:
+                pass
+
+        def visited_comments(visitors: Iterator[cst.BatchableCSTVisitor]) -> int:
+            with mock.patch.object(
+                _BatchedCSTVisitor,
+                "on_visit",
+                autospec=True,
+                side_effect=_BatchedCSTVisitor.on_visit,
+            ) as on_visit:
+                cst.visit_batched(cst.parse_module(_SOURCE), visitors)
+            return _comments(on_visit)
+
+        self.assertEqual(visited_comments(iter([Batchable(), Batchable()])), 0)
+        self.assertGreater(visited_comments(iter([Batchable(), OtherBatchable()])), 0)
@@ -3,12 +3,95 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import List
+import sys
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+from unittest import mock
 
 import libcst as cst
 from libcst import CSTTransformer, CSTVisitor, parse_module
+from libcst._nodes.internal import CodegenState, visit_required
+from libcst._visitors import _class_tables, CSTVisitorT
 from libcst.testing.utils import UnitTest
 
+_CALLBACKS_SOURCE = """\
+from . import *
+from .a import (b as c, d)
+import os.path as p
+@decorator(x, *y, **z)
+async def f(a: int, /, b=1, *args: str, c, **kwargs) -> None:
+    "docstring"
+    x: List[int] = [i async for i in y if i] + [*a, *b]
+    with a as b, c:
+        return {**d, 1: 2}, f"{x!r:>{width}} {y=}", lambda q, *, r=2: q
+    del a[1:2, ::3], b.c
+    try:
+        raise E from None
+    except (A, B) as e:
+        global g; nonlocal n
+    finally:
+        assert not x, "message"
+    while (y := x):
+        x += 1 if x else 2
+        yield await z
+class C(Base, metaclass=M):  # comment
+    pass
+"""
+
+
+class _CallbackRecorder:
+    calls: List[Tuple[str, str]]
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        self.calls.append(("visit", type(node).__name__))
+        return True
+
+    def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
+        self.calls.append(("visit_attribute", f"{type(node).__name__}.{attribute}"))
+
+    def on_leave_attribute(self, original_node: cst.CSTNode, attribute: str) -> None:
+        self.calls.append(
+            ("leave_attribute", f"{type(original_node).__name__}.{attribute}")
+        )
+
+
+class _RecordingVisitor(_CallbackRecorder, CSTVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = []
+
+    def on_leave(self, original_node: cst.CSTNode) -> None:
+        self.calls.append(("leave", type(original_node).__name__))
+
+
+class _RecordingTransformer(_CallbackRecorder, CSTTransformer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = []
+
+    def on_leave(
+        self, original_node: cst.CSTNode, updated_node: cst.CSTNode
+    ) -> Union[cst.CSTNode, cst.RemovalSentinel]:
+        self.calls.append(("leave", type(original_node).__name__))
+        return updated_node
+
+
+@dataclass(frozen=True)
+class _Wrapper(cst.CSTNode):
+    """
+    A node whose _visit_and_replace_children can't be traced, because it does more
+    than visiting its children.
+    """
+
+    wrapped: cst.BaseExpression
+
+    def _visit_and_replace_children(self, visitor: CSTVisitorT) -> "_Wrapper":
+        wrapped = visit_required(self, "wrapped", self.wrapped, visitor)
+        return _Wrapper(wrapped=wrapped.with_changes())
+
+    def _codegen_impl(self, state: CodegenState) -> None:
+        self.wrapped._codegen(state)
+
 
 class VisitorTest(UnitTest):
     def test_visitor(self) -> None:
@@ -96,3 +179,315 @@ class VisitorTest(UnitTest):
                 "leave_If",
             ],
         )
+
+    def test_visitor_fires_the_same_callbacks_as_a_transformer(self) -> None:
+        module = parse_module(_CALLBACKS_SOURCE)
+        visitor = _RecordingVisitor()
+        transformer = _RecordingTransformer()
+        self.assertIs(module.visit(visitor), module)
+        module.visit(transformer)
+        self.assertEqual(visitor.calls, transformer.calls)
+
+    def test_visitor_does_not_construct_nodes(self) -> None:
+        module = parse_module(_CALLBACKS_SOURCE)
+        # The first visit of each node type traces how it visits its children.
+        module.visit(_RecordingVisitor())
+        with mock.patch.object(
+            cst.CSTNode, "__post_init__", side_effect=AssertionError
+        ):
+            visitor = _RecordingVisitor()
+            module.visit(visitor)
+            self.assertEqual(len(module.children), len(module.body))
+        self.assertIn(("visit", "FormattedStringExpression"), visitor.calls)
+
+    def test_untraceable_node(self) -> None:
+        node = _Wrapper(wrapped=cst.Name("x"))
+        visitor = _RecordingVisitor()
+        node.visit(visitor)
+        self.assertEqual(
+            visitor.calls,
+            [
+                ("visit", "_Wrapper"),
+                ("visit_attribute", "_Wrapper.wrapped"),
+                ("visit", "Name"),
+                ("visit_attribute", "Name.lpar"),
+                ("leave_attribute", "Name.lpar"),
+                ("visit_attribute", "Name.rpar"),
+                ("leave_attribute", "Name.rpar"),
+                ("leave", "Name"),
+                ("leave_attribute", "_Wrapper.wrapped"),
+                ("leave", "_Wrapper"),
+            ],
+        )
+        self.assertEqual(node.children, [node.wrapped])
+
+    def test_transformer_preserves_unchanged_nodes(self) -> None:
+        class RenameY(CSTTransformer):
+            def leave_Name(
+                self, original_node: cst.Name, updated_node: cst.Name
+            ) -> cst.Name:
+                if original_node.value == "y":
+                    return updated_node.with_changes(value="z")
+                return updated_node
+
+        module = parse_module("x = 1\nif x:\n    y = 2\n    w = 3\n")
+        self.assertIs(module.visit(_RecordingTransformer()), module)
+
+        new_module = module.visit(RenameY())
+        self.assertEqual(new_module.code, "x = 1\nif x:\n    z = 2\n    w = 3\n")
+        self.assertIsNot(new_module, module)
+        assign_x, if_stmt = module.body
+        new_assign_x, new_if_stmt = new_module.body
+        self.assertIs(new_assign_x, assign_x)
+        self.assertIsNot(new_if_stmt, if_stmt)
+        self.assertIs(new_if_stmt.test, if_stmt.test)
+        self.assertIs(new_if_stmt.body.body[1], if_stmt.body.body[1])
+
+    def test_transformer_removes_and_flattens_children(self) -> None:
+        class Transformer(CSTTransformer):
+            def leave_SimpleStatementLine(
+                self,
+                original_node: cst.SimpleStatementLine,
+                updated_node: cst.SimpleStatementLine,
+            ) -> Union[
+                cst.SimpleStatementLine,
+                cst.RemovalSentinel,
+                cst.FlattenSentinel[cst.SimpleStatementLine],
+            ]:
+                code = cst.Module([]).code_for_node(original_node)
+                if code.startswith("a"):
+                    return cst.RemovalSentinel.REMOVE
+                if code.startswith("b"):
+                    return cst.FlattenSentinel([updated_node, updated_node])
+                return updated_node
+
+        module = parse_module("a = 1\nb = 2\nc = 3\nif x:\n    a = 4\n")
+        new_module = module.visit(Transformer())
+        self.assertEqual(new_module.code, "b = 2\nb = 2\nc = 3\nif x:\n    pass\n")
+        self.assertIs(new_module.body[2], module.body[2])
+
+    def test_transformer_cannot_remove_required_children(self) -> None:
+        class RemoveNames(CSTTransformer):
+            def leave_Name(
+                self, original_node: cst.Name, updated_node: cst.Name
+            ) -> cst.RemovalSentinel:
+                return cst.RemovalSentinel.REMOVE
+
+        with self.assertRaisesRegex(TypeError, "does not allow it to be removed"):
+            parse_module("x = 1\n").visit(RemoveNames())
+
+    def test_callbacks_of_subclasses_and_instances(self) -> None:
+        class NameCollector(CSTVisitor):
+            def __init__(self) -> None:
+                super().__init__()
+                self.seen: List[str] = []
+
+            def visit_Name(self, node: cst.Name) -> None:
+                self.seen.append(f"Name {node.value}")
+
+            @staticmethod
+            def visit_Integer(node: cst.Integer) -> bool:
+                return False
+
+        class CallCollector(NameCollector):
+            def visit_Call_func(self, node: cst.Call) -> None:
+                self.seen.append("Call.func")
+
+            def leave_Call_args(self, original_node: cst.Call) -> None:
+                self.seen.append("Call.args")
+
+        class SkippingCollector(NameCollector):
+            def __init__(self) -> None:
+                super().__init__()
+                self.visit_Name = lambda node: self.seen.append("instance")
+
+        module = parse_module("f(x, 1)\n")
+        expected = {
+            NameCollector: ["Name f", "Name x"],
+            CallCollector: ["Call.func", "Name f", "Name x", "Call.args"],
+            SkippingCollector: ["instance", "instance"],
+        }
+        # Twice, so that the second round uses the cached callbacks.
+        for _ in range(2):
+            for cls, seen in expected.items():
+                visitor = cls()
+                module.visit(visitor)
+                self.assertEqual(visitor.seen, seen)
+
+    def test_callbacks_patched_after_first_traversal(self) -> None:
+        class NameCollector(CSTVisitor):
+            def visit_Name(self, node: cst.Name) -> None:
+                pass
+
+        class NameTransformer(CSTTransformer):
+            def leave_Name(
+                self, original_node: cst.Name, updated_node: cst.Name
+            ) -> cst.Name:
+                return updated_node
+
+        module = parse_module("f(x)\n")
+        callbacks = ((NameCollector, "visit_Name"), (NameTransformer, "leave_Name"))
+        for cls, name in callbacks:
+            module.visit(cls())
+            original = getattr(cls, name)
+            with mock.patch.object(cls, name, autospec=True) as patched:
+                patched.side_effect = original
+                module.visit(cls())
+                self.assertEqual(patched.call_count, 2)
+            # Once unpatched, the original callback is used again.
+            visitor = cls()
+            module.visit(visitor)
+            self.assertEqual(patched.call_count, 2)
+
+    def test_callbacks_from_getattr(self) -> None:
+        class DynamicVisitor(CSTVisitor):
+            def __init__(self) -> None:
+                super().__init__()
+                self.seen: List[str] = []
+
+            def __getattr__(self, name: str) -> object:
+                # Only called for callbacks that CSTVisitor doesn't have a stub for.
+                if name in ("visit__Wrapper", "leave__Wrapper_wrapped"):
+                    return lambda node: self.seen.append(name)
+                raise AttributeError(name)
+
+        visitor = DynamicVisitor()
+        _Wrapper(wrapped=cst.Name("x")).visit(visitor)
+        self.assertEqual(visitor.seen, ["visit__Wrapper", "leave__Wrapper_wrapped"])
+
+    def test_only_callback_changes_forget_callbacks(self) -> None:
+        class NameCollector(CSTVisitor):
+            def visit_Name(self, node: cst.Name) -> None:
+                pass
+
+        parse_module("x\n").visit(NameCollector())
+        self.assertIn(NameCollector, _class_tables)
+        NameCollector.unrelated = 1
+        self.assertIn(NameCollector, _class_tables)
+        NameCollector.leave_Name = lambda self, node: None
+        self.assertNotIn(NameCollector, _class_tables)
+
+    def test_instance_callbacks_added_after_first_traversal(self) -> None:
+        module = parse_module("f(x)\n")
+        seen: List[str] = []
+        visitor = CSTVisitor()
+        module.visit(visitor)
+        visitor.visit_Name = lambda node: seen.append(node.value)
+        module.visit(visitor)
+        self.assertEqual(seen, ["f", "x"])
+        visitor.visit_Name = lambda node: seen.append("replaced")
+        module.visit(visitor)
+        self.assertEqual(seen, ["f", "x", "replaced", "replaced"])
+        del visitor.visit_Name
+        module.visit(visitor)
+        self.assertEqual(seen, ["f", "x", "replaced", "replaced"])
+
+        transformer = CSTTransformer()
+        module.visit(transformer)
+        transformer.leave_Name = lambda original_node, updated_node: (
+            updated_node.with_changes(value="y")
+        )
+        self.assertEqual(module.visit(transformer).code, "y(y)\n")
+
+    def test_overridden_attribute_callbacks(self) -> None:
+        visitor = _RecordingVisitor()
+        parse_module("x\n").visit(visitor)
+        self.assertIn(("visit_attribute", "Expr.value"), visitor.calls)
+        self.assertIn(("leave_attribute", "Expr.value"), visitor.calls)
+
+    def test_deep_tree(self) -> None:
+        # Deeper than a recursive traversal could go.
+        depth = sys.getrecursionlimit() * 2
+        expression: cst.BaseExpression = cst.Name("x")
+        for i in range(depth):
+            expression = cst.BinaryOperation(
+                left=expression, operator=cst.Add(), right=cst.Integer(str(i))
+            )
+        visitor = _RecordingVisitor()
+        self.assertIs(expression.visit(visitor), expression)
+        operations = [
+            callback
+            for callback, node_type in visitor.calls
+            if node_type == "BinaryOperation"
+        ]
+        self.assertEqual(operations, ["visit"] * depth + ["leave"] * depth)
+
+    def test_visitor_skips_children(self) -> None:
+        class SkipCalls(_RecordingVisitor):
+            def on_visit(self, node: cst.CSTNode) -> bool:
+                super().on_visit(node)
+                return not isinstance(node, cst.Call)
+
+        module = parse_module("f(x)\n")
+        visitor = SkipCalls()
+        module.visit(visitor)
+        self.assertIn(("visit", "Call"), visitor.calls)
+        self.assertNotIn(("visit", "Arg"), visitor.calls)
+        self.assertEqual(
+            visitor.calls.index(("leave", "Call")),
+            visitor.calls.index(("visit", "Call")) + 1,
+        )
+
+        root = cst.Call(func=cst.Name("f"))
+        visitor = SkipCalls()
+        root.visit(visitor)
+        self.assertEqual(visitor.calls, [("visit", "Call"), ("leave", "Call")])
+
+    def test_stop_traversal(self) -> None:
+        class StopAtName(_RecordingVisitor):
+            def __init__(self, callback: str) -> None:
+                super().__init__()
+                self.callback = callback
+
+            def on_visit(self, node: cst.CSTNode) -> bool:
+                visit_children = super().on_visit(node)
+                if self.callback == "visit" and isinstance(node, cst.Name):
+                    self.stop_traversal()
+                return visit_children
+
+            def on_leave(self, original_node: cst.CSTNode) -> None:
+                super().on_leave(original_node)
+                if self.callback == "leave" and isinstance(original_node, cst.Name):
+                    self.stop_traversal()
+
+            def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
+                super().on_visit_attribute(node, attribute)
+                if self.callback == "attribute" and attribute == "args":
+                    self.stop_traversal()
+
+        module = parse_module("f(x)\ny\n")
+        for callback, last in [
+            ("visit", ("visit", "Name")),
+            ("leave", ("leave", "Name")),
+            ("attribute", ("visit_attribute", "Call.args")),
+        ]:
+            visitor = StopAtName(callback)
+            self.assertIs(module.visit(visitor), module)
+            self.assertEqual(visitor.calls[-1], last)
+            self.assertEqual(visitor.calls.count(("visit", "Name")), 1)
+            # The visitor can be used again.
+            visitor.calls.clear()
+            visitor.callback = ""
+            module.visit(visitor)
+            self.assertEqual(visitor.calls[-1], ("leave", "Module"))
+
+    def test_stop_traversal_in_untraceable_node(self) -> None:
+        class StopAtFirstName(_RecordingVisitor):
+            def on_visit(self, node: cst.CSTNode) -> bool:
+                if isinstance(node, cst.Name):
+                    self.stop_traversal()
+                return super().on_visit(node)
+
+        node = cst.Tuple(
+            [
+                cst.Element(_Wrapper(wrapped=cst.Name("x"))),
+                cst.Element(cst.Name("y")),
+            ]
+        )
+        visitor = StopAtFirstName()
+        node.visit(visitor)
+        # _Wrapper still fires its own attribute callbacks, but no more nodes are
+        # visited or left.
+        nodes = [call for call in visitor.calls if call[0] in ("visit", "leave")]
+        self.assertEqual(nodes[-1], ("visit", "Name"))
+        self.assertEqual(nodes.count(("visit", "Name")), 1)
@@ -351,6 +351,16 @@ def _codemod_impl(proc_name: str, command_args: List[str]) -> int:  # noqa: C901
         action="store_true",
         help="Do not print progress indicator. Useful if calling from a script.",
     )
+    parser.add_argument(
+        "--parse-cache",
+        metavar="DIR",
+        help=(
+            "Cache parsed files in this directory, to speed up running codemods "
+            + "repeatedly over the same files."
+        ),
+        type=str,
+        default=None,
+    )
     command_class.add_args(parser)
     args = parser.parse_args(command_args)
 
@@ -368,6 +378,7 @@ def _codemod_impl(proc_name: str, command_args: List[str]) -> int:  # noqa: C901
             "include_stubs",
             "jobs",
             "no_format",
+            "parse_cache",
             "path",
             "python_version",
             "show_successes",
@@ -433,6 +444,7 @@ def _codemod_impl(proc_name: str, command_args: List[str]) -> int:  # noqa: C901
             blacklist_patterns=config["blacklist_patterns"],
             python_version=args.python_version,
             repo_root=config["repo_root"],
+            parse_cache=args.parse_cache,
         )
     except KeyboardInterrupt:
         print("Interrupted!", file=sys.stderr)
@@ -17,6 +17,7 @@ use rayon::prelude::*;
 
 use libcst_native::{
     parse_module, parse_tokens_without_whitespace, tokenize, Codegen, Config, Inflate,
+    ParserConfig,
 };
 
 #[cfg(not(windows))]
@@ -61,8 +62,13 @@ pub fn inflate_benchmarks<T: Measurement>(c: &mut Criterion<T>) {
         b.iter_batched(
             || {
                 let conf = Config::new(fixture.as_str(), &tokens);
-                let m = parse_tokens_without_whitespace(&tokvec, fixture.as_str(), None)
-                    .expect("parse failed");
+                let m = parse_tokens_without_whitespace(
+                    &tokvec,
+                    fixture.as_str(),
+                    None,
+                    &ParserConfig::default(),
+                )
+                .expect("parse failed");
                 (conf, m)
             },
             |(conf, m)| black_box(m.inflate(&conf)),
@@ -84,6 +90,7 @@ pub fn parser_benchmarks<T: Measurement>(c: &mut Criterion<T>) {
                     &tokens,
                     fixture.as_str(),
                     None,
+                    &ParserConfig::default(),
                 )))
             },
             BatchSize::SmallInput,
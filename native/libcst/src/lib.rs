@@ -15,16 +15,21 @@ use nodes::deflated::Module as DeflatedModule;
 pub use nodes::*;
 
 mod parser;
+pub use parser::ParserConfig;
 use parser::{ParserError, Result, TokVec};
 
 #[cfg(feature = "py")]
 pub mod py;
 
 pub fn tokenize(text: &str) -> Result<Vec<Token>> {
+    tokenize_with_config(text, &ParserConfig::default())
+}
+
+fn tokenize_with_config<'a>(text: &'a str, config: &ParserConfig) -> Result<'a, Vec<Token<'a>>> {
     let iter = TokenIterator::new(
         text,
         &TokConfig {
-            async_hacks: false,
+            async_hacks: config.async_hacks(),
             split_fstring: true,
         },
     );
@@ -33,18 +38,23 @@ pub fn tokenize(text: &str) -> Result<Vec<Token>> {
         .map_err(|err| ParserError::TokenizerError(err, text))
 }
 
-pub fn parse_module<'a>(
+pub fn parse_module<'a>(module_text: &'a str, encoding: Option<&str>) -> Result<'a, Module<'a>> {
+    parse_module_with_config(module_text, encoding, &ParserConfig::default())
+}
+
+pub fn parse_module_with_config<'a>(
     mut module_text: &'a str,
     encoding: Option<&str>,
+    config: &ParserConfig,
 ) -> Result<'a, Module<'a>> {
     // Strip UTF-8 BOM
     if let Some(stripped) = module_text.strip_prefix('\u{feff}') {
         module_text = stripped;
     }
-    let tokens = tokenize(module_text)?;
+    let tokens = tokenize_with_config(module_text, config)?;
     let conf = whitespace_parser::Config::new(module_text, &tokens);
     let tokvec = tokens.into();
-    let m = parse_tokens_without_whitespace(&tokvec, module_text, encoding)?;
+    let m = parse_tokens_without_whitespace(&tokvec, module_text, encoding, config)?;
     Ok(m.inflate(&conf)?)
 }
 
@@ -52,26 +62,41 @@ pub fn parse_tokens_without_whitespace<'r, 'a>(
     tokens: &'r TokVec<'a>,
     module_text: &'a str,
     encoding: Option<&str>,
+    config: &ParserConfig,
 ) -> Result<'a, DeflatedModule<'r, 'a>> {
-    let m = parser::python::file(tokens, module_text, encoding)
+    let m = parser::python::file(tokens, module_text, config, encoding)
         .map_err(|err| ParserError::ParserError(err, module_text))?;
     Ok(m)
 }
 
 pub fn parse_statement(text: &str) -> Result<Statement> {
-    let tokens = tokenize(text)?;
+    parse_statement_with_config(text, &ParserConfig::default())
+}
+
+pub fn parse_statement_with_config<'a>(
+    text: &'a str,
+    config: &ParserConfig,
+) -> Result<'a, Statement<'a>> {
+    let tokens = tokenize_with_config(text, config)?;
     let conf = whitespace_parser::Config::new(text, &tokens);
     let tokvec = tokens.into();
-    let stm = parser::python::statement_input(&tokvec, text)
+    let stm = parser::python::statement_input(&tokvec, text, config)
         .map_err(|err| ParserError::ParserError(err, text))?;
     Ok(stm.inflate(&conf)?)
 }
 
 pub fn parse_expression(text: &str) -> Result<Expression> {
-    let tokens = tokenize(text)?;
+    parse_expression_with_config(text, &ParserConfig::default())
+}
+
+pub fn parse_expression_with_config<'a>(
+    text: &'a str,
+    config: &ParserConfig,
+) -> Result<'a, Expression<'a>> {
+    let tokens = tokenize_with_config(text, config)?;
     let conf = whitespace_parser::Config::new(text, &tokens);
     let tokvec = tokens.into();
-    let expr = parser::python::expression_input(&tokvec, text)
+    let expr = parser::python::expression_input(&tokvec, text, config)
         .map_err(|err| ParserError::ParserError(err, text))?;
     Ok(expr.inflate(&conf)?)
 }
@@ -165,6 +190,50 @@ mod test {
         }
     }
 
+    #[test]
+    fn test_python_version() {
+        for (src, version) in &[
+            ("(x := 1)", (3, 8)),
+            ("def f(a, /): ...", (3, 8)),
+            ("lambda a, /: a", (3, 8)),
+            ("f'{x=}'", (3, 8)),
+            ("x: int = 1", (3, 6)),
+            ("f'{x}'", (3, 6)),
+            ("a @ b", (3, 5)),
+            ("async def f(): await x", (3, 5)),
+            ("def f(): yield from x", (3, 3)),
+            ("with (a as b, c as d): ...", (3, 9)),
+            ("match x:\n    case _: ...\n", (3, 10)),
+            ("try: ...\nexcept* E: ...\n", (3, 11)),
+            ("type X = int", (3, 12)),
+            ("def f[T](): ...", (3, 12)),
+        ] {
+            let (major, minor) = *version;
+            let config = |python_version| ParserConfig {
+                python_version: Some(python_version),
+            };
+            parse_module_with_config(src, None, &config((major, minor)))
+                .unwrap_or_else(|e| panic!("'{}' doesn't parse: {}", src, e));
+            assert!(
+                parse_module_with_config(src, None, &config((major, minor - 1))).is_err(),
+                "'{}' parses before {}.{}",
+                src,
+                major,
+                minor
+            );
+            parse_module(src, None).unwrap_or_else(|e| panic!("'{}' doesn't parse: {}", src, e));
+        }
+    }
+
+    #[test]
+    fn test_async_identifiers_before_python_3_7() {
+        let config = ParserConfig {
+            python_version: Some((3, 6)),
+        };
+        parse_module_with_config("async = await = 1\n", None, &config).expect("parse error");
+        assert!(parse_module("async = 1\n", None).is_err());
+    }
+
     #[test]
     fn bol_offset_first_line() {
         assert_eq!(0, bol_offset("hello", 1));
@@ -2524,10 +2524,12 @@ impl<'r, 'a> Inflate<'a> for DeflatedNamedExpr<'r, 'a> {
 #[cfg(feature = "py")]
 mod py {
 
-    use pyo3::types::PyModule;
+    use pyo3::sync::GILOnceCell;
+    use pyo3::types::PyDict;
+    use pyo3::{intern, PyObject};
 
     use super::*;
-    use crate::nodes::traits::py::TryIntoPy;
+    use crate::nodes::traits::py::{node_constructor, TryIntoPy};
 
     // TODO: this could be a derive helper attribute to override the python class name
     impl<'a> TryIntoPy<pyo3::PyObject> for Element<'a> {
@@ -2535,22 +2537,13 @@ mod py {
             match self {
                 Self::Starred(s) => s.try_into_py(py),
                 Self::Simple { value, comma } => {
-                    let libcst = PyModule::import(py, "libcst")?;
-                    let kwargs = [
-                        Some(("value", value.try_into_py(py)?)),
-                        comma
-                            .map(|x| x.try_into_py(py))
-                            .transpose()?
-                            .map(|x| ("comma", x)),
-                    ]
-                    .iter()
-                    .filter(|x| x.is_some())
-                    .map(|x| x.as_ref().unwrap())
-                    .collect::<Vec<_>>()
-                    .into_py_dict(py);
-                    Ok(libcst
-                        .getattr("Element")
-                        .expect("no Element found in libcst")
+                    static CONSTRUCTOR: GILOnceCell<PyObject> = GILOnceCell::new();
+                    let kwargs = PyDict::new(py);
+                    kwargs.set_item(intern!(py, "value"), value.try_into_py(py)?)?;
+                    if let Some(comma) = comma {
+                        kwargs.set_item(intern!(py, "comma"), comma.try_into_py(py)?)?;
+                    }
+                    Ok(node_constructor(py, &CONSTRUCTOR, "Element")?
                         .call((), Some(kwargs))?
                         .into())
                 }
@@ -2571,31 +2564,22 @@ mod py {
                     whitespace_before_colon,
                     ..
                 } => {
-                    let libcst = PyModule::import(py, "libcst")?;
-                    let kwargs = [
-                        Some(("key", key.try_into_py(py)?)),
-                        Some(("value", value.try_into_py(py)?)),
-                        Some((
-                            "whitespace_before_colon",
-                            whitespace_before_colon.try_into_py(py)?,
-                        )),
-                        Some((
-                            "whitespace_after_colon",
-                            whitespace_after_colon.try_into_py(py)?,
-                        )),
-                        comma
-                            .map(|x| x.try_into_py(py))
-                            .transpose()?
-                            .map(|x| ("comma", x)),
-                    ]
-                    .iter()
-                    .filter(|x| x.is_some())
-                    .map(|x| x.as_ref().unwrap())
-                    .collect::<Vec<_>>()
-                    .into_py_dict(py);
-                    Ok(libcst
-                        .getattr("DictElement")
-                        .expect("no Element found in libcst")
+                    static CONSTRUCTOR: GILOnceCell<PyObject> = GILOnceCell::new();
+                    let kwargs = PyDict::new(py);
+                    kwargs.set_item(intern!(py, "key"), key.try_into_py(py)?)?;
+                    kwargs.set_item(intern!(py, "value"), value.try_into_py(py)?)?;
+                    kwargs.set_item(
+                        intern!(py, "whitespace_before_colon"),
+                        whitespace_before_colon.try_into_py(py)?,
+                    )?;
+                    kwargs.set_item(
+                        intern!(py, "whitespace_after_colon"),
+                        whitespace_after_colon.try_into_py(py)?,
+                    )?;
+                    if let Some(comma) = comma {
+                        kwargs.set_item(intern!(py, "comma"), comma.try_into_py(py)?)?;
+                    }
+                    Ok(node_constructor(py, &CONSTRUCTOR, "DictElement")?
                         .call((), Some(kwargs))?
                         .into())
                 }
@@ -118,7 +118,31 @@ impl<'a, T: Inflate<'a>> Inflate<'a> for Vec<T> {
 }
 #[cfg(feature = "py")]
 pub mod py {
-    use pyo3::{types::PyAny, types::PyTuple, IntoPy, PyObject, PyResult, Python};
+    use pyo3::{
+        sync::GILOnceCell, types::PyAny, types::PyModule, types::PyTuple, IntoPy, PyObject,
+        PyResult, Python,
+    };
+
+    /// Returns the constructor used to convert nodes into instances of the python node
+    /// class `name`. Our trees are valid by construction, so this is the class'
+    /// trusted constructor, which skips validation (see `CSTNode._trusted_constructor`).
+    ///
+    /// The constructor is resolved on first use and cached in `cell`, which should be a
+    /// static dedicated to `name`. This saves an import and two attribute lookups for
+    /// every converted node.
+    pub fn node_constructor<'py>(
+        py: Python<'py>,
+        cell: &'static GILOnceCell<PyObject>,
+        name: &str,
+    ) -> PyResult<&'py PyAny> {
+        let constructor = cell.get_or_try_init(py, || -> PyResult<PyObject> {
+            Ok(PyModule::import(py, "libcst")?
+                .getattr(name)?
+                .call_method0("_trusted_constructor")?
+                .into())
+        })?;
+        Ok(constructor.as_ref(py))
+    }
 
     // TODO: replace with upstream implementation once
     // https://github.com/PyO3/pyo3/issues/1813 is resolved
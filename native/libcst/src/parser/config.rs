@@ -0,0 +1,27 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+//
+// This source code is licensed under the MIT license found in the
+// LICENSE file in the root directory of this source tree
+
+/// Restricts the syntax that the parser accepts. The default accepts everything the
+/// grammar supports, regardless of which python version introduced it.
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Default)]
+pub struct ParserConfig {
+    /// The `(major, minor)` python version the source is written for. Syntax that was
+    /// introduced in a later version is rejected. `None` doesn't restrict anything.
+    pub python_version: Option<(u8, u8)>,
+}
+
+impl ParserConfig {
+    /// Whether syntax introduced in python `major.minor` is accepted.
+    pub fn supports(&self, major: u8, minor: u8) -> bool {
+        self.python_version
+            .map_or(true, |version| version >= (major, minor))
+    }
+
+    /// Python 3.5 and 3.6 only treat `async` and `await` as keywords inside of
+    /// `async def`s, see `TokConfig::async_hacks`.
+    pub fn async_hacks(&self) -> bool {
+        !self.supports(3, 7)
+    }
+}
@@ -10,7 +10,7 @@ use crate::nodes::deflated::*;
 use crate::nodes::expression::make_fstringtext;
 use crate::nodes::op::make_importstar;
 use crate::nodes::traits::ParenthesizedDeflatedNode;
-use crate::parser::ParserError;
+use crate::parser::{ParserConfig, ParserError};
 use crate::tokenizer::{TokType, Token};
 use crate::WithComma;
 use peg::str::LineCol;
@@ -88,7 +88,7 @@ impl<'input, 'a: 'input> ParseElem<'input> for TokVec<'a> {
 const MAX_RECURSION_DEPTH: usize = 3000;
 
 parser! {
-    pub grammar python<'a>(input: &'a str) for TokVec<'a> {
+    pub grammar python<'a>(input: &'a str, config: &ParserConfig) for TokVec<'a> {
 
         // Starting Rules
 
@@ -164,13 +164,13 @@ parser! {
         // Simple statements
 
         rule assignment() -> SmallStatement<'input, 'a>
-            = a:name() col:lit(":") ann:expression()
+            = version(3, 6) a:name() col:lit(":") ann:expression()
                 rhs:(eq:lit("=") d:annotated_rhs() {(eq, d)})? {
                     SmallStatement::AnnAssign(make_ann_assignment(
                         AssignTargetExpression::Name(Box::new(a)), col, ann, rhs))
             }
             // TODO: there's an extra '(' single_target ')' clause here in upstream
-            / a:single_subscript_attribute_target() col:lit(":") ann:expression()
+            / version(3, 6) a:single_subscript_attribute_target() col:lit(":") ann:expression()
                 rhs:(eq:lit("=") d:annotated_rhs() {(eq, d)})? {
                     SmallStatement::AnnAssign(make_ann_assignment(a, col, ann, rhs))
             }
@@ -188,7 +188,7 @@ parser! {
             = &(lit("+=")
                 / lit("-=")
                 / lit("*=")
-                / lit("@=")
+                / version(3, 5) lit("@=")
                 /  lit("/=")
                 / lit("%=")
                 / lit("&=")
@@ -342,7 +342,7 @@ parser! {
                 cp:lit(")") ty:_returns()? c:lit(":") b:block() {
                     make_function_def(None, def, n, t, op, params, cp, ty, c, b)
             }
-            / asy:tok(Async, "ASYNC") def:lit("def") n:name() t:type_params()? op:lit("(") params:params()?
+            / version(3, 5) asy:tok(Async, "ASYNC") def:lit("def") n:name() t:type_params()? op:lit("(") params:params()?
                 cp:lit(")") ty:_returns()? c:lit(":") b:block() {
                     make_function_def(Some(asy), def, n, t, op, params, cp, ty, c, b)
             }
@@ -370,18 +370,18 @@ parser! {
             }
 
         rule slash_no_default() -> (Vec<Param<'input, 'a>>, ParamSlash<'input, 'a>)
-            = a:param_no_default()+ tok:lit("/") com:comma() {
+            = a:param_no_default()+ version(3, 8) tok:lit("/") com:comma() {
                     (a, ParamSlash { comma: Some(com), tok })
             }
-            / a:param_no_default()+ tok:lit("/") &lit(")") {
+            / a:param_no_default()+ version(3, 8) tok:lit("/") &lit(")") {
                 (a, ParamSlash { comma: None, tok })
             }
 
         rule slash_with_default() -> (Vec<Param<'input, 'a>>, ParamSlash<'input, 'a>)
-            = a:param_no_default()* b:param_with_default()+ tok:lit("/") c:comma() {
+            = a:param_no_default()* b:param_with_default()+ version(3, 8) tok:lit("/") c:comma() {
                 (concat(a, b), ParamSlash { comma: Some(c), tok })
             }
-            / a:param_no_default()* b:param_with_default()+ tok:lit("/") &lit(")") {
+            / a:param_no_default()* b:param_with_default()+ version(3, 8) tok:lit("/") &lit(")") {
                 (concat(a, b), ParamSlash { comma: None, tok })
             }
 
@@ -499,7 +499,7 @@ parser! {
                 c:lit(":") b:block() el:else_block()? {
                     make_for(None, f, t, i, it, c, b, el)
             }
-            / asy:tok(Async, "ASYNC") f:lit("for") t:star_targets() i:lit("in")
+            / version(3, 5) asy:tok(Async, "ASYNC") f:lit("for") t:star_targets() i:lit("in")
                 it:star_expressions()
                 c:lit(":") b:block() el:else_block()? {
                     make_for(Some(asy), f, t, i, it, c, b, el)
@@ -508,7 +508,7 @@ parser! {
         // With statement
 
         rule with_stmt() -> With<'input, 'a>
-            = kw:lit("with") l:lpar() items:separated_trailer(<with_item()>, <comma()>) r:rpar()
+            = version(3, 9) kw:lit("with") l:lpar() items:separated_trailer(<with_item()>, <comma()>) r:rpar()
                 col:lit(":") b:block() {
                     make_with(None, kw, Some(l), comma_separate(items.0, items.1, items.2), Some(r), col, b)
             }
@@ -516,11 +516,11 @@ parser! {
                 col:lit(":") b:block() {
                     make_with(None, kw, None, comma_separate(items.0, items.1, None), None, col, b)
             }
-            / asy:tok(Async, "ASYNC") kw:lit("with") l:lpar() items:separated_trailer(<with_item()>, <comma()>) r:rpar()
+            / version(3, 9) asy:tok(Async, "ASYNC") kw:lit("with") l:lpar() items:separated_trailer(<with_item()>, <comma()>) r:rpar()
                 col:lit(":") b:block() {
                     make_with(Some(asy), kw, Some(l), comma_separate(items.0, items.1, items.2), Some(r), col, b)
             }
-            / asy:tok(Async, "ASYNC") kw:lit("with") items:separated(<with_item()>, <comma()>)
+            / version(3, 5) asy:tok(Async, "ASYNC") kw:lit("with") items:separated(<with_item()>, <comma()>)
                 col:lit(":") b:block() {
                     make_with(Some(asy), kw, None, comma_separate(items.0, items.1, None), None, col, b)
             }
@@ -563,7 +563,7 @@ parser! {
             }
 
         rule except_star_block() -> ExceptStarHandler<'input, 'a>
-            = kw:lit("except") star:lit("*") e:expression()
+            = version(3, 11) kw:lit("except") star:lit("*") e:expression()
                 a:(k:lit("as") n:name() {(k, n)})? col:lit(":") b:block() {
                     make_except_star(kw, star, e, a, col, b)
             }
@@ -577,7 +577,7 @@ parser! {
         // Match statement
 
         rule match_stmt() -> Match<'input, 'a>
-            = kw:lit("match") subject:subject_expr() col:lit(":") tok(NL, "NEWLINE")
+            = version(3, 10) kw:lit("match") subject:subject_expr() col:lit(":") tok(NL, "NEWLINE")
                 i:tok(Indent, "INDENT") cases:case_block()+ d:tok(Dedent, "DEDENT") {
                     make_match(kw, subject, col, i, cases, d)
             }
@@ -789,14 +789,14 @@ parser! {
         // Type statement
 
         rule type_stmt() -> TypeAlias<'input, 'a>
-            = t:lit("type") n:name() ps:type_params()? eq:lit("=") v:expression() {
+            = version(3, 12) t:lit("type") n:name() ps:type_params()? eq:lit("=") v:expression() {
                 make_type_alias(t, n, ps, eq, v)
             }
 
         // Type parameter declaration
 
         rule type_params() -> TypeParameters<'input, 'a>
-            = lb:lbrak() ps:separated_trailer(<type_param()>, <comma()>) rb:rbrak() {
+            = version(3, 12) lb:lbrak() ps:separated_trailer(<type_param()>, <comma()>) rb:rbrak() {
                 make_type_parameters(lb, comma_separate(ps.0, ps.1, ps.2), rb)
             }
 
@@ -822,7 +822,7 @@ parser! {
             / disjunction()
 
         rule yield_expr() -> Expression<'input, 'a>
-            = y:lit("yield") f:lit("from") a:expression() {
+            = version(3, 3) y:lit("yield") f:lit("from") a:expression() {
                 Expression::Yield(Box::new(make_yield(y, Some(f), Some(a))))
             }
             / y:lit("yield") a:star_expressions()? {
@@ -859,7 +859,7 @@ parser! {
             / e:named_expression() { expr_to_element(e) }
 
         rule named_expression() -> Expression<'input, 'a>
-            = a:name() op:lit(":=") b:expression() {
+            = version(3, 8) a:name() op:lit(":=") b:expression() {
                 Expression::NamedExpr(Box::new(make_named_expr(a, op, b)))
             }
             / e:expression() !lit(":=") { e }
@@ -976,7 +976,7 @@ parser! {
             / a:term() op:lit("%") b:factor() {?
                 make_binary_op(a, op, b).map_err(|e| "expected term")
             }
-            / a:term() op:lit("@") b:factor() {?
+            / version(3, 5) a:term() op:lit("@") b:factor() {?
                 make_binary_op(a, op, b).map_err(|e| "expected term")
             }
             / factor()
@@ -1003,7 +1003,7 @@ parser! {
         // Primary elements
 
         rule await_primary() -> Expression<'input, 'a>
-            = aw:tok(AWAIT, "AWAIT") e:primary() {
+            = version(3, 5) aw:tok(AWAIT, "AWAIT") e:primary() {
                 Expression::Await(Box::new(make_await(aw, e)))
             }
             / primary()
@@ -1090,18 +1090,18 @@ parser! {
             }
 
         rule lambda_slash_no_default() -> (Vec<Param<'input, 'a>>, ParamSlash<'input, 'a>)
-            = a:lambda_param_no_default()+ tok:lit("/") com:comma() {
+            = a:lambda_param_no_default()+ version(3, 8) tok:lit("/") com:comma() {
                 (a, ParamSlash { comma: Some(com), tok } )
             }
-            / a:lambda_param_no_default()+ tok:lit("/") &lit(":") {
+            / a:lambda_param_no_default()+ version(3, 8) tok:lit("/") &lit(":") {
                 (a, ParamSlash { comma: None, tok })
             }
 
         rule lambda_slash_with_default() -> (Vec<Param<'input, 'a>>, ParamSlash<'input, 'a>)
-            = a:lambda_param_no_default()* b:lambda_param_with_default()+ tok:lit("/") c:comma(){
+            = a:lambda_param_no_default()* b:lambda_param_with_default()+ version(3, 8) tok:lit("/") c:comma(){
                 (concat(a, b), ParamSlash { comma: Some(c), tok })
             }
-            / a:lambda_param_no_default()* b:lambda_param_with_default()+ tok:lit("/") &lit(":") {
+            / a:lambda_param_no_default()* b:lambda_param_with_default()+ version(3, 8) tok:lit("/") &lit(":") {
                 (concat(a, b), ParamSlash { comma: None, tok })
             }
 
@@ -1208,7 +1208,7 @@ parser! {
             = c:for_if_clause()+ {? merge_comp_fors(c) }
 
         rule for_if_clause() -> CompFor<'input, 'a>
-            = asy:_async() f:lit("for") tgt:star_targets() i:lit("in")
+            = version(3, 6) asy:_async() f:lit("for") tgt:star_targets() i:lit("in")
                 iter:disjunction() ifs:_comp_if()* {
                     make_for_if(Some(asy), f, tgt, i, iter, ifs)
             }
@@ -1431,7 +1431,7 @@ parser! {
         // F-strings
 
         rule fstring() -> FormattedString<'input, 'a>
-            = start:tok(FStringStart, "f\"")
+            = version(3, 6) start:tok(FStringStart, "f\"")
                 parts:(_f_string() / _f_replacement())*
                 end:tok(FStringEnd, "\"") {
                     make_fstring(start.string, parts, end.string)
@@ -1443,7 +1443,7 @@ parser! {
             }
 
         rule _f_replacement() -> FormattedStringContent<'input, 'a>
-            = lb:lit("{") e:_f_expr() eq:lit("=")?
+            = lb:lit("{") e:_f_expr() eq:(version(3, 8) eq:lit("=") {eq})?
                 conv:(t:lit("!") c:_f_conversion() {(t,c)})?
                 spec:(t:lit(":") s:_f_spec() {(t,s)})?
                 rb:lit("}") {
@@ -1514,6 +1514,17 @@ parser! {
         rule _async() -> TokenRef<'input, 'a>
             = tok(Async, "ASYNC")
 
+        // Fails unless the configured python version supports syntax that was
+        // introduced in python `major.minor`.
+        rule version(major: u8, minor: u8)
+            = {?
+                if config.supports(major, minor) {
+                    Ok(())
+                } else {
+                    Err("syntax supported by the configured python version")
+                }
+            }
+
         rule separated_trailer<El, Sep>(el: rule<El>, sep: rule<Sep>) -> (El, Vec<(Sep, El)>, Option<Sep>)
             = e:el() rest:(s:sep() e:el() {(s, e)})* trailer:sep()? {(e, rest, trailer)}
 
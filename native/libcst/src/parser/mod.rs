@@ -3,10 +3,12 @@
 // This source code is licensed under the MIT license found in the
 // LICENSE file in the root directory of this source tree
 
+mod config;
 mod errors;
 mod grammar;
 mod numbers;
 
+pub use config::ParserConfig;
 pub use errors::ParserError;
 pub(crate) use grammar::TokVec;
 pub use grammar::{python, Result};
@@ -4,28 +4,203 @@
 // LICENSE file in the root directory of this source tree
 
 use crate::nodes::traits::py::TryIntoPy;
+use crate::tokenizer::py::{Token, TokenIterator};
+use crate::{Codegen, CodegenState, Module, ParserConfig, WithLeadingLines};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use pyo3::types::PyString;
+use rayon::prelude::*;
+use std::time::{Duration, Instant};
 
 #[pymodule]
 #[pyo3(name = "native")]
 pub fn libcst_native(_py: Python, m: &PyModule) -> PyResult<()> {
+    // The pure-rust phases (tokenize, parse, inflate) don't touch any python objects,
+    // so they run with the GIL released. Only the conversion into python nodes needs
+    // it, which lets a thread pool calling into these functions scale with cores.
+    //
+    // `python_version` is a `(major, minor)` tuple. When it's given, syntax that was
+    // introduced in a later python version is rejected.
     #[pyfn(m)]
-    fn parse_module(source: String, encoding: Option<&str>) -> PyResult<PyObject> {
-        let m = crate::parse_module(source.as_str(), encoding)?;
-        Python::with_gil(|py| m.try_into_py(py))
+    #[pyo3(signature = (source, encoding, python_version=None))]
+    fn parse_module(
+        py: Python,
+        source: String,
+        encoding: Option<&str>,
+        python_version: Option<(u8, u8)>,
+    ) -> PyResult<PyObject> {
+        let config = ParserConfig { python_version };
+        let m = py.allow_threads(|| {
+            crate::parse_module_with_config(source.as_str(), encoding, &config)
+        })?;
+        m.try_into_py(py)
     }
 
+    /// Parses every source in `sources` on the rayon thread pool, without holding the
+    /// GIL. The GIL is only reacquired to convert the parsed trees into python objects.
+    ///
+    /// Returns one entry per input: either the `Module`, or the exception instance that
+    /// parsing (or converting) that input raised.
     #[pyfn(m)]
-    fn parse_expression(source: String) -> PyResult<PyObject> {
-        let expr = crate::parse_expression(source.as_str())?;
-        Python::with_gil(|py| expr.try_into_py(py))
+    #[pyo3(signature = (sources, encodings, python_version=None))]
+    fn parse_modules(
+        py: Python,
+        sources: Vec<String>,
+        encodings: Vec<Option<String>>,
+        python_version: Option<(u8, u8)>,
+    ) -> PyResult<Vec<PyObject>> {
+        if sources.len() != encodings.len() {
+            return Err(PyValueError::new_err(format!(
+                "got {} sources but {} encodings",
+                sources.len(),
+                encodings.len()
+            )));
+        }
+        let config = ParserConfig { python_version };
+        let results = py.allow_threads(|| {
+            sources
+                .par_iter()
+                .zip(encodings.par_iter())
+                .map(|(source, encoding)| {
+                    crate::parse_module_with_config(source.as_str(), encoding.as_deref(), &config)
+                })
+                .collect::<Vec<_>>()
+        });
+        Ok(results
+            .into_iter()
+            .map(|result| {
+                match result
+                    .map_err(PyErr::from)
+                    .and_then(|m| m.try_into_py(py))
+                {
+                    Ok(module) => module,
+                    Err(err) => err.into_value(py).into_py(py),
+                }
+            })
+            .collect())
     }
 
+    /// Parses and validates a module, but only converts its header and footer into
+    /// python nodes. The statements are left for the caller to materialize from the
+    /// source on demand.
+    ///
+    /// Returns `(header, footer, default_indent, default_newline, has_trailing_newline,
+    /// offsets, indented)`, where `offsets[0]` is the character offset at which the
+    /// first statement starts, `offsets[i + 1]` is the offset at which statement `i`
+    /// ends, and `indented[i]` is the `indent` flag of statement `i`'s leading lines.
     #[pyfn(m)]
-    fn parse_statement(source: String) -> PyResult<PyObject> {
-        let stm = crate::parse_statement(source.as_str())?;
-        Python::with_gil(|py| stm.try_into_py(py))
+    #[pyo3(signature = (source, encoding, python_version=None))]
+    fn parse_module_lazy(
+        py: Python,
+        source: String,
+        encoding: Option<&str>,
+        python_version: Option<(u8, u8)>,
+    ) -> PyResult<PyObject> {
+        let config = ParserConfig { python_version };
+        let (m, offsets, indented) = py.allow_threads(|| {
+            crate::parse_module_with_config(source.as_str(), encoding, &config).map(|mut m| {
+                let offsets = statement_offsets(&m);
+                // Leading lines that follow an indented block aren't indented, which
+                // can't be told from the statement's own source. This must agree with
+                // leading_lines_indented in libcst/_parser/lazy.py.
+                let indented = m
+                    .body
+                    .iter_mut()
+                    .map(|stmt| stmt.leading_lines().iter().all(|l| l.indent))
+                    .collect::<Vec<_>>();
+                // Free the statements while we're still outside of the GIL, nobody
+                // needs them anymore.
+                m.body = vec![];
+                (m, offsets, indented)
+            })
+        })?;
+        Ok((
+            m.header.try_into_py(py)?,
+            m.footer.try_into_py(py)?,
+            m.default_indent,
+            m.default_newline,
+            m.has_trailing_newline,
+            offsets,
+            indented,
+        )
+            .into_py(py))
+    }
+
+    /// Benchmarking aid: parses `source` once, then converts the tree into python
+    /// nodes `iterations` times, and returns the total number of seconds spent
+    /// converting. This isolates the conversion from tokenizing and parsing.
+    #[pyfn(m)]
+    fn time_conversion(py: Python, source: String, iterations: usize) -> PyResult<f64> {
+        let m = py.allow_threads(|| crate::parse_module(source.as_str(), None))?;
+        let mut elapsed = Duration::ZERO;
+        for _ in 0..iterations {
+            let m = m.clone();
+            let start = Instant::now();
+            let module = m.try_into_py(py)?;
+            elapsed += start.elapsed();
+            // Deallocating the python nodes isn't part of the conversion.
+            drop(module);
+        }
+        Ok(elapsed.as_secs_f64())
+    }
+
+    /// Returns a lazy iterator over the tokens of `source`. See `libcst.tokenize`.
+    #[pyfn(m)]
+    fn tokenize(source: &PyString) -> PyResult<TokenIterator> {
+        TokenIterator::new(source)
+    }
+    m.add_class::<Token>()?;
+    m.add_class::<TokenIterator>()?;
+
+    #[pyfn(m)]
+    #[pyo3(signature = (source, python_version=None))]
+    fn parse_expression(
+        py: Python,
+        source: String,
+        python_version: Option<(u8, u8)>,
+    ) -> PyResult<PyObject> {
+        let config = ParserConfig { python_version };
+        let expr = py
+            .allow_threads(|| crate::parse_expression_with_config(source.as_str(), &config))?;
+        expr.try_into_py(py)
+    }
+
+    #[pyfn(m)]
+    #[pyo3(signature = (source, python_version=None))]
+    fn parse_statement(
+        py: Python,
+        source: String,
+        python_version: Option<(u8, u8)>,
+    ) -> PyResult<PyObject> {
+        let config = ParserConfig { python_version };
+        let stm = py
+            .allow_threads(|| crate::parse_statement_with_config(source.as_str(), &config))?;
+        stm.try_into_py(py)
     }
 
     Ok(())
 }
+
+/// Computes the character offsets at which each of the module's statements ends, by
+/// generating the code for the header and each statement in turn. `offsets[0]` is the
+/// end of the header.
+fn statement_offsets<'a>(m: &Module<'a>) -> Vec<usize> {
+    let mut state = CodegenState {
+        default_newline: m.default_newline,
+        default_indent: m.default_indent,
+        ..Default::default()
+    };
+    let mut offsets = Vec::with_capacity(m.body.len() + 1);
+    for line in &m.header {
+        line.codegen(&mut state);
+    }
+    let mut chars = state.tokens.chars().count();
+    offsets.push(chars);
+    for stmt in &m.body {
+        state.tokens.clear();
+        stmt.codegen(&mut state);
+        chars += state.tokens.chars().count();
+        offsets.push(chars);
+    }
+    offsets
+}
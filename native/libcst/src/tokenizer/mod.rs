@@ -9,6 +9,9 @@ mod operators;
 mod text_position;
 pub mod whitespace_parser;
 
+#[cfg(feature = "py")]
+pub mod py;
+
 pub use self::core::*;
 
 #[cfg(test)]
@@ -0,0 +1,166 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+//
+// This source code is licensed under the MIT license found in the
+// LICENSE file in the root directory of this source tree
+
+//! Exposes the tokenizer to python as a lazy iterator (see `libcst.tokenize`). Tokens
+//! refer to the source by offset, and only copy their text out of it when asked to.
+
+use pyo3::prelude::*;
+use pyo3::types::{PySlice, PyString};
+
+use super::{TokConfig, TokState, TokType};
+use crate::parser::ParserError;
+
+fn type_name(py: Python, tok_type: TokType) -> Py<PyString> {
+    match tok_type {
+        TokType::String => pyo3::intern!(py, "STRING"),
+        TokType::Name => pyo3::intern!(py, "NAME"),
+        TokType::Number => pyo3::intern!(py, "NUMBER"),
+        TokType::Op => pyo3::intern!(py, "OP"),
+        TokType::Newline => pyo3::intern!(py, "NEWLINE"),
+        TokType::Indent => pyo3::intern!(py, "INDENT"),
+        TokType::Dedent => pyo3::intern!(py, "DEDENT"),
+        TokType::Async => pyo3::intern!(py, "ASYNC"),
+        TokType::Await => pyo3::intern!(py, "AWAIT"),
+        TokType::FStringStart => pyo3::intern!(py, "FSTRING_START"),
+        TokType::FStringString => pyo3::intern!(py, "FSTRING_STRING"),
+        TokType::FStringEnd => pyo3::intern!(py, "FSTRING_END"),
+        TokType::EndMarker => pyo3::intern!(py, "ENDMARKER"),
+    }
+    .into()
+}
+
+/// A token. `start` and `end` are character offsets into the source, lines are
+/// 1-based and columns are 0-based, like in the rest of LibCST.
+#[pyclass(frozen, module = "libcst.native")]
+pub struct Token {
+    #[pyo3(get, name = "type")]
+    tok_type: Py<PyString>,
+    #[pyo3(get)]
+    start: usize,
+    #[pyo3(get)]
+    end: usize,
+    #[pyo3(get)]
+    start_line: usize,
+    #[pyo3(get)]
+    start_column: usize,
+    #[pyo3(get)]
+    end_line: usize,
+    #[pyo3(get)]
+    end_column: usize,
+    source: Py<PyString>,
+}
+
+#[pymethods]
+impl Token {
+    /// The token's text, sliced out of the source.
+    #[getter]
+    fn text<'py>(&self, py: Python<'py>) -> PyResult<&'py PyAny> {
+        let slice = PySlice::new(py, self.start as isize, self.end as isize, 1);
+        self.source.as_ref(py).get_item(slice)
+    }
+
+    fn __repr__(&self, py: Python) -> PyResult<String> {
+        Ok(format!(
+            "Token(type={}, start={}, end={}, start_line={}, start_column={}, end_line={}, \
+             end_column={})",
+            self.tok_type.as_ref(py).to_str()?,
+            self.start,
+            self.end,
+            self.start_line,
+            self.start_column,
+            self.end_line,
+            self.end_column,
+        ))
+    }
+}
+
+/// Lazily tokenizes a python string, without copying it.
+#[pyclass(unsendable, module = "libcst.native")]
+pub struct TokenIterator {
+    // `state` and `text` borrow from `source`: their `'static` lifetime is a lie that
+    // holds because we own a reference to the python string, and because they're
+    // declared (and therefore dropped) before it. Neither is ever handed out.
+    state: TokState<'static>,
+    text: &'static str,
+    // Keeps the string (and the UTF-8 buffer cached in it) alive for `state` and
+    // `text`. Every `Token` also holds it, to slice its text out on demand.
+    source: Py<PyString>,
+    is_ascii: bool,
+    // The byte and character offsets of the last offset we converted. Tokens move
+    // forward through the source, so converting the next one is cheap.
+    byte_offset: usize,
+    char_offset: usize,
+}
+
+impl TokenIterator {
+    pub fn new(source: &PyString) -> PyResult<Self> {
+        let text = source.to_str()?;
+        // SAFETY: Outside of the limited API (we don't build with `abi3`), `to_str`
+        // returns the UTF-8 representation cached in the string object itself. The
+        // `source` field keeps that object alive for as long as we exist, and python
+        // strings are immutable, so the buffer outlives every use of `text`. Errors
+        // built from `text` copy what they need out of it before they're returned.
+        let text: &'static str = unsafe { std::mem::transmute::<&str, &'static str>(text) };
+        let config = TokConfig {
+            async_hacks: false,
+            split_fstring: true,
+        };
+        Ok(Self {
+            state: TokState::new(text, &config),
+            text,
+            source: source.into(),
+            is_ascii: text.is_ascii(),
+            byte_offset: 0,
+            char_offset: 0,
+        })
+    }
+
+    fn char_offset(&mut self, byte_offset: usize) -> usize {
+        if self.is_ascii {
+            return byte_offset;
+        }
+        if byte_offset >= self.byte_offset {
+            self.char_offset += self.text[self.byte_offset..byte_offset].chars().count();
+        } else {
+            self.char_offset -= self.text[byte_offset..self.byte_offset].chars().count();
+        }
+        self.byte_offset = byte_offset;
+        self.char_offset
+    }
+}
+
+#[pymethods]
+impl TokenIterator {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python) -> PyResult<Option<Token>> {
+        let tok_type = match self.state.next() {
+            None => return Ok(None),
+            Some(Err(err)) => return Err(ParserError::TokenizerError(err, self.text).into()),
+            Some(Ok(tok_type)) => tok_type,
+        };
+        let start_pos = self.state.start_pos.clone();
+        let (end_byte, end_line, end_column) = {
+            let end_pos = &self.state.text_pos;
+            (
+                end_pos.byte_idx(),
+                end_pos.line_number(),
+                end_pos.char_column_number(),
+            )
+        };
+        Ok(Some(Token {
+            tok_type: type_name(py, tok_type),
+            start: self.char_offset(start_pos.byte_idx()),
+            end: self.char_offset(end_byte),
+            start_line: start_pos.line_number(),
+            start_column: start_pos.char_column_number(),
+            end_line,
+            end_column,
+            source: self.source.clone_ref(py),
+        }))
+    }
+}
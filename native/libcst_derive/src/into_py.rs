@@ -38,13 +38,16 @@ fn impl_into_py_enum(ast: &DeriveInput, e: &DataEnum) -> TokenStream {
                 let kwargs_toks = fields_to_kwargs(&var.fields, true);
                 toks.push(quote! {
                     Self::#varname { #(#fieldnames,)* .. } => {
-                        let libcst = pyo3::types::PyModule::import(py, "libcst")?;
+                        static CONSTRUCTOR: pyo3::sync::GILOnceCell<pyo3::PyObject> =
+                            pyo3::sync::GILOnceCell::new();
                         let kwargs = #kwargs_toks ;
-                        Ok(libcst
-                            .getattr(stringify!(#varname))
-                            .expect(stringify!(no #varname found in libcst))
-                            .call((), Some(kwargs))?
-                            .into())
+                        Ok(crate::nodes::traits::py::node_constructor(
+                            py,
+                            &CONSTRUCTOR,
+                            stringify!(#varname),
+                        )?
+                        .call((), Some(kwargs))?
+                        .into())
                     }
                 })
             }
@@ -65,7 +68,6 @@ fn impl_into_py_enum(ast: &DeriveInput, e: &DataEnum) -> TokenStream {
     let ident = &ast.ident;
     let generics = &ast.generics;
     let gen = quote! {
-        use pyo3::types::IntoPyDict as _;
         #[automatically_derived]
         impl#generics crate::nodes::traits::py::TryIntoPy<pyo3::PyObject> for #ident #generics {
             fn try_into_py(self, py: pyo3::Python) -> pyo3::PyResult<pyo3::PyObject> {
@@ -83,17 +85,19 @@ fn impl_into_py_struct(ast: &DeriveInput, e: &DataStruct) -> TokenStream {
     let ident = &ast.ident;
     let generics = &ast.generics;
     let gen = quote! {
-        use pyo3::types::IntoPyDict as _;
         #[automatically_derived]
         impl#generics crate::nodes::traits::py::TryIntoPy<pyo3::PyObject> for #ident #generics {
             fn try_into_py(self, py: pyo3::Python) -> pyo3::PyResult<pyo3::PyObject> {
-                let libcst = pyo3::types::PyModule::import(py, "libcst")?;
+                static CONSTRUCTOR: pyo3::sync::GILOnceCell<pyo3::PyObject> =
+                    pyo3::sync::GILOnceCell::new();
                 let kwargs = #kwargs_toks ;
-                Ok(libcst
-                    .getattr(stringify!(#ident))
-                    .expect(stringify!(no #ident found in libcst))
-                    .call((), Some(kwargs))?
-                    .into())
+                Ok(crate::nodes::traits::py::node_constructor(
+                    py,
+                    &CONSTRUCTOR,
+                    stringify!(#ident),
+                )?
+                .call((), Some(kwargs))?
+                .into())
             }
         }
     };
@@ -101,7 +105,6 @@ fn impl_into_py_struct(ast: &DeriveInput, e: &DataStruct) -> TokenStream {
 }
 
 fn fields_to_kwargs(fields: &Fields, is_enum: bool) -> quote::__private::TokenStream {
-    let mut empty_kwargs = false;
     let mut py_varnames = vec![];
     let mut rust_varnames = vec![];
     let mut optional_py_varnames = vec![];
@@ -141,36 +144,35 @@ fn fields_to_kwargs(fields: &Fields, is_enum: bool) -> quote::__private::TokenSt
                     }
                 }
             }
-            empty_kwargs = py_varnames.is_empty() && optional_py_varnames.is_empty()
         }
         Fields::Unnamed(FieldsUnnamed { unnamed, .. }) => {
             if unnamed.first().is_some() {
                 py_varnames.push(format_ident!("value"));
                 rust_varnames.push(quote! { self.0 });
-            } else {
-                empty_kwargs = true;
             }
         }
-        Fields::Unit => {
-            empty_kwargs = true;
-        }
-    };
-    let kwargs_pairs = quote! {
-        #(Some((stringify!(#py_varnames), #rust_varnames.try_into_py(py)?)),)*
+        Fields::Unit => {}
     };
-    let optional_pairs = quote! {
-        #(#optional_rust_varnames.map(|x| x.try_into_py(py)).transpose()?.map(|x| (stringify!(#optional_py_varnames), x)),)*
-    };
-    if empty_kwargs {
-        quote! { pyo3::types::PyDict::new(py) }
-    } else {
-        quote! {
-            [ #kwargs_pairs #optional_pairs ]
-                .iter()
-                .filter(|x| x.is_some())
-                .map(|x| x.as_ref().unwrap())
-                .collect::<Vec<_>>()
-                .into_py_dict(py)
+    // Fill in the kwargs dict directly, instead of collecting them into temporary
+    // arrays and vectors first. Keys are interned, so they're only allocated once.
+    quote! {
+        {
+            let kwargs = pyo3::types::PyDict::new(py);
+            #(
+                kwargs.set_item(
+                    pyo3::intern!(py, stringify!(#py_varnames)),
+                    #rust_varnames.try_into_py(py)?,
+                )?;
+            )*
+            #(
+                if let Some(x) = #optional_rust_varnames {
+                    kwargs.set_item(
+                        pyo3::intern!(py, stringify!(#optional_py_varnames)),
+                        x.try_into_py(py)?,
+                    )?;
+                }
+            )*
+            kwargs
         }
     }
 }
@@ -0,0 +1,81 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Compares serializing parsed trees with dump_binary and load_binary, with pickling
+them, and with parsing the sources again.
+
+Usage: python scripts/binary_benchmark.py [--repeat N] [DIR]
+"""
+
+import argparse
+import pickle
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, List
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+
+FIXTURES_DIR: Path = Path(__file__).parent.parent / "native/libcst/tests/fixtures"
+
+
+def load_sources(directory: Path) -> List[str]:
+    sources = [path.read_text() for path in sorted(directory.rglob("*.py"))]
+    # Drop anything the current parser rejects (the pure parser doesn't support every
+    # fixture).
+    results = cst.parse_modules(sources)
+    return [s for s, r in zip(sources, results) if isinstance(r, cst.Module)]
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    sources = load_sources(args.directory)
+    modules = [cst.parse_module(source) for source in sources]
+    binaries = [cst.dump_binary(module) for module in modules]
+    pickles = [pickle.dumps(module, pickle.HIGHEST_PROTOCOL) for module in modules]
+    print(f"parser: {'native' if is_native() else 'pure'}")
+    print(f"corpus: {len(sources)} modules, {sum(map(len, sources))} bytes\n")
+
+    print(f"{'':>8} {'dump':>10} {'load':>10} {'size':>10} {'zlib size':>10}")
+    for name, dump, load, data in [
+        ("binary", cst.dump_binary, cst.load_binary, binaries),
+        (
+            "pickle",
+            lambda m: pickle.dumps(m, pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+            pickles,
+        ),
+    ]:
+        dump_time = best_of(args.repeat, lambda: [dump(m) for m in modules])
+        load_time = best_of(args.repeat, lambda: [load(d) for d in data])
+        size = sum(map(len, data))
+        compressed_size = sum(len(zlib.compress(d, 1)) for d in data)
+        print(
+            f"{name:>8} {dump_time * 1e3:>7.1f} ms {load_time * 1e3:>7.1f} ms "
+            + f"{size:>10} {compressed_size:>10}"
+        )
+    parse_time = best_of(args.repeat, lambda: [cst.parse_module(s) for s in sources])
+    print(f"{'parse':>8} {'':>10} {parse_time * 1e3:>7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,98 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Measures the cost of converting parsed trees into python nodes. The python side of
+that conversion is one constructor call per node, so we replay the constructor calls
+needed to rebuild every module in the corpus, once through the regular (validating)
+constructors, and once through the trusted constructors the parser uses. The
+end-to-end parse time of the corpus is reported as well.
+
+With the native parser, the conversion itself (looking up node classes, building the
+keyword arguments, and calling the constructors) is measured too, isolated from
+tokenizing and parsing.
+
+Usage: python scripts/conversion_benchmark.py [--repeat N] [DIR]
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+
+FIXTURES_DIR: Path = Path(__file__).parent.parent / "native/libcst/tests/fixtures"
+
+_Call = Tuple[Type[cst.CSTNode], Dict[str, Any]]
+
+
+def load_sources(directory: Path) -> List[str]:
+    sources = [path.read_text() for path in sorted(directory.rglob("*.py"))]
+    # Drop anything the current parser rejects (the pure parser doesn't support every
+    # fixture).
+    results = cst.parse_modules(sources)
+    return [s for s, r in zip(sources, results) if isinstance(r, cst.Module)]
+
+
+def constructor_calls(node: cst.CSTNode, calls: List[_Call]) -> None:
+    # Children first, in the order the parser would construct them.
+    for child in node.children:
+        constructor_calls(child, calls)
+    calls.append((type(node), {f.name: getattr(node, f.name) for f in fields(node)}))
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    sources = load_sources(args.directory)
+    calls: List[_Call] = []
+    for source in sources:
+        constructor_calls(cst.parse_module(source), calls)
+    print(f"parser: {'native' if is_native() else 'pure'}")
+    print(f"corpus: {len(sources)} modules, {len(calls)} nodes\n")
+
+    def validated() -> None:
+        for cls, kwargs in calls:
+            cls(**kwargs)
+
+    def trusted() -> None:
+        for cls, kwargs in calls:
+            cls._trusted_constructor()(**kwargs)
+
+    def parse() -> None:
+        for source in sources:
+            cst.parse_module(source)
+
+    for name, fn in [("validated", validated), ("trusted", trusted), ("parse", parse)]:
+        print(f"{name:>10} {best_of(args.repeat, fn) * 1e3:>10.1f} ms")
+
+    if is_native():
+        from libcst.native import time_conversion
+
+        # time_conversion repeats the conversion itself, so take the mean instead of
+        # the best of several runs.
+        elapsed = sum(time_conversion(source, args.repeat) for source in sources)
+        print(f"{'convert':>10} {elapsed / args.repeat * 1e3:>10.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Measures how many statements of a lazily parsed module can be accessed before
+``parse_module(lazy=True)`` becomes slower than an eager ``parse_module``. Each
+statement of a lazy module is parsed again on its own the first time it's accessed,
+so materializing all of them costs more than parsing the module eagerly.
+
+For each fraction of top-level statements, the time to parse the corpus lazily and
+access that fraction of its statements is reported relative to an eager parse. Lazy
+parsing only exists with the native parser. With the pure parser, the lazy bodies
+are built from offsets computed up front, and only the statements' materialization
+is timed, which is an underestimate of the native lazy cost.
+
+Usage: python scripts/lazy_benchmark.py [--repeat N] [--steps N] [DIR]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+from libcst._parser.lazy import LazyStatementSequence
+
+FIXTURES_DIR: Path = Path(__file__).parent.parent / "native/libcst/tests/fixtures"
+
+
+def load_sources(directory: Path) -> List[str]:
+    sources = [path.read_text() for path in sorted(directory.rglob("*.py"))]
+    # Drop anything the current parser rejects (the pure parser doesn't support every
+    # fixture).
+    results = cst.parse_modules(sources)
+    return [s for s, r in zip(sources, results) if isinstance(r, cst.Module)]
+
+
+def lazy_body(source: str) -> LazyStatementSequence:
+    # The body a lazy parse_module would have, without any statement materialized.
+    config = cst.PartialParserConfig()
+    module = cst.parse_module(source, config)
+    parsed = LazyStatementSequence.from_module(module, source, config)
+    return LazyStatementSequence(
+        source,
+        parsed._offsets,
+        parsed._indented,
+        default_indent=module.default_indent,
+        default_newline=module.default_newline,
+        config=config,
+    )
+
+
+def access(module: cst.Module, fraction: float) -> None:
+    # Accesses evenly spread statements, a fraction of all of them.
+    count = round(len(module.body) * fraction)
+    for i in range(count):
+        module.body[i * len(module.body) // count]
+
+
+def best_of(repeat: int, fn: Callable[[], float]) -> float:
+    return min(fn() for _ in range(repeat))
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    sources = load_sources(args.directory)
+    native = is_native()
+    print(f"parser: {'native' if native else 'pure (materialization only)'}")
+    print(f"corpus: {len(sources)} modules\n")
+
+    def eager() -> float:
+        start = time.perf_counter()
+        for source in sources:
+            cst.parse_module(source)
+        return time.perf_counter() - start
+
+    def lazy(fraction: float) -> float:
+        if native:
+            start = time.perf_counter()
+            for source in sources:
+                access(cst.parse_module(source, lazy=True), fraction)
+            return time.perf_counter() - start
+        modules = [cst.Module(body=lazy_body(source)) for source in sources]
+        start = time.perf_counter()
+        for module in modules:
+            access(module, fraction)
+        return time.perf_counter() - start
+
+    baseline = best_of(args.repeat, eager)
+    print(f"{'accessed':>9} {'ms':>8} {'vs eager':>9}")
+    print(f"{'eager':>9} {baseline * 1e3:>8.1f} {1:>8.2f}x")
+    break_even = None
+    for step in range(args.steps + 1):
+        fraction = step / args.steps
+        elapsed = best_of(args.repeat, lambda: lazy(fraction))
+        if break_even is None and elapsed > baseline:
+            break_even = fraction
+        print(f"{fraction:>8.0%} {elapsed * 1e3:>8.1f} {elapsed / baseline:>8.2f}x")
+    if break_even is None:
+        print("\nlazy parsing stays cheaper even when every statement is accessed")
+    else:
+        print(f"\nlazy parsing is slower once about {break_even:.0%} are accessed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
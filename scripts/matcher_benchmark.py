@@ -0,0 +1,173 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Measures how long it takes to check matchers against every node of one large
+module, both directly and through a visitor with matcher decorators, which is what
+linters spend most of their time doing. The corpus is merged into a single module
+first.
+
+Each is timed with compiled matchers, and for comparison with matchers evaluated by
+:func:`libcst.matchers.matches`, which is how decorated visitors used to evaluate
+them. Finally, finding every match of all the matchers with a
+:class:`libcst.matchers.MatcherSet` is compared with calling
+:func:`libcst.matchers.findall` for each of them.
+
+Usage: python scripts/matcher_benchmark.py [--repeat N] [DIR]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Union
+from unittest import mock
+
+import libcst as cst
+import libcst.matchers as m
+from libcst._parser.entrypoints import is_native
+
+FIXTURES_DIR: Path = Path(__file__).parent.parent / "native/libcst/tests/fixtures"
+
+MATCHERS: Sequence[m.BaseMatcherNode] = [
+    m.Call(func=m.Name("print")),
+    m.Call(func=m.Attribute(value=m.Name("os"), attr=m.Name("getenv"))),
+    m.Call(func=m.Name("open"), args=[m.DoNotCare(), m.DoNotCare()]),
+    m.Call(args=[m.ZeroOrMore(), m.Arg(keyword=m.Name("timeout"))]),
+    m.Comparison(comparisons=[m.ComparisonTarget(m.Is() | m.IsNot(), m.Name())]),
+    m.Name(value=m.MatchRegex(r"^_[a-z]")),
+    m.Name("self") | m.Name("cls"),
+    m.FunctionDef(asynchronous=m.Asynchronous(), decorators=[]),
+    m.ExceptHandler(type=None),
+    m.Assign(targets=[m.AssignTarget(m.Tuple())]),
+    m.Import() | m.ImportFrom(),
+    m.Subscript(value=~m.Name()),
+]
+
+
+def load_module(directory: Path) -> cst.Module:
+    sources = [path.read_text() for path in sorted(directory.rglob("*.py"))]
+    # Drop anything the current parser rejects (the pure parser doesn't support every
+    # fixture).
+    results = cst.parse_modules(sources)
+    modules = [r for r in results if isinstance(r, cst.Module)]
+    return cst.Module(body=[statement for m in modules for statement in m.body])
+
+
+def all_nodes(module: cst.Module) -> List[cst.CSTNode]:
+    nodes: List[cst.CSTNode] = []
+
+    class Collector(cst.CSTVisitor):
+        def on_visit(self, node: cst.CSTNode) -> bool:
+            nodes.append(node)
+            return True
+
+    module.visit(Collector())
+    return nodes
+
+
+class LintingVisitor(m.MatcherDecoratableVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.found = 0
+
+    @m.visit(MATCHERS[0])
+    @m.visit(MATCHERS[1])
+    @m.visit(MATCHERS[2])
+    @m.visit(MATCHERS[3])
+    def visit_suspicious_call(self, node: cst.Call) -> None:
+        self.found += 1
+
+    @m.visit(MATCHERS[4])
+    def visit_identity_comparison(self, node: cst.Comparison) -> None:
+        self.found += 1
+
+    @m.call_if_inside(MATCHERS[7])
+    @m.call_if_not_inside(m.ClassDef())
+    @m.visit(MATCHERS[5])
+    def visit_private_name(self, node: cst.Name) -> None:
+        self.found += 1
+
+    @m.leave(MATCHERS[6])
+    def leave_self(self, original_node: cst.Name) -> None:
+        self.found += 1
+
+    @m.visit(MATCHERS[8] | MATCHERS[9] | MATCHERS[10] | MATCHERS[11])
+    def visit_other(
+        self,
+        node: Union[
+            cst.ExceptHandler, cst.Assign, cst.Import, cst.ImportFrom, cst.Subscript
+        ],
+    ) -> None:
+        self.found += 1
+
+
+def interpreted_matches(
+    visitor: m.MatcherDecoratableVisitor,
+    node: cst.CSTNode,
+    matcher: m.BaseMatcherNode,
+) -> bool:
+    return m.matches(node, matcher, metadata_resolver=visitor)
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    module = load_module(args.directory)
+    nodes = all_nodes(module)
+    print(f"parser: {'native' if is_native() else 'pure'}")
+    print(f"module: {len(module.body)} statements, {len(nodes)} nodes")
+    print(f"matchers: {len(MATCHERS)}\n")
+
+    compiled = [m.compile(matcher) for matcher in MATCHERS]
+    direct_compiled = best_of(
+        args.repeat, lambda: [c(node) for c in compiled for node in nodes]
+    )
+    direct_interpreted = best_of(
+        args.repeat,
+        lambda: [m.matches(node, matcher) for matcher in MATCHERS for node in nodes],
+    )
+    visitor_compiled = best_of(args.repeat, lambda: module.visit(LintingVisitor()))
+    with mock.patch("libcst.matchers._visitors._compiled_matches", interpreted_matches):
+        visitor_interpreted = best_of(
+            args.repeat, lambda: module.visit(LintingVisitor())
+        )
+
+    print(f"{'':>10} {'compiled':>10} {'matches':>10}")
+    for name, timings in [
+        ("direct", (direct_compiled, direct_interpreted)),
+        ("visitor", (visitor_compiled, visitor_interpreted)),
+    ]:
+        print(f"{name:>10} " + " ".join(f"{t * 1e3:>7.1f} ms" for t in timings))
+
+    matcher_set = m.MatcherSet({str(i): matcher for i, matcher in enumerate(MATCHERS)})
+    matcher_set_findall = best_of(args.repeat, lambda: matcher_set.findall(module))
+    separate_findall = best_of(
+        args.repeat, lambda: [m.findall(module, matcher) for matcher in MATCHERS]
+    )
+    print(f"\n{'':>10} {'set':>10} {'separate':>10}")
+    print(
+        f"{'findall':>10} "
+        + " ".join(
+            f"{t * 1e3:>7.1f} ms" for t in (matcher_set_findall, separate_findall)
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
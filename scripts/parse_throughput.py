@@ -0,0 +1,78 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Measures how parse throughput scales when calling ``libcst.parse_module`` from a
+thread pool. The native parser releases the GIL while tokenizing and parsing, so
+throughput should grow with the number of threads until node materialization (which
+still holds the GIL) dominates. The batched ``libcst.parse_modules`` is measured as
+well for comparison.
+
+Usage: python scripts/parse_throughput.py [--threads N] [--repeat N] [DIR]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+
+FIXTURES_DIR: Path = Path(__file__).parent.parent / "native/libcst/tests/fixtures"
+
+
+def load_sources(directory: Path, repeat: int) -> List[str]:
+    sources = [path.read_text() for path in sorted(directory.rglob("*.py"))]
+    # Drop anything the current parser rejects (the pure parser doesn't support every
+    # fixture). This also warms up imports and any lazily initialized state.
+    results = cst.parse_modules(sources)
+    sources = [s for s, r in zip(sources, results) if isinstance(r, cst.Module)]
+    return sources * repeat
+
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    sources = load_sources(args.directory, args.repeat)
+    total_bytes = sum(len(source) for source in sources)
+    print(f"parser: {'native' if is_native() else 'pure'}")
+    print(f"corpus: {len(sources)} modules, {total_bytes / 1e6:.2f} MB\n")
+
+    baseline = 0.0
+    print(f"{'threads':>8} {'seconds':>10} {'modules/s':>12} {'speedup':>8}")
+    for threads in range(1, args.threads + 1):
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            elapsed = timed(lambda: list(executor.map(cst.parse_module, sources)))
+        if threads == 1:
+            baseline = elapsed
+        print(
+            f"{threads:>8} {elapsed:>10.3f} {len(sources) / elapsed:>12.1f} "
+            + f"{baseline / elapsed:>7.2f}x"
+        )
+
+    elapsed = timed(lambda: cst.parse_modules(sources))
+    print(
+        f"{'batched':>8} {elapsed:>10.3f} {len(sources) / elapsed:>12.1f} "
+        + f"{baseline / elapsed:>7.2f}x"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
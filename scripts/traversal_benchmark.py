@@ -0,0 +1,132 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Measures how long it takes to visit deep and wide synthetic modules with a
+read-only visitor and to resolve a metadata provider for them.
+
+For comparison, the same traversals are also run with the recursive traversal
+read-only visitors used before they were driven from an explicit stack. It needs
+several Python frames per level of the tree, so it can't get through the deep
+modules at all unless the recursion limit is raised.
+
+Usage: python scripts/traversal_benchmark.py [--repeat N] [--size N]
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, List, Optional, Union
+from unittest import mock
+
+import libcst as cst
+from libcst.metadata import MetadataWrapper, ParentNodeProvider
+
+
+def wide_module(size: int) -> cst.Module:
+    return cst.parse_module(
+        "".join(f"x{i} = f(a, b[{i}], c={i}) + g(d)\n" for i in range(size))
+    )
+
+
+def deep_expression_module(size: int) -> cst.Module:
+    expression: cst.BaseExpression = cst.Name("x")
+    for i in range(size):
+        expression = cst.BinaryOperation(
+            left=expression, operator=cst.Add(), right=cst.Integer(str(i))
+        )
+    return cst.Module(body=[cst.SimpleStatementLine([cst.Expr(expression)])])
+
+
+def deep_elif_module(size: int) -> cst.Module:
+    node: Optional[cst.If] = None
+    for i in range(size):
+        node = cst.If(
+            test=cst.Comparison(
+                left=cst.Name("x"),
+                comparisons=[
+                    cst.ComparisonTarget(cst.Equal(), cst.Integer(str(size - i)))
+                ],
+            ),
+            body=cst.SimpleStatementSuite([cst.Expr(cst.Call(cst.Name("f")))]),
+            orelse=node,
+        )
+    assert node is not None
+    return cst.Module(body=[node])
+
+
+class CountingVisitor(cst.CSTVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.names = 0
+        self.calls = 0
+
+    def visit_Name(self, node: cst.Name) -> None:
+        self.names += 1
+
+    def visit_Call_func(self, node: cst.Call) -> None:
+        self.calls += 1
+
+
+def recursive_visit(
+    self: cst.CSTNode, visitor: Union[cst.CSTVisitor, cst.CSTTransformer]
+) -> object:
+    # How CSTNode.visit used to traverse trees for read-only visitors.
+    assert isinstance(visitor, cst.CSTVisitor)
+    if visitor.on_visit(self):
+        self._visit_children(visitor)
+    visitor.on_leave(self)
+    return self
+
+
+def visit(module: cst.Module) -> None:
+    module.visit(CountingVisitor())
+
+
+def resolve(module: cst.Module) -> None:
+    MetadataWrapper(module, unsafe_skip_copy=True).resolve(ParentNodeProvider)
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def timing(repeat: int, fn: Callable[[], object]) -> str:
+    try:
+        return f"{best_of(repeat, fn) * 1e3:>7.1f} ms"
+    except RecursionError:
+        return f"{'too deep':>10}"
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    modules = [
+        ("wide", wide_module(args.size)),
+        ("deep expression", deep_expression_module(args.size)),
+        ("deep elif", deep_elif_module(args.size)),
+    ]
+    print(f"size: {args.size}, recursion limit: {sys.getrecursionlimit()}\n")
+    print(f"{'':>26} {'iterative':>10} {'recursive':>10}")
+    for module_name, module in modules:
+        for traversal_name, traverse in [("visit", visit), ("metadata", resolve)]:
+            iterative = timing(args.repeat, lambda: traverse(module))
+            with mock.patch.object(cst.CSTNode, "visit", recursive_visit):
+                recursive = timing(args.repeat, lambda: traverse(module))
+            name = f"{module_name} {traversal_name}"
+            print(f"{name:>26} {iterative} {recursive}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,161 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Measures how long it takes to visit and transform one large module with visitors
+that only have a few callbacks, which is what most visitors look like. The corpus is
+merged into a single module first.
+
+For comparison, the same visitors are also run with callbacks that are looked up by
+name on every node and attribute, like visitors used to do before their callbacks
+were cached per class, and with ``SKIP_UNREACHABLE_CHILDREN`` set.
+
+Usage: python scripts/visitor_benchmark.py [--repeat N] [DIR]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Union
+
+import libcst as cst
+from libcst._parser.entrypoints import is_native
+
+FIXTURES_DIR: Path = Path(__file__).parent.parent / "native/libcst/tests/fixtures"
+
+
+def load_module(directory: Path) -> cst.Module:
+    sources = [path.read_text() for path in sorted(directory.rglob("*.py"))]
+    # Drop anything the current parser rejects (the pure parser doesn't support every
+    # fixture).
+    results = cst.parse_modules(sources)
+    modules = [r for r in results if isinstance(r, cst.Module)]
+    return cst.Module(body=[statement for m in modules for statement in m.body])
+
+
+class CountingVisitor(cst.CSTVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.names = 0
+        self.calls = 0
+        self.depth = 0
+
+    def visit_FunctionDef(self, node: cst.FunctionDef) -> None:
+        self.depth += 1
+
+    def leave_FunctionDef(self, original_node: cst.FunctionDef) -> None:
+        self.depth -= 1
+
+    def visit_Name(self, node: cst.Name) -> None:
+        self.names += 1
+
+    def visit_Call_func(self, node: cst.Call) -> None:
+        self.calls += 1
+
+
+class RenamingTransformer(cst.CSTTransformer):
+    def visit_ClassDef(self, node: cst.ClassDef) -> bool:
+        return False
+
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
+        if updated_node.value == "self":
+            return updated_node.with_changes(value="this")
+        return updated_node
+
+    def leave_Call_args(self, original_node: cst.Call) -> None:
+        pass
+
+
+class _LookupCallbacks:
+    # The callbacks visitors had before they were cached: every node and attribute
+    # formats and looks up the names of the callbacks it might have.
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        visit_func = getattr(self, f"visit_{type(node).__name__}", None)
+        retval = visit_func(node) if visit_func is not None else True
+        return False if retval is False else True
+
+    def on_leave(
+        self, original_node: cst.CSTNode, *updated_node: cst.CSTNode
+    ) -> Union[cst.CSTNode, None]:
+        leave_func = getattr(self, f"leave_{type(original_node).__name__}", None)
+        if leave_func is not None:
+            return leave_func(original_node, *updated_node)
+        return updated_node[0] if updated_node else None
+
+    def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
+        visit_func = getattr(self, f"visit_{type(node).__name__}_{attribute}", None)
+        if visit_func is not None:
+            visit_func(node)
+
+    def on_leave_attribute(self, original_node: cst.CSTNode, attribute: str) -> None:
+        leave_func = getattr(
+            self, f"leave_{type(original_node).__name__}_{attribute}", None
+        )
+        if leave_func is not None:
+            leave_func(original_node)
+
+
+class LookupCountingVisitor(_LookupCallbacks, CountingVisitor):
+    pass
+
+
+class LookupRenamingTransformer(_LookupCallbacks, RenamingTransformer):
+    pass
+
+
+class SkippingCountingVisitor(CountingVisitor):
+    SKIP_UNREACHABLE_CHILDREN = True
+
+
+class SkippingRenamingTransformer(RenamingTransformer):
+    SKIP_UNREACHABLE_CHILDREN = True
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    module = load_module(args.directory)
+    print(f"parser: {'native' if is_native() else 'pure'}")
+    print(f"module: {len(module.body)} statements, {len(module.code)} bytes\n")
+
+    print(f"{'':>12} {'cached':>10} {'lookup':>10} {'skipping':>10}")
+    for name, visitors in [
+        (
+            "visitor",
+            [CountingVisitor, LookupCountingVisitor, SkippingCountingVisitor],
+        ),
+        (
+            "transformer",
+            [
+                RenamingTransformer,
+                LookupRenamingTransformer,
+                SkippingRenamingTransformer,
+            ],
+        ),
+    ]:
+        timings = [
+            best_of(args.repeat, lambda: module.visit(visitor()))
+            for visitor in visitors
+        ]
+        print(f"{name:>12} " + " ".join(f"{t * 1e3:>7.1f} ms" for t in timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
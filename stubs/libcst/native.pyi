@@ -3,9 +3,54 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Optional
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 import libcst
 
-def parse_module(source: str, encoding: Optional[str]) -> libcst.Module: ...
-def parse_expression(source: str) -> libcst.BaseExpression: ...
-def parse_statement(source: str) -> libcst.BaseStatement: ...
+def parse_module(
+    source: str,
+    encoding: Optional[str],
+    python_version: Optional[Tuple[int, int]] = None,
+) -> libcst.Module: ...
+def parse_modules(
+    sources: Sequence[str],
+    encodings: Sequence[Optional[str]],
+    python_version: Optional[Tuple[int, int]] = None,
+) -> List[
+    Union[libcst.Module, libcst.ParserSyntaxError, libcst.CSTValidationError]
+]: ...
+def parse_module_lazy(
+    source: str,
+    encoding: Optional[str],
+    python_version: Optional[Tuple[int, int]] = None,
+) -> Tuple[
+    Sequence[libcst.EmptyLine],
+    Sequence[libcst.EmptyLine],
+    str,
+    str,
+    bool,
+    List[int],
+    List[bool],
+]: ...
+def time_conversion(source: str, iterations: int) -> float: ...
+
+class Token:
+    type: str
+    start: int
+    end: int
+    start_line: int
+    start_column: int
+    end_line: int
+    end_column: int
+    @property
+    def text(self) -> str: ...
+
+class TokenIterator(Iterator[Token]):
+    def __next__(self) -> Token: ...
+
+def tokenize(source: str) -> TokenIterator: ...
+def parse_expression(
+    source: str, python_version: Optional[Tuple[int, int]] = None
+) -> libcst.BaseExpression: ...
+def parse_statement(
+    source: str, python_version: Optional[Tuple[int, int]] = None
+) -> libcst.BaseStatement: ...